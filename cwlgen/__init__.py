@@ -24,7 +24,25 @@ from .version import __version__
 
 from .utils import literal, literal_presenter
 
-from .import_cwl import parse_cwl, parse_cwl_dict
+from .import_cwl import parse_cwl, parse_cwl_dict, register_process_type
+from .errors import ParseError, MissingFieldError, UnknownFieldError, InvalidValueError, UnknownClassError, \
+    ErrorCollector
+from .sourcemap import SourceMap, SourceLocation
+from .frozen import freeze
+from .template import Template
+from .canonical import canonical_string, digest
+from .packing import pack
+from .graph import GraphDocument
+from .expression import ExpressionError, compile_expression
+from .commandline import CommandLinePlan
+from .executor import LocalExecutor
+from .scheduler import WorkflowScheduler
+from .validation import JobValidator
+from .joborder import generate_jobs, write_jobs
+from .resolver import RequirementResolver
+from .containers import image_manifest
+from .fusion import fuse_steps
+from .chunking import chunk_scatter
 
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger(__name__)
@@ -34,6 +52,7 @@ _LOGGER = logging.getLogger(__name__)
 from .common import *
 from .commandlinetool import *
 from .workflow import *
+from .expressiontool import *
 from .workflowdeps import *
 from .commandlinebinding import CommandLineBinding
 from .requirements import *
@@ -0,0 +1,173 @@
+"""
+A canonical form of CWL documents, so that equivalent documents are exported to the same text,
+and a digest of that text for caches and content addressed storage.
+
+The canonical form of a document:
+
+- has the keys of every mapping sorted,
+- has the fields that can be written as a list or a map (``inputs``, ``outputs``, ``steps``, ``in``,
+  ``requirements`` and ``hints``) written as a map of ``{ $identifier: { ...fields } }``,
+- has the shorthand forms expanded, eg: ``x: File`` to ``x: { type: File }``, ``x: src`` (in the ``in``
+  of a step) to ``x: { source: src }``, and the types ``T?`` and ``T[]`` to ``[null, T]`` and
+  ``{ type: array, items: T }``, while the ``out`` of a step is written as a list of identifiers,
+- has the values (eg: the ``default`` of an input) kept as they are, only the fields of processes,
+  steps, parameters, requirements and types are rewritten,
+- is written as JSON with no whitespace between tokens, non-ASCII characters are written as they are
+  (the digest is of the UTF-8 encoding) and floats are written in their shortest round-trip form.
+
+.. code-block:: python
+
+   cwlgen.canonical_string(tool)    # '{"baseCommand":["echo"],"class":"CommandLineTool",...}'
+   cwlgen.digest(tool)              # 'sha256:4f2d...'
+"""
+
+import hashlib
+import json
+
+import ruamel.yaml
+import six
+
+from .utils import Serializable
+
+# fields of { $identifier: T } (or [T] with an 'id' field), and the field the T shorthand stands for
+_IDENTIFIED_FIELDS = {"inputs": "type", "outputs": "type", "steps": None, "in": "source"}
+_CLASS_FIELDS = {"requirements", "hints"}
+# fields of types (and of the types of SchemaDefRequirement)
+_TYPE_FIELDS = {"type", "items", "fields", "types"}
+# fields of processes, workflow steps and bindings, whose value is a process or a binding
+_OBJECT_FIELDS = {"run", "inputBinding", "outputBinding"}
+
+
+def _normalize_type(value):
+    if isinstance(value, six.string_types):
+        if value.endswith("?"):
+            return ["null", _normalize_type(value[:-1])]
+        if value.endswith("[]"):
+            return {"items": _normalize_type(value[:-2]), "type": "array"}
+        return _normalize_value(value)
+    if isinstance(value, list):
+        return [_normalize_type(v) for v in value]
+    if isinstance(value, dict):
+        return _normalize_mapping(value)
+    return value
+
+
+def _to_map(value, key):
+    # [{ $key: x, ...fields }] -> { x: { ...fields } }
+    if not isinstance(value, list):
+        return value
+    if not all(isinstance(v, dict) and key in v for v in value):
+        return value
+    return {v[key]: {k: f for k, f in v.items() if k != key} for v in value}
+
+
+def _normalize_object(value):
+    return _normalize_mapping(value) if isinstance(value, dict) else _normalize_value(value)
+
+
+def _normalize_identified(value, shorthand_field):
+    value = _to_map(value, "id")
+    if not isinstance(value, dict):
+        return _normalize_value(value)
+    retval = {}
+    for identifier in sorted(value):
+        entry = value[identifier]
+        if shorthand_field is not None and not isinstance(entry, dict):
+            entry = {shorthand_field: entry}
+        elif isinstance(entry, dict) and entry.get("id") == identifier:
+            entry = {k: v for k, v in entry.items() if k != "id"}
+        retval[identifier] = _normalize_object(entry)
+    return retval
+
+
+def _normalize_mapping(d):
+    # a process, workflow step, parameter, requirement, binding or type: the fields of the model are
+    # normalized, while the other fields (eg: default) are values that are kept as they are
+    retval = {}
+    for k in sorted(d):
+        v = d[k]
+        if v is None:
+            continue
+        if k in _IDENTIFIED_FIELDS:
+            v = _normalize_identified(v, _IDENTIFIED_FIELDS[k])
+        elif k in _CLASS_FIELDS:
+            v = _to_map(v, "class")
+            v = {c: _normalize_object(r if r is not None else {}) for c, r in sorted(v.items())} \
+                if isinstance(v, dict) else _normalize_value(v)
+        elif k in _TYPE_FIELDS:
+            v = _normalize_type(v)
+        elif k in _OBJECT_FIELDS:
+            v = _normalize_object(v)
+        elif k == "$graph" and isinstance(v, list):
+            v = [_normalize_object(process) for process in v]
+        elif k == "out" and isinstance(v, list):
+            # [{ id: x }] -> [x]
+            v = [o["id"] if isinstance(o, dict) and list(o) == ["id"] else _normalize_object(o) for o in v]
+        else:
+            v = _normalize_value(v)
+        retval[k] = v
+    return retval
+
+
+def _normalize_value(value):
+    # a value of a document (eg: the default of an input), only the literals are converted to strings
+    if isinstance(value, dict):
+        return dict((k, _normalize_value(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, six.string_types) and type(value) is not str:
+        # eg: literal
+        return str(value)
+    return value
+
+
+def normalize(value):
+    """
+    Get the canonical form of a value from ``get_dict()`` (see the module documentation).
+
+    :param value: The dictionary (eg: of a process, or of a requirement)
+    :return: A new value, the given value isn't modified
+    """
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return _normalize_object(value)
+
+
+def canonical_dict(obj):
+    """
+    :param obj: A :class:`cwlgen.utils.Serializable` (eg: a :class:`cwlgen.Workflow`), or its dictionary
+    :return: The canonical form of the dictionary of ``obj``
+    """
+    return normalize(obj.get_dict() if isinstance(obj, Serializable) else obj)
+
+
+def canonical_string(obj, format="json"):
+    """
+    Export ``obj`` in its canonical form.
+
+    :param obj: A :class:`cwlgen.utils.Serializable`, or its dictionary
+    :param format: 'json' (the form the digest is computed from), or 'yaml'
+    :type format: STRING
+    :return: STRING
+    """
+    d = canonical_dict(obj)
+    if format == "json":
+        return json.dumps(d, sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    if format == "yaml":
+        return ruamel.yaml.safe_dump(d, default_flow_style=False, allow_unicode=True, width=float("inf"))
+    raise ValueError("Unrecognised format '%s', expected 'json' or 'yaml'" % format)
+
+
+def digest(obj, algorithm="sha256"):
+    """
+    Get a digest of the canonical form of ``obj``, documents that are equivalent (up to key order
+    and shorthand forms) have the same digest.
+
+    :param obj: A :class:`cwlgen.utils.Serializable`, or its dictionary
+    :param algorithm: A hash algorithm supported by :mod:`hashlib`
+    :type algorithm: STRING
+    :return: STRING of the form ``$algorithm:$hexdigest``
+    """
+    h = hashlib.new(algorithm)
+    h.update(canonical_string(obj).encode("utf-8"))
+    return "%s:%s" % (algorithm, h.hexdigest())
@@ -0,0 +1,195 @@
+"""
+Rewrite a scattered :class:`cwlgen.WorkflowStep` so a runner schedules a job per batch of the scattered
+values, instead of a job per value:
+
+.. code-block:: python
+
+   chunked = cwlgen.chunk_scatter(workflow, "align", batch_size=1000)
+
+The step ``align`` (scattered on ``reads``) is replaced by three steps:
+
+- ``align_batches``, an :class:`cwlgen.ExpressionTool` that splits the scattered inputs into
+  arrays of ``batch_size`` values,
+- ``align_chunks``, scattered on the batches, which runs a subworkflow with the original step
+  (scattered on the values of its batch),
+- ``align``, an :class:`cwlgen.ExpressionTool` that concatenates the outputs of the batches, so the
+  outputs keep their ids and values (in the same order).
+
+Only a dotproduct (or a scatter on a single input) can be split into batches. The expression tools
+need an ``InlineJavascriptRequirement``, which they declare.
+"""
+
+import json
+
+import six
+
+from .dag import copy_object, output_type, source_id, source_type
+from .expressiontool import ExpressionTool, ExpressionToolOutputParameter
+from .requirements import InlineJavascriptRequirement, ScatterFeatureRequirement, SubworkflowFeatureRequirement
+from .workflow import Workflow
+from .workflowdeps import InputParameter, WorkflowOutputParameter, WorkflowStep, WorkflowStepInput, \
+    WorkflowStepOutput
+
+_BATCH_EXPRESSION = """${
+  var names = %s;
+  var size = %d;
+  var batches = {};
+  for (var n = 0; n < names.length; n++) {
+    var values = inputs[names[n]];
+    batches[names[n]] = [];
+    for (var i = 0; i < values.length; i += size) {
+      batches[names[n]].push(values.slice(i, i + size));
+    }
+  }
+  return batches;
+}"""
+
+_FLATTEN_EXPRESSION = """${
+  var names = %s;
+  var outputs = {};
+  for (var n = 0; n < names.length; n++) {
+    outputs[names[n]] = [].concat.apply([], inputs[names[n]]);
+  }
+  return outputs;
+}"""
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, six.string_types) else list(value)
+
+
+def _array(param_type):
+    return {"type": "array", "items": param_type}
+
+
+def _add_requirement(workflow, requirement):
+    if not any(r.get_class() == requirement.get_class() for r in workflow.requirements):
+        workflow.requirements.append(requirement)
+
+
+def _chunk(workflow, step, batch_size):
+    # the three steps that replace the step
+    workflow_id = source_id(workflow.id or "")
+    scatter = _as_list(step.scatter)
+    if not scatter:
+        raise ValueError("The step '%s' isn't scattered" % step.id)
+    if len(scatter) > 1 and step.scatterMethod not in (None, "dotproduct"):
+        raise ValueError("The %s scatter of the step '%s' can't be split into batches" % (step.scatterMethod, step.id))
+    inputs = dict((i.id, i) for i in step.inputs)
+    for name in scatter:
+        if name not in inputs or inputs[name].source is None:
+            raise ValueError("The scattered input '%s' of the step '%s' has no source" % (name, step.id))
+
+    batches_id, chunks_id = step.id + "_batches", step.id + "_chunks"
+    existing = set(s.id for s in workflow.steps)
+    for step_id in (batches_id, chunks_id):
+        if step_id in existing:
+            raise ValueError("The workflow already has a step '%s'" % step_id)
+
+    # split the scattered inputs into batches
+    batch_tool = ExpressionTool(batches_id, expression=_BATCH_EXPRESSION % (json.dumps(scatter), batch_size),
+                                cwl_version=None)
+    batch_tool.requirements.append(InlineJavascriptRequirement())
+    batches = WorkflowStep(batches_id, run=batch_tool)
+    for name in scatter:
+        step_input = inputs[name]
+        sources = _as_list(step_input.source)
+        param_type = source_type(workflow, source_id(sources[0], workflow_id)) if len(sources) == 1 else "Any"
+        values_type = param_type if param_type != "Any" else _array("Any")
+        param = InputParameter(name)
+        param.type = values_type
+        batch_tool.inputs.append(param)
+        output = ExpressionToolOutputParameter(name)
+        output.type = _array(values_type)
+        batch_tool.outputs.append(output)
+        batches.inputs.append(WorkflowStepInput(name, source=step_input.source, link_merge=step_input.linkMerge))
+        batches.out.append(WorkflowStepOutput(name))
+
+    # run the original step on each batch
+    sub = Workflow(chunks_id, cwl_version=None)
+    inner = copy_object(step)
+    inner.inputs = []
+    chunks = WorkflowStep(chunks_id, run=sub, scatter=scatter if len(scatter) > 1 else scatter[0],
+                          scatter_method="dotproduct" if len(scatter) > 1 else None)
+    for step_input in step.inputs:
+        inner_input = copy_object(step_input)
+        inner.inputs.append(inner_input)
+        if step_input.source is None:
+            continue
+        param = InputParameter(step_input.id)
+        if step_input.id in scatter:
+            param.type = batch_tool.inputs[scatter.index(step_input.id)].type
+            chunks.inputs.append(WorkflowStepInput(step_input.id, source="%s/%s" % (batches_id, step_input.id)))
+        else:
+            sources = _as_list(step_input.source)
+            param.type = source_type(workflow, source_id(sources[0], workflow_id)) if len(sources) == 1 else "Any"
+            chunks.inputs.append(WorkflowStepInput(step_input.id, source=step_input.source,
+                                                   link_merge=step_input.linkMerge))
+        # the subworkflow gets the merged value of the sources
+        inner_input.source = step_input.id
+        inner_input.linkMerge = None
+        sub.inputs.append(param)
+    sub.steps.append(inner)
+
+    # concatenate the outputs of the batches
+    flatten_tool = ExpressionTool(step.id, cwl_version=None)
+    flatten_tool.requirements.append(InlineJavascriptRequirement())
+    flatten = WorkflowStep(step.id, run=flatten_tool)
+    output_ids = [o if isinstance(o, six.string_types) else o.id for o in step.out]
+    flatten_tool.expression = _FLATTEN_EXPRESSION % json.dumps(output_ids)
+    for output_id in output_ids:
+        param_type = output_type(step, output_id) or "Any"
+        sub_output = WorkflowOutputParameter(output_id, output_source="%s/%s" % (step.id, output_id))
+        sub_output.type = _array(param_type)
+        sub.outputs.append(sub_output)
+        chunks.out.append(WorkflowStepOutput(output_id))
+
+        param = InputParameter(output_id)
+        param.type = _array(_array(param_type))
+        flatten_tool.inputs.append(param)
+        output = ExpressionToolOutputParameter(output_id)
+        output.type = _array(param_type)
+        flatten_tool.outputs.append(output)
+        flatten.inputs.append(WorkflowStepInput(output_id, source="%s/%s" % (chunks_id, output_id)))
+        flatten.out.append(WorkflowStepOutput(output_id))
+    return [batches, chunks, flatten]
+
+
+def chunk_scatter(workflow, steps, batch_size=1000):
+    """
+    Split the scatter of steps into batches (see the module documentation).
+
+    :param workflow: The workflow, it isn't modified (the new workflow shares its parameters and processes)
+    :type workflow: :class:`cwlgen.Workflow`
+    :param steps: The ids of the scattered steps to split
+    :type steps: STRING | list[STRING]
+    :param batch_size: The number of values of each batch
+    :type batch_size: INT
+    :return: The new workflow
+    :rtype: :class:`cwlgen.Workflow`
+    """
+    if not isinstance(workflow, Workflow):
+        raise TypeError("Only the steps of a cwlgen.Workflow object can be split into batches")
+    if batch_size < 1:
+        raise ValueError("The size of the batches must be at least 1")
+    steps = _as_list(steps)
+    by_id = dict((s.id, s) for s in workflow.steps)
+    for step_id in steps:
+        if step_id not in by_id:
+            raise KeyError("The workflow has no step '%s'" % step_id)
+
+    retval = copy_object(workflow)
+    retval.inputs, retval.outputs = list(workflow.inputs), list(workflow.outputs)
+    retval.requirements, retval.hints = list(workflow.requirements), list(workflow.hints)
+    retval.steps = []
+    for step in workflow.steps:
+        if step.id in steps:
+            retval.steps.extend(_chunk(workflow, step, batch_size))
+        else:
+            retval.steps.append(step)
+    if steps:
+        _add_requirement(retval, SubworkflowFeatureRequirement())
+        _add_requirement(retval, ScatterFeatureRequirement())
+    return retval
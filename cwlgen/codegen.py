@@ -0,0 +1,209 @@
+"""
+Code generation for the :class:`cwlgen.utils.Serializable` converters.
+
+The reflective converters in :class:`cwlgen.utils.Serializable` look up the attributes, the
+``parse_types``, the required / ignored fields and the initialiser arguments of a class every time
+an object is converted. This module compiles (on first use) a specialised ``to_dict`` and
+``from_dict`` function for each class with all of these resolved up front, so the converters
+are reduced to straight-line attribute and dictionary access.
+
+The compiled functions are cached per class, if you change the ``parse_types``, ``required_fields``
+or ``ignore_fields_*`` of a class after it has been converted, call :func:`clear_cache`.
+"""
+
+import inspect
+
+import six
+
+from .errors import get_context, report, ParseError, MissingFieldError, UnknownFieldError
+
+_PRIMITIVES = (str, int, float, bool)
+_CONTAINERS = (list, dict)
+
+_serializers = {}   # type: {(type, tuple), function}
+_parsers = {}       # type: {type, function}
+
+
+def clear_cache():
+    """
+    Remove all of the compiled converters, they'll be regenerated on next use.
+    """
+    _serializers.clear()
+    _parsers.clear()
+
+
+def get_init_params(T):
+    """
+    Get the names of the required arguments of ``T.__init__``, and the name of the argument that
+    holds the identifier of the object (``id`` or ``*_id``), if there's exactly one.
+
+    :param T: The class to inspect
+    :return: (list[str], str | None)
+    """
+    try:
+        argspec = inspect.getfullargspec(T.__init__)
+    except AttributeError:
+        # we're in Python 2
+        argspec = inspect.getargspec(T.__init__)
+
+    args, defaults = argspec.args, argspec.defaults
+    required_param_keys = args[1:-len(defaults)] if defaults is not None and len(defaults) > 0 else args[1:]
+
+    inspect_ignore_keys = {"self", "args", "kwargs"}
+    id_field_names = [k for k in required_param_keys if k == "id" or k.endswith("_id")]
+    id_field_name = None
+
+    if len(id_field_names) == 1:
+        id_field_name = id_field_names[0]
+        inspect_ignore_keys.add(id_field_name)
+    elif len(id_field_names) > 1:
+        print("Warning, can't determine if there are multiple id fieldnames")
+
+    return [k for k in required_param_keys if k not in inspect_ignore_keys], id_field_name
+
+
+def _compile(source, name, namespace):
+    code = compile(source, "<cwlgen.codegen: %s>" % name, "exec")
+    six.exec_(code, namespace)
+    return namespace[name]
+
+
+def generate_serializer_source(fields, required_fields, ignore_fields):
+    """
+    Generate the source of a ``to_dict(attrs)`` function for objects with the attributes ``fields``.
+    """
+    lines = ["def to_dict(attrs):", "    d = {}"]
+    for k in fields:
+        is_required = k in required_fields
+        should_skip = k.startswith("_") or k in ignore_fields or k == "ignore_attributes"
+        if should_skip and not is_required:
+            continue
+        lines.extend([
+            "    v = attrs[%r]" % k,
+            "    if v is not None:",
+            "        if v.__class__ not in _PRIMITIVES:",
+            "            v = _serialize(v)",
+            "        if v is not None and (v or not isinstance(v, _CONTAINERS)):",
+            "            d[%r] = v" % k,
+        ])
+    lines.append("    return d")
+    return "\n".join(lines) + "\n"
+
+
+def get_serializer(cls, attrs, serialize):
+    """
+    Get the compiled ``to_dict(attrs)`` function for an instance of ``cls`` with the attributes ``attrs``.
+
+    :param cls: The type of the object
+    :param attrs: The ``vars`` of the object
+    :param serialize: The function to serialize nested (non primitive) values with
+    """
+    instance_ignore = attrs.get("ignore_attributes")
+    key = (cls, tuple(attrs), tuple(instance_ignore) if instance_ignore else None)
+    to_dict = _serializers.get(key)
+    if to_dict is None:
+        ignore_fields = set(instance_ignore or [])
+        ignore_fields.update(cls.ignore_fields_on_convert or [])
+        source = generate_serializer_source(key[1], set(cls.required_fields or []), ignore_fields)
+        namespace = {"_PRIMITIVES": _PRIMITIVES, "_CONTAINERS": _CONTAINERS, "_serialize": serialize}
+        to_dict = _serializers[key] = _compile(source, "to_dict", namespace)
+    return to_dict
+
+
+def generate_parser_source(init_params, id_field_name, required_fields):
+    """
+    Generate the source of a ``from_dict(d, identifier, renamed_fields)`` function, see
+    :meth:`cwlgen.utils.Serializable.parse_dict_generic` for the semantics.
+    """
+    kwargs = ["%s=d[%r]" % (k, k) for k in init_params]
+    if id_field_name:
+        kwargs.append("%s=identifier if identifier is not None else d.get('id')" % id_field_name)
+
+    lines = [
+        "def from_dict(d, identifier=None, renamed_fields=None):",
+        "    if not isinstance(d, dict):",
+        "        return None",
+    ]
+    if init_params:
+        lines.extend([
+            "    if %s:" % " or ".join("%r not in d" % k for k in init_params),
+            "        return None",
+        ])
+    lines.extend([
+        "    self = _T(%s)" % ", ".join(kwargs),
+        "    attrs = self.__dict__",
+        "    context = _get_context()",
+        "    path = None",
+        "    if context is not None:",
+        "        if context.collector is not None:",
+        "            path = context.path",
+        "        if context.source_map is not None:",
+        "            context.source_map.add_mapping(self, context.document, d)",
+    ])
+    if required_fields:
+        lines.append("    seen = set()")
+    lines.extend([
+        "    for k, v in d.items():",
+        "        if renamed_fields:",
+        "            k = renamed_fields.get(k, k)",
+        "        if k in _IGNORE or (identifier is not None and k == 'id'):",
+        "            continue",
+        "        types = _PARSE_TYPES.get(k)",
+        "        if types is not None:",
+        "            if path is not None:",
+        "                path.append(k)",
+        "                v = _try_parse(v, types)",
+        "                path.pop()",
+        "            else:",
+        "                try:",
+        "                    v = _try_parse(v, types)",
+        "                except _ParseError as e:",
+        "                    e.path.insert(0, k)",
+        "                    raise",
+        "        if v is None:",
+        "            continue",
+        "        if k not in attrs and not hasattr(self, k):",
+        "            _report(_UnknownFieldError(\"Key '%s' does not exist on type '%s'\" % (k, type(self))), d, k)",
+        "            continue",
+        "        setattr(self, k, v)",
+    ])
+    if required_fields:
+        lines.extend([
+            "        seen.add(k)",
+            "    if identifier is not None:",
+            "        seen.add('id')",
+            "    if %s:" % " or ".join("%r not in seen" % r for r in required_fields),
+            "        req_fields = ', '.join(r for r in _REQUIRED if r not in seen)",
+            "        _report(_MissingFieldError(\"The fields %s were not found when parsing type '%s'\"",
+            "                                   % (req_fields, _T.__name__)), d)",
+        ])
+    lines.append("    return self")
+    return "\n".join(lines) + "\n"
+
+
+def get_parser(T, try_parse):
+    """
+    Get the compiled ``from_dict(d, identifier=None, renamed_fields=None)`` function for the type ``T``.
+
+    :param T: The type to parse
+    :param try_parse: The function to parse the fields with a ``parse_types`` hint
+    """
+    from_dict = _parsers.get(T)
+    if from_dict is None:
+        required_fields = list(getattr(T, "required_fields", None) or [])
+        init_params, id_field_name = get_init_params(T)
+        source = generate_parser_source(init_params, id_field_name, required_fields)
+        namespace = {
+            "_T": T,
+            "_IGNORE": frozenset(getattr(T, "ignore_fields_on_parse", None) or []),
+            "_PARSE_TYPES": dict(getattr(T, "parse_types", None) or {}),
+            "_REQUIRED": required_fields,
+            "_try_parse": try_parse,
+            "_get_context": get_context,
+            "_ParseError": ParseError,
+            "_report": report,
+            "_MissingFieldError": MissingFieldError,
+            "_UnknownFieldError": UnknownFieldError,
+        }
+        from_dict = _parsers[T] = _compile(source, "from_dict", namespace)
+    return from_dict
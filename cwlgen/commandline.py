@@ -0,0 +1,260 @@
+"""
+Build the command line of a :class:`cwlgen.CommandLineTool` for a job (the values of its inputs).
+
+A :class:`CommandLinePlan` compiles the ``baseCommand``, ``arguments`` and input bindings of a tool
+into a list of renderers in the order of their sorting keys (see
+https://www.commonwl.org/v1.0/CommandLineTool.html#Input_binding), so rendering a job only walks
+the values of the job:
+
+.. code-block:: python
+
+   plan = cwlgen.CommandLinePlan(tool)
+   plan.render({"reads": {"class": "File", "path": "/data/a.fq"}, "threads": 4})
+   # ['bwa', 'mem', '-t', '4', '/data/a.fq']
+   for argv in plan.render_many(jobs):
+       ...
+
+``valueFrom`` and arguments can contain parameter references (eg: ``$(inputs.reads.nameroot)``),
+which are compiled by :func:`cwlgen.expression.compile_expression`, or by the ``compile_expression``
+function given to the plan (eg: to support JavaScript).
+"""
+
+import re
+from operator import itemgetter
+
+import six
+from six.moves import shlex_quote
+
+from .canonical import normalize
+from .expression import compile_expression as compile_parameter_reference
+from .utils import Serializable
+
+_EXPRESSION_PATTERN = re.compile(r"\$[({]")
+
+
+def is_expression(value):
+    """
+    :return: Whether ``value`` is a string that contains a parameter reference or expression, eg: ``$(inputs.x)``
+    """
+    return isinstance(value, six.string_types) and _EXPRESSION_PATTERN.search(value) is not None
+
+
+def format_arg(value):
+    """
+    Format a value (of a job) as a command line argument.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict) and value.get("class") in ("File", "Directory"):
+        path = value.get("path")
+        if path is None:
+            path = value.get("location", "")
+            if path.startswith("file://"):
+                path = path[len("file://"):]
+        return path
+    return six.text_type(value) if not isinstance(value, str) else value
+
+
+class _Unquoted(str):
+    # an argument with shellQuote: false (with a ShellCommandRequirement), see CommandLinePlan.render_string
+    pass
+
+
+def _find_schema(param_type, schema_type):
+    # the schema of the type (or the first of a union of types) that's a { type: $schema_type }
+    if isinstance(param_type, dict):
+        return param_type if param_type.get("type") == schema_type else None
+    if isinstance(param_type, list):
+        for t in param_type:
+            schema = _find_schema(t, schema_type)
+            if schema is not None:
+                return schema
+    return None
+
+
+def _sort_key(position, index, name):
+    # the numbers of the arguments sort before the names of the inputs (with the same position)
+    return (position or 0, 0 if name is None else 1, index, name or "")
+
+
+class CommandLinePlan(object):
+    """
+    The compiled command line of a tool, which renders the arguments of many jobs.
+    """
+
+    def __init__(self, tool, compile_expression=None):
+        """
+        :param tool: The tool, or its dictionary
+        :type tool: :class:`cwlgen.CommandLineTool` | dict
+        :param compile_expression: Compiles the expressions in the tool, returns a function of
+                                   ``(inputs, self, runtime)`` that evaluates the expression
+                                   (default: only parameter references are supported)
+        :type compile_expression: (STRING) -> ((dict, any, dict) -> any)
+        """
+        self.compile_expression = compile_expression or compile_parameter_reference
+        d = normalize(tool.get_dict() if isinstance(tool, Serializable) else tool)
+        self.shell = "ShellCommandRequirement" in (d.get("requirements") or {})
+
+        base_command = d.get("baseCommand")
+        if isinstance(base_command, six.string_types):
+            base_command = [base_command]
+        self.base_command = list(base_command or [])
+
+        renderers = []
+        for i, argument in enumerate(d.get("arguments") or []):
+            binding = {"valueFrom": argument} if not isinstance(argument, dict) else argument
+            renderers.append((_sort_key(binding.get("position"), i, None), self._compile_argument(binding)))
+
+        self.defaults = {}
+        for name, param in (d.get("inputs") or {}).items():
+            if "default" in param:
+                self.defaults[name] = param["default"]
+            binding = param.get("inputBinding")
+            render_value = self._compile_value(param.get("type"), binding)
+            if render_value is not None:
+                position = binding.get("position") if binding else None
+                renderers.append((_sort_key(position, 0, name), self._compile_input(name, render_value)))
+
+        renderers.sort(key=itemgetter(0))
+        self._renderers = [r for _, r in renderers]
+
+    def _compile_value_from(self, value_from):
+        if is_expression(value_from):
+            return self.compile_expression(value_from)
+        # a constant
+        return lambda inputs, self_value, runtime: value_from
+
+    def _compile_argument(self, binding):
+        render = self._compile_binding(binding)
+
+        def render_argument(inputs, out, runtime):
+            render(None, inputs, out, runtime)
+        return render_argument
+
+    def _compile_input(self, name, render_value):
+        defaults = self.defaults
+
+        def render_input(inputs, out, runtime):
+            value = inputs.get(name)
+            if value is None:
+                value = defaults.get(name)
+                if value is None:
+                    return
+            render_value(value, inputs, out, runtime)
+        return render_input
+
+    def _compile_value(self, param_type, binding):
+        """
+        :return: A function of ``(value, inputs, out, runtime)`` that renders the value of this type
+                 (and binding), or None if nothing's rendered for it
+        """
+        item_render = None
+        array_schema = _find_schema(param_type, "array")
+        if array_schema is not None:
+            item_render = self._compile_value(array_schema.get("items"), array_schema.get("inputBinding"))
+
+        field_renders = None
+        record_schema = _find_schema(param_type, "record")
+        if record_schema is not None:
+            field_renders = []
+            for field in record_schema.get("fields") or []:
+                name = field.get("name")
+                field_binding = field.get("inputBinding")
+                render_field = self._compile_value(field.get("type"), field_binding)
+                if render_field is not None:
+                    position = field_binding.get("position") if field_binding else None
+                    field_renders.append((_sort_key(position, 0, name), name, render_field))
+            field_renders.sort(key=itemgetter(0))
+            field_renders = [(name, render) for _, name, render in field_renders] or None
+
+        if binding is None and item_render is None and field_renders is None:
+            return None
+        return self._compile_binding(binding or {}, item_render, field_renders, nested_only=binding is None)
+
+    def _compile_binding(self, binding, item_render=None, field_renders=None, nested_only=False):
+        prefix = binding.get("prefix")
+        separate = binding.get("separate", True)
+        item_separator = binding.get("itemSeparator")
+        value_from = binding.get("valueFrom")
+        evaluate = self._compile_value_from(value_from) if value_from is not None else None
+        arg_type = _Unquoted if self.shell and binding.get("shellQuote") is False else str
+
+        def add(text, out):
+            if prefix is None:
+                out.append(arg_type(text))
+            elif separate:
+                out.append(arg_type(prefix))
+                out.append(arg_type(text))
+            else:
+                out.append(arg_type(prefix + text))
+
+        def render(value, inputs, out, runtime):
+            if evaluate is not None:
+                value = evaluate(inputs, value, runtime)
+            if value is None or value is False:
+                return
+            if value is True:
+                if prefix is not None and not nested_only:
+                    out.append(arg_type(prefix))
+                return
+            if isinstance(value, list):
+                if not value:
+                    return
+                if item_separator is not None:
+                    if not nested_only:
+                        add(item_separator.join(format_arg(v) for v in value), out)
+                    return
+                if prefix is not None and not nested_only:
+                    out.append(arg_type(prefix))
+                if item_render is not None:
+                    for v in value:
+                        item_render(v, inputs, out, runtime)
+                elif not nested_only:
+                    out.extend(arg_type(format_arg(v)) for v in value)
+                return
+            if isinstance(value, dict) and value.get("class") not in ("File", "Directory"):
+                # a record, only its fields with a binding are rendered
+                if prefix is not None and not nested_only:
+                    out.append(arg_type(prefix))
+                for name, render_field in field_renders or []:
+                    field_value = value.get(name)
+                    if field_value is not None:
+                        render_field(field_value, inputs, out, runtime)
+                return
+            if not nested_only:
+                add(format_arg(value), out)
+
+        return render
+
+    def render(self, job, runtime=None):
+        """
+        :param job: The values of the inputs of the tool, by input id
+        :type job: dict
+        :param runtime: The ``runtime`` of the expressions, eg: ``{"outdir": ..., "cores": 1}``
+        :type runtime: dict
+        :return: The command line as a list of arguments
+        """
+        out = list(self.base_command)
+        for render in self._renderers:
+            render(job, out, runtime)
+        return out
+
+    def render_many(self, jobs, runtime=None):
+        """
+        Render the command line of each job in ``jobs``.
+
+        :return: A generator of the command lines
+        """
+        renderers, base_command = self._renderers, self.base_command
+        for job in jobs:
+            out = list(base_command)
+            for render in renderers:
+                render(job, out, runtime)
+            yield out
+
+    def render_string(self, job, runtime=None):
+        """
+        :return: The command line as a string for a shell, the arguments are quoted unless their binding
+                 has ``shellQuote: false`` (with a ShellCommandRequirement)
+        """
+        return " ".join(a if isinstance(a, _Unquoted) else shlex_quote(a) for a in self.render(job, runtime))
@@ -1,12 +1,9 @@
 import logging
 
-# External libraries
-import ruamel.yaml
-
 from cwlgen.commandlinebinding import CommandLineBinding
-from .common import CWL_VERSIONS, DEF_VERSION, CWL_SHEBANG, Namespaces, Parameter
+from .common import export_process_string, CWL_VERSIONS, DEF_VERSION, CWL_SHEBANG, Namespaces, Parameter
 from .requirements import *
-from .utils import literal, literal_presenter, Serializable, value_or_default
+from .utils import Serializable, value_or_default
 
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger(__name__)
@@ -151,8 +148,8 @@ class CommandLineTool(Serializable):
 
     required_fields = ["inputs", "outputs"]
     parse_types = {'inputs': [[CommandInputParameter]], "outputs": [[CommandOutputParameter]]}
-    ignore_fields_on_parse = ["namespaces", "class", "requirements"]
-    ignore_fields_on_convert = ["namespaces", "class", "metadata", "requirements"]
+    ignore_fields_on_parse = ["namespaces", "class", "requirements", "hints"]
+    ignore_fields_on_convert = ["namespaces", "class", "metadata", "requirements", "hints"]
 
     def __init__(
         self,
@@ -232,11 +229,12 @@ class CommandLineTool(Serializable):
 
         if self.metadata:
             for key, value in self.metadata.__dict__.items():
-                d["s:" + key] = value
+                if not key.startswith("_"):
+                    d["s:" + key] = self.serialize(value)
             # - Add Namespaces
             d[self.namespaces.name] = {}
             for k, v in self.namespaces.__dict__.items():
-                if "$" not in v:
+                if not k.startswith("_") and "$" not in v:
                     d[self.namespaces.name][k] = v
 
         if "inputs" not in d:
@@ -246,59 +244,46 @@ class CommandLineTool(Serializable):
             d["outputs"] = {}
 
         if self.requirements:
-            d["requirements"] = {r.get_class(): r.get_dict() for r in self.requirements}
+            d["requirements"] = get_requirements_dict(self.requirements)
         if self.hints:
-            d["hints"] = {r.get_class(): r.get_dict() for r in self.hints}
+            d["hints"] = get_requirements_dict(self.hints)
 
         return d
 
     @classmethod
     def parse_dict(cls, d):
         clt = super(CommandLineTool, cls).parse_dict(d)
-
-        reqs = d.get("requirements")
-        if reqs:
-            if isinstance(reqs, list):
-                clt.requirements = [Requirement.parse_dict(r) for r in reqs]
-            elif isinstance(reqs, dict):
-                # splat operator here would be so nice {**r, "class": c}
-                clt.requirements = []
-                for c, r in reqs.items():
-                    rdict = {'class': c}
-                    rdict.update(r)
-                    clt.requirements.append(Requirement.parse_dict(rdict))
-
-        hnts = d.get("hints")
-        if hnts:
-            if isinstance(hnts, list):
-                clt.hints = [Requirement.parse_dict(r) for r in hnts]
-            elif isinstance(hnts, dict):
-                # splat operator here would be so nice {**r, "class": c}
-                clt.hints = []
-                for c, r in hnts.items():
-                    rdict = {'class': c}
-                    rdict.update(r)
-                    clt.hints.append(Requirement.parse_dict(rdict))
-
+        if clt is None:
+            return None
+        clt.requirements = parse_requirements(d.get("requirements"), "requirements")
+        clt.hints = parse_requirements(d.get("hints"), "hints")
         return clt
 
-    def export_string(self):
-        ruamel.yaml.add_representer(literal, literal_presenter)
-        cwl_tool = self.get_dict()
-        return ruamel.yaml.dump(cwl_tool, default_flow_style=False)
+    def export_string(self, round_trip=True, canonical=False, compact=False):
+        """
+        :param round_trip: If this was parsed with ``round_trip=True``, only re-emit the fields that were
+                           modified, keeping the comments, key order and formatting of the original document.
+        :param canonical: Export the canonical form of the document (see :mod:`cwlgen.canonical`)
+        :param compact: Use the CWL shorthand forms wherever they're equivalent (see :mod:`cwlgen.compact`)
+        :raises ValueError: If both ``canonical`` and ``compact`` are set
+        """
+        return export_process_string(self, round_trip=round_trip, canonical=canonical, compact=compact)
 
     def export(self, outfile=None):
         """
         Export the tool in CWL either on STDOUT or in outfile.
         """
         rep = self.export_string()
+        shebang = "" if rep.startswith("#!") else CWL_SHEBANG
 
         # Write CWL file in YAML
         if outfile is None:
-            six.print_(CWL_SHEBANG, "\n", sep="")
+            if shebang:
+                six.print_(shebang, "\n", sep="")
             six.print_(rep)
         else:
             out_write = open(outfile, "w")
-            out_write.write(CWL_SHEBANG + "\n\n")
+            if shebang:
+                out_write.write(shebang + "\n\n")
             out_write.write(rep)
             out_write.close()
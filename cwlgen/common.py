@@ -1,6 +1,11 @@
 import logging
 
-from .utils import Serializable
+import ruamel.yaml
+
+from .canonical import canonical_string
+from .compact import dump_compact
+from .roundtrip import dump_round_trip
+from .utils import literal, literal_presenter, Serializable
 
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger(__name__)
@@ -85,7 +90,7 @@ def get_type_dict(param_type):
     elif isinstance(param_type, list):
         return [get_type_dict(p) for p in param_type]
     elif isinstance(param_type, dict):
-        return param_type
+        return Serializable.serialize(param_type)
     elif getattr(param_type, 'get_dict', None) and callable(getattr(param_type, 'get_dict', None)):
         return param_type.get_dict()
     else:
@@ -95,6 +100,37 @@ def get_type_dict(param_type):
 
 #  Class(es)  ------------------------------
 
+def export_process_string(process, round_trip=True, canonical=False, compact=False, packed=False):
+    """
+    Export a process (eg: a :class:`cwlgen.CommandLineTool`) as YAML, in one of the forms of its ``export_string``.
+
+    :param round_trip: If the process was parsed with ``round_trip=True``, only re-emit the fields that were
+                       modified, keeping the comments, key order and formatting of the original document.
+                       This only applies to the default form.
+    :param canonical: Export the canonical form of the document (see :mod:`cwlgen.canonical`)
+    :param compact: Use the CWL shorthand forms wherever they're equivalent (see :mod:`cwlgen.compact`)
+    :param packed: Export the process and the processes its steps run as a single document (see
+                   :meth:`cwlgen.Workflow.pack`)
+    :return: STRING
+    :raises ValueError: If more than one of ``canonical``, ``compact`` and ``packed`` is set
+    """
+    forms = [name for name, value in (("canonical", canonical), ("compact", compact), ("packed", packed)) if value]
+    if len(forms) > 1:
+        raise ValueError("Only one of canonical, compact and packed can be set, not %s" % " and ".join(forms))
+    if canonical:
+        return canonical_string(process, format="yaml")
+    if compact:
+        return dump_compact(process)
+    ruamel.yaml.add_representer(literal, literal_presenter)
+    if packed:
+        return ruamel.yaml.dump(process.pack(), default_flow_style=False)
+    d = process.get_dict()
+    source = getattr(process, "_round_trip_source", None)
+    if round_trip and source is not None:
+        return dump_round_trip(source, d)
+    return ruamel.yaml.dump(d, default_flow_style=False)
+
+
 class CwlTypes:
     DEF_TYPE = "null"
 
@@ -175,8 +211,10 @@ class Parameter(Serializable):
 
     @classmethod
     def parse_with_id(cls, d, identifier):
-        d["id"] = identifier
-        return super(Parameter, cls).parse_dict(d)
+        if isinstance(d, (str, list)):
+            # shorthand for { $identifier: { type: $type } }
+            d = {"type": d}
+        return cls.parse_dict_generic(cls, d, identifier=identifier)
 
     # @classmethod
     # def parse_dict(cls, d):
@@ -249,7 +287,7 @@ class CommandInputRecordSchema(Serializable):
             self.label = label
 
         def get_dict(self):
-            d = super(type(self), self).get_dict()
+            d = super(CommandInputRecordSchema.CommandInputRecordField, self).get_dict()
             d["type"] = get_type_dict(self.type)
             return d
 
@@ -0,0 +1,103 @@
+"""
+A compact form of CWL documents, which uses the CWL shorthand forms wherever they're equivalent
+to the full form, to reduce the size of generated documents (and the time to parse them):
+
+- the fields that can be written as a list or a map (``inputs``, ``outputs``, ``steps``, ``in``,
+  ``requirements`` and ``hints``) are written as a map, so the identifiers aren't repeated,
+- an input or output that only has a type is written as ``x: T``, and a step input that only has
+  a source is written as ``x: src``,
+- the types ``[null, T]`` and ``{ type: array, items: T }`` are written as ``T?`` and ``T[]``,
+- the ``out`` of a step is written as a list of identifiers.
+
+.. code-block:: python
+
+   workflow.export_string(compact=True)
+"""
+
+import ruamel.yaml
+import six
+
+from .canonical import normalize, _CLASS_FIELDS, _IDENTIFIED_FIELDS, _OBJECT_FIELDS
+from .utils import Serializable
+
+
+def _compact_type(value):
+    if isinstance(value, list):
+        items = [_compact_type(v) for v in value]
+        if len(items) == 2 and "null" in items:
+            other = items[1 - items.index("null")]
+            if isinstance(other, six.string_types) and not other.endswith("?"):
+                return other + "?"
+        return items
+    if isinstance(value, dict):
+        if set(value) == {"type", "items"} and value["type"] == "array":
+            items = _compact_type(value["items"])
+            if isinstance(items, six.string_types) and not items.endswith("?"):
+                return items + "[]"
+        return _compact_mapping(value)
+    return value
+
+
+def _compact_mapping(d):
+    # a process, workflow step, parameter, requirement or type of the canonical form (see
+    # cwlgen.canonical), the values (eg: default) are kept as they are
+    retval = {}
+    for k, v in d.items():
+        if k in _IDENTIFIED_FIELDS and isinstance(v, dict):
+            shorthand_field = _IDENTIFIED_FIELDS[k]
+            v = {identifier: _compact_entry(entry, shorthand_field) for identifier, entry in v.items()}
+        elif k in _CLASS_FIELDS and isinstance(v, dict):
+            v = {c: _compact_object(r) for c, r in v.items()}
+        elif k in ("type", "items"):
+            v = _compact_type(v)
+        elif k in ("fields", "types") and isinstance(v, list):
+            v = [_compact_type(t) for t in v]
+        elif k in _OBJECT_FIELDS:
+            v = _compact_object(v)
+        elif k == "$graph" and isinstance(v, list):
+            v = [_compact_object(process) for process in v]
+        retval[k] = v
+    return retval
+
+
+def _compact_entry(entry, shorthand_field):
+    if not isinstance(entry, dict):
+        return entry
+    entry = _compact_mapping(entry)
+    if shorthand_field is not None and list(entry) == [shorthand_field]:
+        value = entry[shorthand_field]
+        # eg: x: File, x: [null, File] and (in the 'in' of a step) x: src, x: [src1, src2]
+        if isinstance(value, (six.string_types, list)):
+            return value
+    return entry
+
+
+def _compact_object(value):
+    return _compact_mapping(value) if isinstance(value, dict) else value
+
+
+def compact(value):
+    """
+    Get the compact form of a document.
+
+    :param value: A :class:`cwlgen.utils.Serializable`, or its dictionary
+    :return: A new dictionary, the given value isn't modified
+    """
+    if isinstance(value, Serializable):
+        value = value.get_dict()
+    # start from the canonical form, where the list and map forms (and the shorthands) are consistent
+    value = normalize(value)
+    if isinstance(value, list):
+        return [_compact_object(v) for v in value]
+    return _compact_object(value)
+
+
+def dump_compact(value):
+    """
+    Export the compact form of a document as YAML, with the collections that only contain scalars
+    written in flow style (eg: ``out: [a, b]``).
+
+    :param value: A :class:`cwlgen.utils.Serializable`, or its dictionary
+    :return: STRING
+    """
+    return ruamel.yaml.safe_dump(compact(value), default_flow_style=None, allow_unicode=True)
@@ -0,0 +1,95 @@
+"""
+List the container images that the steps of a workflow use, so they can be pulled before it runs:
+
+.. code-block:: python
+
+   cwlgen.image_manifest(workflow)
+   # [{'image': {'dockerPull': 'biocontainers/bwa:0.7.17'}, 'steps': ['align', 'qc/align'], 'count': 2,
+   #   'required': True},
+   #  {'image': {'dockerPull': 'biocontainers/samtools:1.9'}, 'steps': ['sort'], 'count': 1, 'required': False}]
+
+The image of each step is its effective ``DockerRequirement`` (the requirement, or else the hint,
+declared by the process it runs, the step, or the workflows it's in, see :class:`cwlgen.RequirementResolver`).
+The steps of the subworkflows are included, and the images are listed in the order the steps can
+first run (the topological order of the steps). ``required`` is False when the image is only a hint.
+"""
+
+import json
+
+import six
+
+from .dag import topological_order
+from .resolver import RequirementResolver
+from .utils import Serializable
+
+IMAGE_FIELDS = ["dockerPull", "dockerImageId", "dockerLoad", "dockerFile", "dockerImport"]
+
+
+def _is_workflow(process):
+    if isinstance(process, Serializable):
+        return getattr(process, "steps", None) is not None
+    return isinstance(process, dict) and process.get("class") == "Workflow"
+
+
+def _steps(resolver, workflow, prefix):
+    # the paths of the steps that run a tool, in topological order, including the steps of subworkflows
+    for step_id in topological_order(workflow):
+        path = prefix + step_id
+        process = resolver.process(path)
+        if _is_workflow(process):
+            for inner in _steps(resolver, process, path + "/"):
+                yield inner
+        else:
+            yield path
+
+
+def image_manifest(workflow, resolve=None, resolver=None):
+    """
+    :param workflow: The workflow, or its dictionary
+    :type workflow: :class:`cwlgen.Workflow` | dict
+    :param resolve: Called with the ``run`` of a step when it's a reference to another document (eg: a path),
+                    and returns the process (or its dictionary), or None to ignore its requirements
+    :type resolve: (STRING) -> Serializable | dict | None
+    :param resolver: The resolver of the requirements of the workflow, if there's already one
+    :type resolver: :class:`cwlgen.RequirementResolver`
+    :return: The images, in the order the steps use them first, with the paths of the steps that use them
+    :rtype: list[dict]
+    """
+    if resolver is None:
+        resolver = RequirementResolver(workflow, resolve=resolve)
+    manifest = []
+    entries = {}    # {the image as JSON, entry}
+    for path in _steps(resolver, workflow, ""):
+        required = True
+        docker = resolver.requirements(path).get("DockerRequirement")
+        if docker is None:
+            docker, required = resolver.hints(path).get("DockerRequirement"), False
+        if not docker:
+            continue
+        image = dict((field, docker[field]) for field in IMAGE_FIELDS if docker.get(field) is not None)
+        if not image:
+            continue
+        key = json.dumps(image, sort_keys=True)
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = {"image": image, "steps": [], "count": 0, "required": False}
+            manifest.append(entry)
+        entry["steps"].append(path)
+        entry["count"] += 1
+        entry["required"] = entry["required"] or required
+    return manifest
+
+
+def image_references(workflow, resolve=None):
+    """
+    :return: The names of the images to pull (their ``dockerPull``, or else ``dockerImageId``), in the
+             order of :func:`image_manifest`. The images that are loaded or built aren't included.
+    :rtype: list[STRING]
+    """
+    references = []
+    for entry in image_manifest(workflow, resolve=resolve):
+        image = entry["image"]
+        reference = image.get("dockerPull") or image.get("dockerImageId")
+        if isinstance(reference, six.string_types) and reference not in references:
+            references.append(reference)
+    return references
@@ -0,0 +1,182 @@
+"""
+The dependencies between the steps of a :class:`cwlgen.Workflow`, from the ``source`` of the inputs
+of each step:
+
+.. code-block:: python
+
+   cwlgen.dag.step_dependencies(workflow)     # {'align': [], 'sort': ['align'], 'index': ['sort']}
+   cwlgen.dag.topological_order(workflow)     # ['align', 'sort', 'index']
+
+And the types of the sources, for the transformations of workflows (see :mod:`cwlgen.fusion` and
+:mod:`cwlgen.chunking`).
+"""
+
+import copy
+from collections import OrderedDict, deque
+
+import six
+
+from .canonical import normalize
+from .utils import Serializable, TRANSIENT_PREFIXES
+
+
+def source_id(source, workflow_id=None):
+    """
+    :return: The id of a source relative to its workflow, eg: 'step/out' for '#main/step/out' (in
+             the workflow 'main') or '#step/out', and 'x' for an input '#main/x'
+    """
+    source = source.split("#")[-1]
+    if workflow_id and source.startswith(workflow_id + "/"):
+        source = source[len(workflow_id) + 1:]
+    return source
+
+
+def _sources(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, six.string_types) else list(value)
+
+
+def _workflow_steps(workflow):
+    # [(step id, [sources])] of a workflow object (in the order of its steps) or dictionary
+    if isinstance(workflow, Serializable):
+        return [(s.id, [source for i in s.inputs for source in _sources(i.source)])
+                for s in getattr(workflow, "steps", None) or []]
+    steps = normalize({"steps": workflow.get("steps")}).get("steps") or {}
+    return [(step_id, [source for i in (s.get("in") or {}).values() if isinstance(i, dict)
+                       for source in _sources(i.get("source"))])
+            for step_id, s in sorted(steps.items())]
+
+
+def step_dependencies(workflow):
+    """
+    :param workflow: The workflow, or its dictionary
+    :type workflow: :class:`cwlgen.Workflow` | dict
+    :return: The ids of the steps each step depends on (in the order of the steps of the workflow)
+    :rtype: OrderedDict[STRING, list[STRING]]
+    :raises ValueError: If a step depends on a step that doesn't exist
+    """
+    workflow_id = source_id((getattr(workflow, "id", None) if isinstance(workflow, Serializable)
+                             else workflow.get("id")) or "")
+    steps = _workflow_steps(workflow)
+    step_ids = set(step_id for step_id, _ in steps)
+    dependencies = OrderedDict()
+    for step_id, sources in steps:
+        upstream = []
+        for source in sources:
+            source = source_id(source, workflow_id)
+            if "/" not in source:
+                continue    # an input of the workflow
+            upstream_id = source.split("/")[0]
+            if upstream_id not in step_ids:
+                raise ValueError("The step '%s' depends on the unknown step '%s'" % (step_id, upstream_id))
+            if upstream_id not in upstream:
+                upstream.append(upstream_id)
+        dependencies[step_id] = upstream
+    return dependencies
+
+
+def topological_order(workflow, dependencies=None):
+    """
+    :param workflow: The workflow, or its dictionary
+    :type workflow: :class:`cwlgen.Workflow` | dict
+    :param dependencies: The dependencies of the steps, if they're already known (see :func:`step_dependencies`)
+    :return: The ids of the steps, each after the steps it depends on (otherwise in the order of the workflow)
+    :rtype: list[STRING]
+    :raises ValueError: If the steps depend on each other
+    """
+    if dependencies is None:
+        dependencies = step_dependencies(workflow)
+    waiting = dict((step_id, len(upstream)) for step_id, upstream in dependencies.items())
+    dependents = dict((step_id, []) for step_id in dependencies)
+    for step_id, upstream in dependencies.items():
+        for upstream_id in upstream:
+            dependents[upstream_id].append(step_id)
+
+    index = dict((step_id, i) for i, step_id in enumerate(dependencies))
+    ready = deque(step_id for step_id in dependencies if not waiting[step_id])
+    order = []
+    while ready:
+        step_id = ready.popleft()
+        order.append(step_id)
+        released = []
+        for dependent in dependents[step_id]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                released.append(dependent)
+        ready.extend(sorted(released, key=index.get))
+    if len(order) < len(dependencies):
+        cycle = sorted(step_id for step_id, count in waiting.items() if count)
+        raise ValueError("The steps %s depend on each other" % ", ".join(cycle))
+    return order
+
+
+def output_type(step, output_id):
+    """
+    :return: The type of an output of the process run by a step (not scattered), or None if it isn't known
+    """
+    run = step.run
+    param_type = None
+    if isinstance(run, Serializable):
+        for param in getattr(run, "outputs", None) or []:
+            if param.id == output_id:
+                param_type = param.type
+    elif isinstance(run, dict):
+        outputs = run.get("outputs") or {}
+        if isinstance(outputs, list):
+            outputs = dict((o.get("id"), o) for o in outputs if isinstance(o, dict))
+        param = outputs.get(output_id)
+        param_type = param.get("type") if isinstance(param, dict) else param
+    if param_type in ("stdout", "stderr"):
+        return "File"
+    return copy.deepcopy(param_type)
+
+
+def source_type(workflow, source):
+    """
+    :param workflow: The workflow
+    :type workflow: :class:`cwlgen.Workflow`
+    :param source: The id of an input of the workflow, or of an output of one of its steps (see :func:`source_id`)
+    :type source: STRING
+    :return: The type of the source (an array for the outputs of a scattered step), or 'Any' if it isn't known
+    """
+    if "/" not in source:
+        for param in workflow.inputs:
+            if param.id == source:
+                return copy.deepcopy(param.type)
+        return "Any"
+    step_id, output_id = source.split("/", 1)
+    step = next((s for s in workflow.steps if s.id == step_id), None)
+    param_type = output_type(step, output_id) if step is not None else None
+    if param_type is None:
+        return "Any"
+    scatter = [step.scatter] if isinstance(step.scatter, six.string_types) else step.scatter or []
+    dimensions = len(scatter) if step.scatterMethod == "nested_crossproduct" else min(len(scatter), 1)
+    for _ in range(dimensions):
+        param_type = {"type": "array", "items": param_type}
+    return param_type
+
+
+def item_type(param_type):
+    """
+    :return: The type of the items of an array type, or 'Any' if it isn't known
+    """
+    if isinstance(param_type, dict) and param_type.get("type") == "array":
+        return param_type.get("items")
+    if getattr(param_type, "type", None) == "array":
+        return param_type.items
+    if isinstance(param_type, six.string_types) and param_type.endswith("[]"):
+        return param_type[:-2]
+    return "Any"
+
+
+def copy_object(obj):
+    """
+    :return: A shallow copy of an object (eg: a workflow step), without its cached dictionaries
+             (see :mod:`cwlgen.tracking`) and round trip source
+    """
+    retval = copy.copy(obj)
+    for attribute in list(vars(retval)):
+        if attribute.startswith(TRANSIENT_PREFIXES):
+            delattr(retval, attribute)
+    return retval
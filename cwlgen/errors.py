@@ -0,0 +1,216 @@
+"""
+Errors raised (or collected) when parsing CWL documents.
+
+By default a :class:`ParseError` is raised as soon as a problem is found. Passing an
+:class:`ErrorCollector` to :func:`cwlgen.parse_cwl` (or :func:`cwlgen.parse_cwl_dict`) will instead
+record every error and keep parsing, dropping the values that couldn't be parsed, so
+the failures of a bulk import can be reported together.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class _State(threading.local):
+    context = None
+
+
+_state = _State()
+
+
+class ParseError(Exception):
+    """
+    Base class for the errors found when parsing a CWL document.
+    """
+
+    def __init__(self, message, path=None, line=None, column=None, document=None):
+        """
+        :param message: A description of the error
+        :type message: STRING
+        :param path: The keys and indices from the root of the document to the value that failed
+        :type path: list[STRING | INT]
+        :param line: The line (1-based) of the value that failed, if known
+        :type line: INT
+        :param column: The column (1-based) of the value that failed, if known
+        :type column: INT
+        :param document: The path of the document being parsed, if known
+        :type document: STRING
+        """
+        super(ParseError, self).__init__(message)
+        self.message = message
+        self.path = list(path or [])
+        self.line = line
+        self.column = column
+        self.document = document
+
+    def location(self):
+        """
+        :return: The location of the error in the form ``document:line:column``, omitting the unknown parts
+        """
+        parts = [str(p) for p in (self.document, self.line, self.column) if p is not None]
+        return ":".join(parts)
+
+    def __str__(self):
+        prefix = self.location()
+        if self.path:
+            prefix = "%s (%s)" % (prefix, "/".join(str(p) for p in self.path)) if prefix \
+                else "/".join(str(p) for p in self.path)
+        return "%s: %s" % (prefix, self.message) if prefix else self.message
+
+
+class MissingFieldError(ParseError):
+    """
+    A required field was not found.
+    """
+
+
+class UnknownFieldError(ParseError, KeyError):
+    """
+    A field of the document doesn't exist on the type it's parsed as.
+    """
+
+    def __str__(self):
+        return ParseError.__str__(self)
+
+
+class InvalidValueError(ParseError):
+    """
+    A value couldn't be parsed as any of the types it's allowed to be.
+    """
+
+
+class UnknownClassError(ParseError, NotImplementedError):
+    """
+    The ``class`` of the document isn't a CWL process class that can be parsed.
+    """
+
+
+class ErrorCollector(object):
+    """
+    Collects the :class:`ParseError` found when parsing one or more documents.
+    """
+
+    def __init__(self):
+        self.errors = []    # type: list[ParseError]
+
+    def append(self, error):
+        self.errors.append(error)
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def __bool__(self):
+        return len(self.errors) > 0
+
+    __nonzero__ = __bool__
+
+
+class ParseContext(object):
+    """
+    The state of the document currently being parsed, used to locate errors.
+    """
+
+    def __init__(self, document=None, collector=None, source_map=None):
+        self.document = document
+        self.collector = collector
+        self.source_map = source_map
+        self.path = []
+
+
+def get_context():
+    """
+    :return: The :class:`ParseContext` of the current thread, or None if there isn't a document being parsed
+    """
+    return _state.context
+
+
+def get_collecting_path():
+    """
+    When errors are being collected, the location of the value being parsed is tracked in the
+    path of the :class:`ParseContext` (so the errors can be recorded where they happen). Otherwise
+    the path is filled in as a raised error propagates, see :func:`prepend_path`.
+
+    :return: The path of the current :class:`ParseContext` if errors are being collected, otherwise None
+    """
+    context = _state.context
+    if context is None or context.collector is None:
+        return None
+    return context.path
+
+
+def prepend_path(error, key):
+    """
+    Prepend ``key`` to the path of an error raised from within the value at ``key``.
+    """
+    error.path.insert(0, key)
+
+
+@contextmanager
+def parse_context(document=None, collector=None, source_map=None):
+    """
+    Set the :class:`ParseContext` for the current thread while parsing a document.
+
+    :param document: The path of the document being parsed
+    :param collector: Where to record the errors, if None the errors are raised
+    :type collector: ErrorCollector
+    :param source_map: Where to record the location of the parsed objects
+    :type source_map: :class:`cwlgen.SourceMap`
+    """
+    previous = get_context()
+    context = ParseContext(document=document, collector=collector, source_map=source_map)
+    _state.context = context
+    try:
+        yield context
+    finally:
+        _state.context = previous
+
+
+def get_position(container, key=None):
+    """
+    Get the (1-based) line and column of ``container[key]`` (or of ``container`` if key is None),
+    when the document was loaded with position information (eg: ruamel's round trip loader).
+
+    :return: (line, column), or (None, None) if the position isn't known
+    """
+    lc = getattr(container, "lc", None)
+    if lc is None:
+        return None, None
+    try:
+        if key is None:
+            line, column = lc.line, lc.col
+        elif isinstance(container, dict):
+            line, column = lc.key(key)
+        else:
+            line, column = lc.item(key)
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None, None
+    return line + 1, column + 1
+
+
+def report(error, container=None, key=None):
+    """
+    Raise the error, or record it if errors are being collected for the current document.
+    The location of the error is filled in from the current :class:`ParseContext`.
+
+    :param error: The error to report
+    :type error: ParseError
+    :param container: The dictionary or list that contains the value that failed
+    :param key: The key or index of the value in ``container``
+    """
+    context = _state.context
+    if key is not None:
+        error.path.append(key)
+    if context is not None:
+        # only contains the path when collecting errors, otherwise it's filled in as the error propagates
+        error.path[:0] = context.path
+        error.document = context.document
+    if error.line is None and container is not None:
+        error.line, error.column = get_position(container, key)
+
+    if context is not None and context.collector is not None:
+        context.collector.append(error)
+        return
+    raise error
@@ -0,0 +1,468 @@
+"""
+Run :class:`cwlgen.CommandLineTool` jobs on the local machine, without a CWL runner, for
+development and tests:
+
+.. code-block:: python
+
+   executor = cwlgen.LocalExecutor(workers=8)
+   result = executor.run(tool, {"message": "hello"})
+   result.status, result.outputs, result.wall_time
+   results = executor.run_many(tool, jobs)          # runs the jobs in parallel
+   step_result = executor.run_step(step, inputs)    # fans out the scatter of a workflow step
+
+Each job runs in a new output directory (the working directory of the command), with its own
+temporary directory. The output directories of the jobs that succeed hold their outputs, they're left
+to the caller, while those of the jobs that fail are removed (unless ``keep_failed`` is set).
+
+The executor supports ``stdin``, ``stdout`` and ``stderr``, the ``successCodes`` (and the temporary and
+permanent fail codes), a ``ResourceRequirement`` (for ``runtime``), an ``EnvVarRequirement``, an
+``InitialWorkDirRequirement``, a ``ShellCommandRequirement`` and the ``glob``, ``loadContents`` and
+``outputEval`` of the output bindings. The requirements are resolved by :class:`cwlgen.RequirementResolver`:
+given the resolver of a workflow, the requirements of the workflow apply to its tools. Parameter references
+(eg: ``$(runtime.outdir)``) are evaluated by :mod:`cwlgen.expression`. It doesn't run containers, the
+commands must be available on the ``PATH``.
+"""
+
+import glob as globlib
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from .canonical import normalize
+from .commandline import CommandLinePlan, is_expression
+from .expression import compile_expression as compile_parameter_reference
+from .resolver import RequirementResolver
+from .utils import Serializable
+
+logging.basicConfig(level=logging.INFO)
+_LOGGER = logging.getLogger(__name__)
+
+SUCCESS = "success"
+TEMPORARY_FAIL = "temporaryFail"
+PERMANENT_FAIL = "permanentFail"
+
+_CONTENTS_LIMIT = 64 * 1024
+
+CACHE_SIZE = 64     # the number of compiled tools an executor keeps
+
+
+def file_object(path, load_contents=False):
+    """
+    :return: The CWL File (or Directory) object of the local ``path``
+    """
+    path = os.path.abspath(path)
+    basename = os.path.basename(path)
+    if os.path.isdir(path):
+        return {"class": "Directory", "location": "file://" + path, "path": path, "basename": basename}
+    nameroot, nameext = os.path.splitext(basename)
+    f = {"class": "File", "location": "file://" + path, "path": path, "basename": basename,
+         "nameroot": nameroot, "nameext": nameext, "size": os.path.getsize(path)}
+    if load_contents:
+        with open(path, "rb") as contents:
+            f["contents"] = contents.read(_CONTENTS_LIMIT).decode("utf-8", "replace")
+    return f
+
+
+def _local_path(value):
+    # the path of a File or Directory object
+    path = value.get("path")
+    if path is None:
+        path = value.get("location", "")
+        if path.startswith("file://"):
+            path = path[len("file://"):]
+    return path
+
+
+class JobResult(object):
+    """
+    The result of running a job of a tool.
+    """
+
+    def __init__(self, job, argv, outdir, exit_code, status, outputs, wall_time, error=None):
+        """
+        :param job: The values of the inputs of the job
+        :param argv: The command line of the job
+        :param outdir: The output (and working) directory of the job
+        :param exit_code: The exit code of the command, None if it couldn't be run
+        :param status: 'success', 'temporaryFail' or 'permanentFail'
+        :param outputs: The values of the outputs of the job, None if the job failed
+        :param wall_time: The number of seconds the job took
+        :param error: A description of why the job failed
+        """
+        self.job = job
+        self.argv = argv
+        self.outdir = outdir
+        self.exit_code = exit_code
+        self.status = status
+        self.outputs = outputs
+        self.wall_time = wall_time
+        self.error = error
+
+    @property
+    def success(self):
+        return self.status == SUCCESS
+
+    def __repr__(self):
+        return "JobResult(status=%r, exit_code=%r, wall_time=%.3f)" % (self.status, self.exit_code, self.wall_time)
+
+
+class StepResult(object):
+    """
+    The result of running a workflow step, which ran a job for each item of its scatter.
+    """
+
+    def __init__(self, outputs, jobs, status):
+        """
+        :param outputs: The values of the outputs of the step, the outputs of a scattered step are arrays
+                        (nested arrays for a nested_crossproduct)
+        :param jobs: The results of the jobs of the step
+        :type jobs: list[JobResult]
+        :param status: 'success', or the status of the first job that failed
+        """
+        self.outputs = outputs
+        self.jobs = jobs
+        self.status = status
+
+    @property
+    def success(self):
+        return self.status == SUCCESS
+
+    @property
+    def wall_time(self):
+        """
+        The sum of the wall times of the jobs of the step
+        """
+        return sum(job.wall_time for job in self.jobs)
+
+
+class _CompiledTool(object):
+    # the parts of a tool that are used to run each job, compiled once for all the jobs
+
+    def __init__(self, tool, compile_expression, resolver=None, step=None):
+        self.compile_expression = compile_expression
+        d = normalize(tool.get_dict() if isinstance(tool, Serializable) else tool)
+        self.plan = CommandLinePlan(d, compile_expression=compile_expression)
+        if resolver is None:
+            resolver = RequirementResolver(tool)
+
+        resources = resolver.get(step, "ResourceRequirement") or {}
+        self.runtime = {"cores": 1, "ram": 1024, "outdirSize": 1024, "tmpdirSize": 1024}
+        for key, field in (("cores", "coresMin"), ("ram", "ramMin"), ("outdirSize", "outdirMin"),
+                           ("tmpdirSize", "tmpdirMin")):
+            if isinstance(resources.get(field), six.integer_types):
+                self.runtime[key] = resources[field]
+
+        self.success_codes = set(d.get("successCodes") or [0])
+        self.temporary_fail_codes = set(d.get("temporaryFailCodes") or [])
+        self.stdin = self._compile(d.get("stdin"))
+        self.stdout = self._compile(d.get("stdout"))
+        self.stderr = self._compile(d.get("stderr"))
+
+        env = resolver.get(step, "EnvVarRequirement") or {}
+        env_defs = env.get("envDef") or []
+        if isinstance(env_defs, dict):
+            env_defs = [{"envName": k, "envValue": v} for k, v in env_defs.items()]
+        self.env = [(e["envName"], self._compile(e.get("envValue"))) for e in env_defs]
+
+        listing = (resolver.get(step, "InitialWorkDirRequirement") or {}).get("listing") or []
+        if not isinstance(listing, list):
+            listing = [listing]
+        self.listing = []
+        for item in listing:
+            if isinstance(item, dict) and "entry" in item:
+                self.listing.append((self._compile(item.get("entryname")), self._compile(item["entry"])))
+            else:
+                self.listing.append((None, self._compile(item)))
+
+        self.outputs = []
+        for name, param in (d.get("outputs") or {}).items():
+            param_type = param.get("type")
+            binding = param.get("outputBinding") or {}
+            self.outputs.append((name, param_type, self._compile(binding.get("glob")),
+                                 bool(binding.get("loadContents")), self._compile(binding.get("outputEval"))))
+        if any(t == "stdout" for _, t, _, _, _ in self.outputs) and self.stdout is None:
+            self.stdout = self._compile("stdout.txt")
+        if any(t == "stderr" for _, t, _, _, _ in self.outputs) and self.stderr is None:
+            self.stderr = self._compile("stderr.txt")
+
+    def _compile(self, value):
+        # a function of (inputs, self, runtime) that returns the value, evaluating it if it's an expression
+        if value is None:
+            return None
+        if is_expression(value):
+            return self.compile_expression(value)
+        if isinstance(value, list):
+            values = [self._compile(v) for v in value]
+            return lambda inputs, self_value, runtime: [v(inputs, self_value, runtime) for v in values]
+        return lambda inputs, self_value, runtime: value
+
+
+class LocalExecutor(object):
+    """
+    Runs the jobs of command line tools as local processes, in parallel.
+    """
+
+    def __init__(self, workers=None, base_dir=None, compile_expression=None, keep_failed=False):
+        """
+        :param workers: The number of jobs to run at the same time (default: the number of CPUs)
+        :type workers: INT
+        :param base_dir: The directory to create the output directories of the jobs in (default: the temp directory)
+        :type base_dir: STRING
+        :param compile_expression: Compiles the expressions of the tools (default: only parameter references
+                                   are supported, see :class:`cwlgen.CommandLinePlan`)
+        :type compile_expression: (STRING) -> ((dict, any, dict) -> any)
+        :param keep_failed: Whether to keep the output directories of the jobs that failed (eg: to debug them),
+                            they're removed by default. The output directories of the jobs that succeeded
+                            hold their outputs and are never removed, the caller owns them.
+        :type keep_failed: BOOLEAN
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.base_dir = base_dir
+        self.keep_failed = keep_failed
+        self.compile_expression = compile_expression or compile_parameter_reference
+        # {(id(tool), id(resolver), step), (tool, resolver, _CompiledTool)}, least recently used first
+        self._compiled = OrderedDict()
+        self._compiled_lock = threading.Lock()
+
+    def _compile(self, tool, resolver=None, step=None):
+        # the tools can be dictionaries, which can't be weakly referenced, so the last CACHE_SIZE are kept
+        key = (id(tool), id(resolver), step)
+        with self._compiled_lock:
+            compiled = self._compiled.pop(key, None)
+            if compiled is not None and compiled[0] is tool and compiled[1] is resolver:
+                self._compiled[key] = compiled
+                return compiled[2]
+        compiled = (tool, resolver, _CompiledTool(tool, self.compile_expression, resolver, step))
+        with self._compiled_lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > CACHE_SIZE:
+                self._compiled.popitem(last=False)
+        return compiled[2]
+
+    def run(self, tool, job, resolver=None, step=None):
+        """
+        Run a job of a tool.
+
+        :param tool: The tool, or its dictionary
+        :type tool: :class:`cwlgen.CommandLineTool` | dict
+        :param job: The values of the inputs of the tool
+        :type job: dict
+        :param resolver: The requirements of the workflow the tool is run in, so that those of the workflow
+                         (eg: an ``EnvVarRequirement``) apply to the tool (default: only those of the tool)
+        :type resolver: :class:`cwlgen.RequirementResolver`
+        :param step: The path of the step that runs the tool in the workflow of ``resolver`` (eg: 'qc/fastqc')
+        :type step: STRING
+        :rtype: JobResult
+        """
+        return self._run(self._compile(tool, resolver, step), job)
+
+    def run_many(self, tool, jobs, resolver=None, step=None):
+        """
+        Run the jobs of a tool in parallel, in up to ``workers`` processes at a time.
+
+        :param resolver: The requirements of the workflow the tool is run in, see :meth:`run`
+        :param step: The path of the step that runs the tool, see :meth:`run`
+        :return: The results in the order of the jobs
+        :rtype: list[JobResult]
+        """
+        compiled = self._compile(tool, resolver, step)
+        jobs = list(jobs)
+        if len(jobs) <= 1 or self.workers == 1:
+            return [self._run(compiled, job) for job in jobs]
+        pool = ThreadPool(min(self.workers, len(jobs)))
+        try:
+            # the threads only wait for the commands, which run in their own processes
+            return pool.map(lambda job: self._run(compiled, job), jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    def run_step(self, step, inputs, resolver=None):
+        """
+        Run a workflow step, with a job for each item of its scatter.
+
+        :param step: A step that runs a :class:`cwlgen.CommandLineTool`
+        :type step: :class:`cwlgen.WorkflowStep`
+        :param inputs: The values of the inputs of the step (the sources of its inputs), by the id of the step input
+        :type inputs: dict
+        :param resolver: The requirements of the workflow of the step, so that they apply to its tool
+        :type resolver: :class:`cwlgen.RequirementResolver`
+        :rtype: StepResult
+        """
+        job = {}
+        for step_input in step.inputs:
+            value = inputs.get(step_input.id)
+            if value is None:
+                value = step_input.default
+            job[step_input.id] = value
+
+        scatter = step.scatter
+        path = step.id if resolver is not None else None
+        if not scatter:
+            result = self.run(step.run, job, resolver, path)
+            return StepResult(result.outputs, [result], result.status)
+
+        scatter = [scatter] if isinstance(scatter, six.string_types) else list(scatter)
+        scatter_jobs, shape = scatter_job(job, scatter, step.scatterMethod)
+        results = self.run_many(step.run, scatter_jobs, resolver, path)
+        failed = [r for r in results if not r.success]
+        if failed:
+            return StepResult(None, results, failed[0].status)
+        output_ids = [o if isinstance(o, six.string_types) else o.id for o in step.out]
+        outputs = {o: _reshape([r.outputs.get(o) for r in results], shape) for o in output_ids}
+        return StepResult(outputs, results, SUCCESS)
+
+    def _run(self, compiled, job):
+        start = time.time()
+        outdir = tempfile.mkdtemp(prefix="cwlgen_", dir=self.base_dir)
+        result = JobResult(job, None, outdir, None, PERMANENT_FAIL, None, None)
+        try:
+            self._execute(compiled, job, result)
+        except Exception as e:
+            # eg: an expression or a binding that can't be evaluated, the other jobs keep running
+            result.status, result.outputs, result.error = PERMANENT_FAIL, None, str(e) or e.__class__.__name__
+        result.wall_time = time.time() - start
+        if not result.success and not self.keep_failed:
+            shutil.rmtree(outdir, ignore_errors=True)
+            result.outdir = None
+        return result
+
+    def _execute(self, compiled, job, result):
+        # run the job, and fill in its result
+        outdir = result.outdir
+        tmpdir = tempfile.mkdtemp(prefix="cwlgen_tmp_", dir=self.base_dir)
+        runtime = dict(compiled.runtime, outdir=outdir, tmpdir=tmpdir)
+        try:
+            result.argv = compiled.plan.render(job, runtime)
+            self._stage(compiled, job, outdir, runtime)
+
+            env = {"HOME": outdir, "TMPDIR": tmpdir, "PATH": os.environ.get("PATH", os.defpath)}
+            for name, value in compiled.env:
+                env[name] = six.text_type(value(job, None, runtime))
+
+            stdin = stdout = stderr = None
+            try:
+                if compiled.stdin is not None:
+                    stdin = open(compiled.stdin(job, None, runtime), "rb")
+                if compiled.stdout is not None:
+                    stdout = open(os.path.join(outdir, compiled.stdout(job, None, runtime)), "wb")
+                if compiled.stderr is not None:
+                    stderr = open(os.path.join(outdir, compiled.stderr(job, None, runtime)), "wb")
+                if compiled.plan.shell:
+                    command = ["/bin/sh", "-c", compiled.plan.render_string(job, runtime)]
+                else:
+                    command = result.argv
+                result.exit_code = subprocess.call(command, cwd=outdir, env=env, stdin=stdin, stdout=stdout,
+                                                   stderr=stderr)
+            finally:
+                for f in (stdin, stdout, stderr):
+                    if f is not None:
+                        f.close()
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        exit_code = result.exit_code
+        if exit_code in compiled.success_codes:
+            result.outputs = self._collect_outputs(compiled, job, outdir, runtime)
+            result.status = SUCCESS
+        else:
+            result.status = TEMPORARY_FAIL if exit_code in compiled.temporary_fail_codes else PERMANENT_FAIL
+            result.error = "The command exited with %d" % exit_code
+
+    @staticmethod
+    def _stage(compiled, job, outdir, runtime):
+        # create the files and directories of the InitialWorkDirRequirement
+        for entryname, entry in compiled.listing:
+            value = entry(job, None, runtime)
+            values = value if isinstance(value, list) else [value]
+            for value in values:
+                if value is None:
+                    continue
+                name = entryname(job, None, runtime) if entryname is not None else None
+                if isinstance(value, dict) and value.get("class") in ("File", "Directory"):
+                    source = _local_path(value)
+                    target = os.path.join(outdir, name or value.get("basename") or os.path.basename(source))
+                    if os.path.isdir(source):
+                        shutil.copytree(source, target)
+                    else:
+                        shutil.copy(source, target)
+                elif name is not None:
+                    with open(os.path.join(outdir, name), "w") as f:
+                        f.write(six.text_type(value))
+
+    @staticmethod
+    def _collect_outputs(compiled, job, outdir, runtime):
+        outputs = {}
+        for name, param_type, glob, load_contents, output_eval in compiled.outputs:
+            if param_type == "stdout" or param_type == "stderr":
+                stream = compiled.stdout if param_type == "stdout" else compiled.stderr
+                outputs[name] = file_object(os.path.join(outdir, stream(job, None, runtime)))
+                continue
+            value = None
+            if glob is not None:
+                patterns = glob(job, None, runtime)
+                patterns = patterns if isinstance(patterns, list) else [patterns]
+                paths = []
+                for pattern in patterns:
+                    paths.extend(sorted(globlib.glob(os.path.join(outdir, pattern))))
+                value = [file_object(p, load_contents) for p in paths]
+            if output_eval is not None:
+                value = output_eval(job, value, runtime)
+            elif isinstance(value, list) and not _is_array_type(param_type):
+                value = value[0] if value else None
+            outputs[name] = value
+        return outputs
+
+
+def _is_array_type(param_type):
+    if isinstance(param_type, dict):
+        return param_type.get("type") == "array"
+    if isinstance(param_type, list):
+        return any(_is_array_type(t) for t in param_type)
+    return False
+
+
+def scatter_job(job, scatter, scatter_method=None):
+    """
+    Split a job on the inputs in ``scatter``.
+
+    :param job: The values of the inputs
+    :param scatter: The ids of the inputs to scatter on, their values must be arrays
+    :type scatter: list[STRING]
+    :param scatter_method: 'dotproduct' (the default), 'nested_crossproduct' or 'flat_crossproduct'
+    :return: (The jobs, the shape of the outputs), where the shape is None for a flat list of outputs,
+             or the lengths of the nested arrays of a nested_crossproduct
+    """
+    values = [job.get(s) or [] for s in scatter]
+    if len(scatter) == 1 or scatter_method in (None, "dotproduct"):
+        if len(set(len(v) for v in values)) > 1:
+            raise ValueError("The inputs of a dotproduct scatter must have the same length: %s" % ", ".join(scatter))
+        combinations = six.moves.zip(*values)
+        shape = None
+    else:
+        combinations = itertools.product(*values)
+        shape = [len(v) for v in values] if scatter_method == "nested_crossproduct" else None
+    jobs = []
+    for combination in combinations:
+        scattered = dict(job)
+        scattered.update(zip(scatter, combination))
+        jobs.append(scattered)
+    return jobs, shape
+
+
+def _reshape(values, shape):
+    # the flat list of outputs of a nested_crossproduct, as nested arrays
+    if not shape or len(shape) == 1:
+        return values
+    size = len(values) // shape[0] if shape[0] else 0
+    return [_reshape(values[i * size:(i + 1) * size], shape[1:]) for i in range(shape[0])]
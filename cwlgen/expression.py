@@ -0,0 +1,199 @@
+"""
+Evaluate CWL parameter references, eg: ``$(inputs.reads.nameroot)`` or ``$(inputs.files[0].path)``,
+without a JavaScript engine (see https://www.commonwl.org/v1.0/CommandLineTool.html#Parameter_references).
+
+An expression is parsed once into a function of the inputs (and ``self`` and ``runtime``), which is
+cached by the text of the expression (the last ``CACHE_SIZE`` expressions are kept), so evaluating
+the same expression for many jobs only walks the values of each job:
+
+.. code-block:: python
+
+   evaluate = compile_expression("$(inputs.reads.nameroot).bam")
+   [evaluate(job) for job in jobs]      # ['a.bam', 'b.bam', ...]
+
+If the expression is a single reference, the value keeps its type (eg: a number or a File),
+otherwise the values are interpolated into the string (as JSON, for values that aren't strings).
+JavaScript expressions (``${ ... }`` or ``$( ... )`` that isn't a reference) raise an :class:`ExpressionError`.
+"""
+
+import json
+import posixpath
+import re
+import threading
+from collections import OrderedDict
+
+import six
+
+_SYMBOL_PATTERN = re.compile(r"\w+", re.UNICODE)
+_SEGMENT_PATTERN = re.compile(r"""\.(\w+)|\['((?:[^'\\]|\\.)*)'\]|\["((?:[^"\\]|\\.)*)"\]|\[(\d+)\]""", re.UNICODE)
+_ROOTS = {"inputs": 0, "self": 1, "runtime": 2}
+
+CACHE_SIZE = 256
+
+_cache = OrderedDict()      # {expression: function}, least recently used first
+_cache_lock = threading.Lock()
+
+
+class ExpressionError(ValueError):
+    """
+    An expression that can't be parsed or evaluated as a parameter reference.
+    """
+
+
+def _file_property(f, key):
+    # the properties of a File (or Directory) that can be computed from its path or location
+    path = f.get("path") or f.get("location") or ""
+    if key == "basename":
+        return posixpath.basename(path)
+    if key == "dirname":
+        return posixpath.dirname(path)
+    if key == "nameroot":
+        return posixpath.splitext(_file_property(f, "basename"))[0]
+    if key == "nameext":
+        return posixpath.splitext(_file_property(f, "basename"))[1]
+    return None
+
+
+def _get(value, key, expression):
+    if isinstance(value, dict):
+        if key in value:
+            return value[key]
+        if value.get("class") in ("File", "Directory"):
+            return _file_property(value, key)
+        return None
+    if isinstance(value, (list, six.string_types)):
+        if key == "length":
+            return len(value)
+        if isinstance(value, list) and isinstance(key, six.integer_types):
+            return value[key] if key < len(value) else None
+    raise ExpressionError("Can't get '%s' of the value %r in '%s'" % (key, value, expression))
+
+
+def _compile_reference(root, segments, expression):
+    index = _ROOTS[root]
+
+    def evaluate(inputs, self_value=None, runtime=None):
+        value = (inputs, self_value, runtime)[index]
+        for key in segments:
+            value = _get(value, key, expression)
+        return value
+    return evaluate
+
+
+def _unescape(text):
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _format(value):
+    if isinstance(value, six.string_types):
+        return value
+    return json.dumps(value)
+
+
+def _parse(expression):
+    """
+    :return: A list of the literal strings and compiled references of the expression
+    """
+    parts, literal, i = [], [], 0
+    while i < len(expression):
+        c = expression[i]
+        if c == "\\" and expression[i + 1:i + 2] in ("$", "\\"):
+            literal.append(expression[i + 1])
+            i += 2
+            continue
+        if c != "$" or expression[i + 1:i + 2] not in ("(", "{"):
+            literal.append(c)
+            i += 1
+            continue
+        if expression[i + 1] == "{":
+            raise ExpressionError("JavaScript expressions aren't supported, only parameter references: '%s'"
+                                  % expression)
+
+        match = _SYMBOL_PATTERN.match(expression, i + 2)
+        if match is None or match.group(0) not in _ROOTS:
+            raise ExpressionError("A parameter reference must start with inputs, self or runtime: '%s'" % expression)
+        root, segments, position = match.group(0), [], match.end()
+        while True:
+            match = _SEGMENT_PATTERN.match(expression, position)
+            if match is None:
+                break
+            symbol, single_quoted, double_quoted, index = match.groups()
+            if index is not None:
+                segments.append(int(index))
+            else:
+                segments.append(symbol if symbol is not None
+                                else _unescape(single_quoted if single_quoted is not None else double_quoted))
+            position = match.end()
+        if expression[position:position + 1] != ")":
+            raise ExpressionError("Only parameter references are supported (not JavaScript): '%s'" % expression)
+
+        if literal:
+            parts.append("".join(literal))
+            literal = []
+        parts.append(_compile_reference(root, segments, expression))
+        i = position + 1
+    if literal:
+        parts.append("".join(literal))
+    return parts
+
+
+def compile_expression(expression):
+    """
+    Compile an expression (a string that can contain parameter references) into a function of
+    ``(inputs, self=None, runtime=None)``. The functions of the last ``CACHE_SIZE`` expressions
+    are cached.
+
+    :param expression: eg: ``$(inputs.reads.nameroot).bam``
+    :type expression: STRING
+    :raises ExpressionError: If the expression contains JavaScript
+    """
+    with _cache_lock:
+        evaluate = _cache.pop(expression, None)
+        if evaluate is not None:
+            _cache[expression] = evaluate
+            return evaluate
+
+    parts = _parse(expression)
+    if len(parts) == 1 and callable(parts[0]):
+        # a single reference keeps the type of the value
+        evaluate = parts[0]
+    elif not any(callable(p) for p in parts):
+        text = "".join(parts)
+
+        def evaluate(inputs, self_value=None, runtime=None):
+            return text
+    else:
+        def evaluate(inputs, self_value=None, runtime=None):
+            return "".join(_format(p(inputs, self_value, runtime)) if callable(p) else p for p in parts)
+
+    with _cache_lock:
+        _cache[expression] = evaluate
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return evaluate
+
+
+def evaluate(expression, inputs, self_value=None, runtime=None):
+    """
+    Evaluate an expression, see :func:`compile_expression`.
+    """
+    return compile_expression(expression)(inputs, self_value, runtime)
+
+
+def evaluate_many(expression, jobs, runtime=None):
+    """
+    Evaluate an expression for each of the ``jobs`` (the values of the inputs).
+
+    :return: A generator of the values
+    """
+    evaluate_job = compile_expression(expression)
+    for job in jobs:
+        yield evaluate_job(job, None, runtime)
+
+
+def clear_cache():
+    """
+    Clear the compiled expressions.
+    """
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,167 @@
+"""
+The :class:`ExpressionTool` process, which computes its outputs with a JavaScript expression
+instead of running a command:
+
+.. code-block:: python
+
+   tool = cwlgen.ExpressionTool("sum", expression="${ return {'total': inputs.a + inputs.b}; }")
+   tool.requirements.append(cwlgen.InlineJavascriptRequirement())
+
+Documentation: https://www.commonwl.org/v1.0/Workflow.html#ExpressionTool
+"""
+
+#  Import  ------------------------------
+
+# General libraries
+import logging
+
+# External libraries
+import six
+
+# Internal libraries
+
+from .requirements import parse_requirements, get_requirements_dict
+from .utils import Serializable, value_or_default
+from .common import export_process_string, Parameter, CWL_SHEBANG
+from .commandlinetool import CommandOutputBinding
+from .workflowdeps import InputParameter
+
+
+# Logging setup
+
+logging.basicConfig(level=logging.INFO)
+_LOGGER = logging.getLogger(__name__)
+
+
+#  Class(es)  ------------------------------
+
+class ExpressionToolOutputParameter(Parameter):
+    """
+    An output parameter for a :class:`cwlgen.ExpressionTool`.
+
+    Documentation: https://www.commonwl.org/v1.0/Workflow.html#ExpressionToolOutputParameter
+    """
+
+    parse_types = {"outputBinding": [CommandOutputBinding]}
+
+    def __init__(self, param_id, label=None, secondary_files=None, param_format=None,
+                 streamable=None, doc=None, output_binding=None, param_type=None):
+        """
+        :param param_id: unique identifier for this parameter
+        :type param_id: STRING
+        :param label: short, human-readable label
+        :type label: STRING
+        :param secondary_files: If type is a file, describes files that must be
+                                included alongside the primary file(s)
+        :type secondary_files: STRING
+        :param param_format: If type is a file, uri to ontology of the format or exact format
+        :type param_format: STRING
+        :param streamable: If type is a file, true indicates that the file is read or written
+                           sequentially without seeking
+        :type streamable: BOOLEAN
+        :param doc: documentation
+        :type doc: STRING
+        :param output_binding: describes how to handle the output
+        :type output_binding: :class:`cwlgen.CommandOutputBinding` object
+        :param param_type: type of data assigned to the parameter corresponding to CWLType
+        :type param_type: STRING
+        """
+        Parameter.__init__(self, param_id=param_id, label=label,
+                           secondary_files=secondary_files, param_format=param_format,
+                           streamable=streamable, doc=doc, param_type=param_type)
+        self.outputBinding = output_binding
+
+
+class ExpressionTool(Serializable):
+    """
+    Execute an expression as a Workflow step, the expression returns an object with a field for
+    each of the outputs.
+
+    Documentation: https://www.commonwl.org/v1.0/Workflow.html#ExpressionTool
+    """
+    __CLASS__ = 'ExpressionTool'
+    required_fields = ["inputs", "outputs", "expression"]
+    ignore_fields_on_parse = ["class", "requirements", "hints"]
+    ignore_fields_on_convert = ["inputs", "outputs", "requirements", "hints"]
+    parse_types = {
+        "inputs": [[InputParameter]],
+        "outputs": [[ExpressionToolOutputParameter]],
+    }
+
+    def __init__(self, tool_id=None, expression=None, label=None, doc=None, cwl_version='v1.0', inputs=None,
+                 outputs=None, requirements=None, hints=None):
+        """
+        :param tool_id: The unique identifier for this process object.
+        :type tool_id: STRING
+        :param expression: The expression to execute, it must return an object with the output parameters.
+                           An InlineJavascriptRequirement is required to evaluate it.
+        :type expression: STRING
+        :param label: A short, human-readable label of this process object.
+        :type label: STRING
+        :param doc: A long, human-readable description of this process object.
+        :type doc: STRING
+        :param cwl_version: CWL document version. Always required at the document root. Default: 'v1.0'
+        :type cwl_version: CWLVersion
+        """
+        self.id = tool_id
+        self.label = label
+        self.doc = doc
+        self.cwlVersion = cwl_version
+        self.expression = expression
+
+        self.inputs = value_or_default(inputs, [])              # list[InputParameter]
+        self.outputs = value_or_default(outputs, [])            # list[ExpressionToolOutputParameter]
+        self.requirements = value_or_default(requirements, [])  # list[Requirement]
+        self.hints = value_or_default(hints, [])                # list[Requirement]
+
+    def get_dict(self):
+        d = super(ExpressionTool, self).get_dict()
+
+        d['class'] = self.__CLASS__
+        d['inputs'] = {i.id: i.get_dict() for i in self.inputs}
+        d['outputs'] = {o.id: o.get_dict() for o in self.outputs}
+
+        if self.requirements:
+            d['requirements'] = get_requirements_dict(self.requirements)
+        if self.hints:
+            d["hints"] = get_requirements_dict(self.hints)
+
+        return d
+
+    @classmethod
+    def parse_dict(cls, d):
+        tool = super(ExpressionTool, cls).parse_dict(d)
+        if tool is None:
+            return None
+        tool.requirements = parse_requirements(d.get("requirements"), "requirements")
+        tool.hints = parse_requirements(d.get("hints"), "hints")
+        return tool
+
+    def export_string(self, round_trip=True, canonical=False, compact=False):
+        """
+        :param round_trip: If this was parsed with ``round_trip=True``, only re-emit the fields that were
+                           modified, keeping the comments, key order and formatting of the original document.
+        :param canonical: Export the canonical form of the document (see :mod:`cwlgen.canonical`)
+        :param compact: Use the CWL shorthand forms wherever they're equivalent (see :mod:`cwlgen.compact`)
+        :raises ValueError: If both ``canonical`` and ``compact`` are set
+        """
+        return export_process_string(self, round_trip=round_trip, canonical=canonical, compact=compact)
+
+    def export(self, outfile=None):
+        """
+        Export the expression tool in CWL either on STDOUT or in outfile.
+        """
+        rep = self.export_string()
+        shebang = "" if rep.startswith("#!") else CWL_SHEBANG
+
+        # Write CWL file in YAML
+        if outfile is None:
+            if shebang:
+                six.print_(shebang, "\n", sep='')
+            six.print_(rep)
+        else:
+            out_write = open(outfile, 'w')
+            if shebang:
+                out_write.write(shebang + '\n\n')
+            out_write.write(rep)
+            out_write.close()
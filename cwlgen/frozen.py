@@ -0,0 +1,272 @@
+"""
+Immutable (frozen) versions of the :class:`cwlgen.utils.Serializable` model classes, for building
+many variants of a document (eg: a parameter sweep) from a common template.
+
+:func:`freeze` converts an object (and everything within it) into instances of frozen subclasses
+of the model classes, with the lists and dictionaries converted to :class:`FrozenList` and
+:class:`FrozenDict`. Frozen objects are hashable and compare by value. They can't be modified,
+instead :meth:`Frozen.evolve` and :meth:`Frozen.replace` return a new object that shares every
+unchanged subtree with the original, so a variant only costs the objects along the path of its changes:
+
+.. code-block:: python
+
+   template = cwlgen.freeze(cwlgen.parse_cwl("workflow.cwl"))
+   variants = [template.replace(["steps", "align", "run", "requirements", "DockerRequirement", "dockerPull"], image)
+               for image in images]
+   variants[0].export()
+
+Frozen objects can be exported like any other object, :meth:`Frozen.thaw` returns a mutable copy.
+"""
+
+import six
+
+from .utils import Serializable, TRANSIENT_PREFIXES
+
+_frozen_classes = {}    # type: {type, type}
+
+
+class FrozenList(list):
+    """
+    A hashable list that can't be modified.
+    """
+    __slots__ = ("_hash",)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("'%s' can't be modified" % type(self).__name__)
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(self))
+            return self._hash
+
+    def __reduce_ex__(self, protocol):
+        return FrozenList, (list(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenDict(dict):
+    """
+    A hashable dictionary that can't be modified.
+    """
+    __slots__ = ("_hash",)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("'%s' can't be modified" % type(self).__name__)
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce_ex__(self, protocol):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class Frozen(object):
+    """
+    Mixin of the frozen model classes, these are created by :func:`freeze` (and not by calling
+    the class) as a subclass of the model class, so they can be used wherever the model class is.
+    """
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Can't set '%s', the %s is frozen (see evolve)" % (name, type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("Can't delete '%s', the %s is frozen (see evolve)" % (name, type(self).__name__))
+
+    def _frozen_fields(self):
+        return [(k, v) for k, v in self.__dict__.items() if not k.startswith(TRANSIENT_PREFIXES)]
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return hash(self) == hash(other) and self._frozen_fields() == other._frozen_fields()
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        h = self.__dict__.get("_frozen_hash")
+        if h is None:
+            h = hash((type(self), tuple(self._frozen_fields())))
+            self.__dict__["_frozen_hash"] = h
+        return h
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # the frozen classes are created at runtime, so they're pickled as their model class
+        return _restore, (type(self).__bases__[1], dict(self._frozen_fields()))
+
+    def evolve(self, **changes):
+        """
+        Get a copy of this object with the attributes in ``changes`` replaced, the other attributes
+        are shared with this object.
+
+        :param changes: The new values of the attributes, eg: ``dockerPull="ubuntu:20.04"``
+        :return: A new frozen object
+        """
+        attrs = dict(self._frozen_fields())
+        for k, v in changes.items():
+            if k not in attrs:
+                raise AttributeError("'%s' has no attribute '%s'" % (type(self).__name__, k))
+            attrs[k] = freeze(v)
+        return _new_frozen(type(self), attrs)
+
+    def replace(self, path, value):
+        """
+        Get a copy of this object with the value at ``path`` replaced, only the objects along
+        the path are copied and everything else is shared with this object.
+
+        :param path: The attribute names, list indices and dictionary keys from this object to the value.
+                     Items in a list can also be selected by their identifier (``id``, or ``class``
+                     for requirements), eg: ``["steps", "align", "run", "requirements", "DockerRequirement"]``
+        :type path: list[STRING | INT]
+        :param value: The new value
+        :return: A new frozen object
+        """
+        return _replace_in(self, list(path), value)
+
+    def thaw(self):
+        """
+        :return: A mutable copy of this object (and of the objects within it)
+        """
+        return thaw(self)
+
+
+def _frozen_class(cls):
+    frozen_cls = _frozen_classes.get(cls)
+    if frozen_cls is None:
+        frozen_cls = type(cls)("Frozen" + cls.__name__, (Frozen, cls), {"__module__": cls.__module__})
+        _frozen_classes[cls] = frozen_cls
+    return frozen_cls
+
+
+def _new_frozen(frozen_cls, attrs):
+    obj = object.__new__(frozen_cls)
+    obj.__dict__.update(attrs)
+    return obj
+
+
+def _restore(cls, attrs):
+    return _new_frozen(_frozen_class(cls), {k: freeze(v) for k, v in attrs.items()})
+
+
+def freeze(value, _memo=None):
+    """
+    Get a frozen copy of ``value``, an object, list or dictionary (and everything within it).
+    Objects that are used in more than one place (eg: a tool that's run by two steps) stay shared
+    in the frozen copy, and frozen values are returned as they are.
+
+    :param value: A :class:`cwlgen.utils.Serializable`, list, dictionary or primitive value
+    :return: The frozen value
+    """
+    if isinstance(value, (Frozen, FrozenList, FrozenDict)) or isinstance(value, six.string_types) \
+            or value is None or isinstance(value, (bool, int, float)):
+        return value
+    memo = {} if _memo is None else _memo
+    retval = memo.get(id(value))
+    if retval is not None:
+        return retval
+
+    if isinstance(value, Serializable):
+        attrs = {k: freeze(v, memo) for k, v in value.__dict__.items() if not k.startswith(TRANSIENT_PREFIXES)}
+        retval = _new_frozen(_frozen_class(type(value)), attrs)
+    elif isinstance(value, (list, tuple)):
+        retval = FrozenList(freeze(v, memo) for v in value)
+    elif isinstance(value, dict):
+        retval = FrozenDict((k, freeze(v, memo)) for k, v in value.items())
+    else:
+        return value
+
+    memo[id(value)] = retval
+    return retval
+
+
+def thaw(value, _memo=None):
+    """
+    Get a mutable copy of the frozen ``value`` (see :func:`freeze`).
+    """
+    if not isinstance(value, (Frozen, FrozenList, FrozenDict)):
+        return value
+    memo = {} if _memo is None else _memo
+    retval = memo.get(id(value))
+    if retval is not None:
+        return retval
+
+    if isinstance(value, Frozen):
+        retval = object.__new__(type(value).__bases__[1])
+        retval.__dict__.update((k, thaw(v, memo)) for k, v in value._frozen_fields())
+    elif isinstance(value, FrozenList):
+        retval = [thaw(v, memo) for v in value]
+    else:
+        retval = {k: thaw(v, memo) for k, v in value.items()}
+
+    memo[id(value)] = retval
+    return retval
+
+
+def _get_identifier(item):
+    identifier = getattr(item, "id", None)
+    if identifier is None and callable(getattr(item, "get_class", None)):
+        identifier = item.get_class()
+    return identifier
+
+
+def _replace_in(node, path, value):
+    if not path:
+        return freeze(value)
+    key, rest = path[0], path[1:]
+
+    if isinstance(node, Frozen):
+        if key not in node.__dict__:
+            raise AttributeError("'%s' has no attribute '%s'" % (type(node).__name__, key))
+        return node.evolve(**{key: _replace_in(node.__dict__[key], rest, value)})
+
+    if isinstance(node, FrozenList):
+        if isinstance(key, six.integer_types):
+            index = key
+        else:
+            matches = [i for i, item in enumerate(node) if _get_identifier(item) == key]
+            if not matches:
+                raise KeyError(key)
+            index = matches[0]
+        items = list(node)
+        items[index] = _replace_in(node[index], rest, value)
+        return FrozenList(items)
+
+    if isinstance(node, FrozenDict):
+        if rest and key not in node:
+            raise KeyError(key)
+        items = dict(node)
+        items[key] = _replace_in(node.get(key), rest, value)
+        return FrozenDict(items)
+
+    raise TypeError("Can't select '%s' from the value '%s'" % (key, node))
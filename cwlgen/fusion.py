@@ -0,0 +1,251 @@
+"""
+Fuse the linear chains of steps of a :class:`cwlgen.Workflow` into subworkflows, so a runner
+schedules one step instead of each step of the chain:
+
+.. code-block:: python
+
+   fused, report = cwlgen.fuse_steps(workflow, step_overhead=30)
+   report.chains                  # [['trim', 'align', 'sort']]
+   report.estimated_savings       # 60 (seconds, for the 2 steps that aren't scheduled anymore)
+
+A step is fused with the step after it when:
+
+- its outputs are only used by that step (and not by the outputs of the workflow),
+- that step doesn't depend on any other step,
+- both steps have the same effective ``DockerRequirement`` (see :class:`cwlgen.RequirementResolver`),
+- neither step is scattered, or both are, and the second step is scattered on exactly the inputs it
+  gets from the first (a dotproduct), so the fused step can be scattered like the first step.
+
+The steps of a chain are moved, as they are, into a new subworkflow that's run by a step with the
+id of the last step of the chain, so the outputs of the chain keep their ids. The inputs of the
+subworkflow are the sources of the chain outside of it. The original workflow isn't modified, the new
+workflow shares its parameters, and the processes the steps run.
+"""
+
+import six
+
+from .dag import copy_object, item_type, output_type, source_id, source_type, step_dependencies, \
+    topological_order
+from .requirements import SubworkflowFeatureRequirement
+from .resolver import RequirementResolver
+from .workflow import Workflow
+from .workflowdeps import InputParameter, WorkflowOutputParameter, WorkflowStep, WorkflowStepInput, \
+    WorkflowStepOutput
+
+
+class FusionReport(object):
+    """
+    The chains of steps fused by :func:`fuse_steps`.
+    """
+
+    def __init__(self, chains, steps_before, steps_after, step_overhead):
+        self.chains = chains                    # list[list[STRING]], the ids of the steps of each chain
+        self.steps_before = steps_before
+        self.steps_after = steps_after
+        self.step_overhead = step_overhead
+
+    @property
+    def steps_saved(self):
+        """
+        The number of steps that aren't scheduled anymore (per job, for the chains that are scattered)
+        """
+        return self.steps_before - self.steps_after
+
+    @property
+    def estimated_savings(self):
+        """
+        The scheduling overhead saved by a run of the workflow, in the unit of ``step_overhead``
+        """
+        return self.steps_saved * self.step_overhead
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, six.string_types) else list(value)
+
+
+def _output_ids(step):
+    return [o if isinstance(o, six.string_types) else o.id for o in step.out]
+
+
+class _Fuser(object):
+
+    def __init__(self, workflow, resolver=None):
+        if not isinstance(workflow, Workflow):
+            raise TypeError("Only the steps of a cwlgen.Workflow object can be fused")
+        self.workflow = workflow
+        self.workflow_id = source_id(workflow.id or "")
+        self.resolver = resolver or RequirementResolver(workflow)
+        self.steps = dict((s.id, s) for s in workflow.steps)
+        self.dependencies = step_dependencies(workflow)
+        self.consumers = dict((step_id, set()) for step_id in self.dependencies)
+        for step_id, upstream in self.dependencies.items():
+            for upstream_id in upstream:
+                self.consumers[upstream_id].add(step_id)
+        self.workflow_outputs = set()      # the steps whose outputs are outputs of the workflow
+        for param in workflow.outputs:
+            for source in _as_list(param.outputSource):
+                source = source_id(source, self.workflow_id)
+                if "/" in source:
+                    self.workflow_outputs.add(source.split("/")[0])
+
+    def _from(self, step_input, upstream_id):
+        # whether the sources of the input are outputs of the step upstream_id (all of them, or none)
+        sources = [source_id(s, self.workflow_id) for s in _as_list(step_input.source)]
+        from_upstream = [s.split("/")[0] == upstream_id for s in sources if "/" in s]
+        if any(from_upstream) and (len(from_upstream) != len(sources) or not all(from_upstream)):
+            return None     # mixed sources
+        return bool(from_upstream)
+
+    def _scatter_compatible(self, a, b):
+        scatter_a, scatter_b = _as_list(a.scatter), _as_list(b.scatter)
+        if not scatter_a and not scatter_b:
+            return True
+        if not scatter_a or not scatter_b:
+            return False
+        if a.scatterMethod not in (None, "dotproduct") or b.scatterMethod not in (None, "dotproduct"):
+            return False
+        from_a = set()
+        for step_input in b.inputs:
+            from_upstream = self._from(step_input, a.id)
+            if from_upstream is None:
+                return False
+            if from_upstream:
+                from_a.add(step_input.id)
+        if set(scatter_b) != from_a:
+            return False
+        # the scattered inputs of the first step must come from a single source each
+        return all(len(_as_list(i.source)) == 1 for i in a.inputs if i.id in scatter_a)
+
+    def fusible(self, a, b):
+        """
+        :return: Whether the step ``a`` can be fused with the step ``b`` after it
+        """
+        return self.consumers[a] == set([b]) and a not in self.workflow_outputs \
+            and self.dependencies[b] == [a] \
+            and self.resolver.get(a, "DockerRequirement") == self.resolver.get(b, "DockerRequirement") \
+            and self._scatter_compatible(self.steps[a], self.steps[b])
+
+    def chains(self):
+        next_step = {}
+        for b, upstream in self.dependencies.items():
+            if len(upstream) == 1 and self.fusible(upstream[0], b):
+                next_step[upstream[0]] = b
+        fused = set(next_step.values())
+        chains = []
+        for step_id in topological_order(self.workflow, self.dependencies):
+            if step_id in next_step and step_id not in fused:
+                chain = [step_id]
+                while chain[-1] in next_step:
+                    chain.append(next_step[chain[-1]])
+                chains.append(chain)
+        return chains
+
+    def fuse(self, chain):
+        """
+        :return: The step that runs the subworkflow of the chain (the steps of the chain are copied)
+        """
+        chain_ids = set(chain)
+        steps = [copy_object(self.steps[step_id]) for step_id in chain]
+        first, last = steps[0], steps[-1]
+        scatter = set(_as_list(first.scatter))
+
+        sub = Workflow("%s_to_%s" % (first.id, last.id))
+        outer = WorkflowStep(last.id, run=sub)
+        sub_inputs = {}     # {(source, scattered), input id of the subworkflow}
+        for step in steps:
+            step.inputs = [copy_object(i) for i in step.inputs]
+            for step_input in step.inputs:
+                scattered = step is first and step_input.id in scatter
+                sources = []
+                for source in _as_list(step_input.source):
+                    relative = source_id(source, self.workflow_id)
+                    if "/" in relative and relative.split("/")[0] in chain_ids:
+                        sources.append(relative)
+                        continue
+                    key = (relative, scattered)
+                    if key not in sub_inputs:
+                        input_id = relative.replace("/", "_")
+                        while input_id in sub_inputs.values():
+                            input_id += "_"
+                        sub_inputs[key] = input_id
+                        param = InputParameter(input_id)
+                        param_type = source_type(self.workflow, relative)
+                        param.type = item_type(param_type) if scattered else param_type
+                        sub.inputs.append(param)
+                        outer.inputs.append(WorkflowStepInput(input_id, source=source))
+                        if scattered:
+                            outer.scatter = _as_list(outer.scatter) + [input_id]
+                    sources.append(sub_inputs[key])
+                if step_input.source is not None:
+                    step_input.source = sources[0] if isinstance(step_input.source, six.string_types) else sources
+            step.scatter = None
+            step.scatterMethod = None
+            sub.steps.append(step)
+
+        if outer.scatter is not None and len(outer.scatter) > 1:
+            outer.scatterMethod = "dotproduct"
+        elif outer.scatter is not None:
+            outer.scatter = outer.scatter[0]
+        for output_id in _output_ids(last):
+            param = WorkflowOutputParameter(output_id, output_source="%s/%s" % (last.id, output_id))
+            param.type = output_type(last, output_id) or "Any"
+            sub.outputs.append(param)
+            outer.out.append(WorkflowStepOutput(output_id))
+        return outer
+
+
+def find_fusible_chains(workflow, resolver=None):
+    """
+    :param workflow: The workflow
+    :type workflow: :class:`cwlgen.Workflow`
+    :param resolver: The resolver of the requirements of the workflow, if there's already one
+    :type resolver: :class:`cwlgen.RequirementResolver`
+    :return: The ids of the steps of each chain that can be fused (see the module documentation)
+    :rtype: list[list[STRING]]
+    """
+    return _Fuser(workflow, resolver).chains()
+
+
+def fuse_steps(workflow, chains=None, step_overhead=1.0, resolver=None):
+    """
+    Fuse the chains of steps of a workflow into subworkflows.
+
+    :param workflow: The workflow, it isn't modified
+    :type workflow: :class:`cwlgen.Workflow`
+    :param chains: The chains to fuse (default: every chain found by :func:`find_fusible_chains`)
+    :type chains: list[list[STRING]]
+    :param step_overhead: The scheduling overhead of a step (eg: in seconds), to estimate the savings
+    :type step_overhead: FLOAT
+    :param resolver: The resolver of the requirements of the workflow, if there's already one
+    :type resolver: :class:`cwlgen.RequirementResolver`
+    :return: The new workflow, and the report of the chains that were fused
+    :rtype: (:class:`cwlgen.Workflow`, FusionReport)
+    """
+    fuser = _Fuser(workflow, resolver)
+    if chains is None:
+        chains = fuser.chains()
+    else:
+        for chain in chains:
+            for a, b in zip(chain, chain[1:]):
+                if not fuser.fusible(a, b):
+                    raise ValueError("The step '%s' can't be fused with the step '%s'" % (a, b))
+
+    fused_steps = {}    # {id of the first step of a chain, the step that replaces the chain}
+    removed = set()
+    for chain in chains:
+        if len(chain) < 2:
+            continue
+        fused_steps[chain[0]] = fuser.fuse(chain)
+        removed.update(chain[1:])
+
+    retval = copy_object(workflow)
+    retval.steps = [fused_steps.get(s.id, s) for s in workflow.steps if s.id not in removed]
+    retval.inputs, retval.outputs = list(workflow.inputs), list(workflow.outputs)
+    retval.requirements, retval.hints = list(workflow.requirements), list(workflow.hints)
+    if fused_steps and not any(r.get_class() == "SubworkflowFeatureRequirement" for r in retval.requirements):
+        retval.requirements.append(SubworkflowFeatureRequirement())
+    report = FusionReport([list(c) for c in chains if len(c) > 1], len(workflow.steps), len(retval.steps),
+                          step_overhead)
+    return retval, report
@@ -0,0 +1,203 @@
+"""
+Documents with a ``$graph`` of processes (eg: packed workflows, see :mod:`cwlgen.packing`).
+
+:func:`cwlgen.parse_cwl` returns a :class:`GraphDocument` for these documents. The processes in the
+graph are indexed by their id, and each one is only parsed when it's first accessed, so opening a
+large graph only parses the processes that are used:
+
+.. code-block:: python
+
+   graph = cwlgen.parse_cwl("packed.cwl")
+   graph.ids()                  # ['main', 'bwa', ...]
+   graph["bwa"].base_command    # parses the bwa tool (and nothing else)
+   graph.main                   # the '#main' workflow
+
+Exporting a graph re-serializes the processes that were accessed (as they may have been modified),
+the other processes are written as they were loaded.
+"""
+
+import ruamel.yaml
+import six
+
+from .common import CWL_SHEBANG
+from .errors import get_context, parse_context, prepend_path, ParseError
+from .utils import literal, literal_presenter, Serializable
+
+MAIN_ID = "main"
+
+
+def _normalize_id(identifier):
+    # '#main' and 'main' refer to the same process
+    return identifier[1:] if isinstance(identifier, six.string_types) and identifier.startswith("#") else identifier
+
+
+class GraphDocument(object):
+    """
+    A CWL document with a ``$graph`` of processes, which are parsed when they're first accessed.
+    """
+
+    def __init__(self, processes=None, cwl_version='v1.0'):
+        """
+        :param processes: The processes in the graph, each must have an id
+        :type processes: list[Serializable]
+        :param cwl_version: CWL document version of the graph
+        :type cwl_version: CWLVersion
+        """
+        self.cwlVersion = cwl_version
+        self._entries = []      # list[dict | None], the loaded dictionaries of the processes that haven't been parsed
+        self._processes = []    # list[Serializable | None]
+        self._index = {}        # {id, index in the graph}
+        self._document = None
+        self._collector = None
+        self._source_map = None
+        for process in processes or []:
+            self.append(process)
+
+    @classmethod
+    def parse_dict(cls, d):
+        """
+        Index the processes in the ``$graph`` of ``d``, without parsing them.
+
+        :param d: The dictionary of the document
+        :type d: dict
+        :return: GraphDocument
+        """
+        graph = cls(cwl_version=d.get("cwlVersion"))
+        # the processes are parsed later, in the context (the document and error collector) they were loaded in
+        context = get_context()
+        if context is not None:
+            graph._document, graph._collector, graph._source_map = \
+                context.document, context.collector, context.source_map
+        for entry in d.get("$graph") or []:
+            identifier = entry.get("id") if isinstance(entry, dict) else None
+            graph._add(entry, None, identifier)
+        return graph
+
+    def _add(self, entry, process, identifier):
+        identifier = _normalize_id(identifier)
+        if identifier is None:
+            raise ValueError("The processes in a $graph must have an id")
+        if identifier in self._index:
+            raise ValueError("There's already a process with the id '%s' in the graph" % identifier)
+        self._index[identifier] = len(self._entries)
+        self._entries.append(entry)
+        self._processes.append(process)
+
+    def append(self, process):
+        """
+        Add a process to the graph.
+
+        :param process: The process, with an id that isn't in the graph yet
+        :type process: Serializable
+        """
+        self._add(None, process, getattr(process, "id", None))
+
+    def ids(self):
+        """
+        :return: The ids of the processes in the graph (without the '#'), in the order of the graph
+        """
+        return sorted(self._index, key=self._index.get)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, identifier):
+        return _normalize_id(identifier) in self._index
+
+    def __iter__(self):
+        for i in range(len(self._entries)):
+            yield self._get(i)
+
+    def __getitem__(self, identifier):
+        index = self._index.get(_normalize_id(identifier))
+        if index is None:
+            raise KeyError(identifier)
+        return self._get(index)
+
+    def get(self, identifier, default=None):
+        """
+        :param identifier: The id of the process, with or without the '#', eg: 'main' or '#main'
+        :return: The process with the id, or ``default`` if there isn't one
+        """
+        if identifier not in self:
+            return default
+        return self[identifier]
+
+    @property
+    def main(self):
+        """
+        The '#main' process of the graph, or the only process if there's a single one.
+        """
+        if MAIN_ID in self._index:
+            return self[MAIN_ID]
+        if len(self) == 1:
+            return self._get(0)
+        return None
+
+    def is_parsed(self, identifier):
+        """
+        :return: Whether the process has been parsed (or was added as an object)
+        """
+        return self._processes[self._index[_normalize_id(identifier)]] is not None
+
+    def _get(self, index):
+        process = self._processes[index]
+        if process is None:
+            process = self._parse(index)
+            self._processes[index] = process
+            self._entries[index] = None
+        return process
+
+    def _parse(self, index):
+        # imported here, as parsing a process can parse a graph
+        from .import_cwl import _parse_cwl_dict
+
+        entry = self._entries[index]
+        with parse_context(document=self._document, collector=self._collector, source_map=self._source_map) \
+                as context:
+            if self._collector is not None:
+                context.path.extend(["$graph", index])
+                process = _parse_cwl_dict(entry)
+            else:
+                try:
+                    process = _parse_cwl_dict(entry)
+                except ParseError as e:
+                    prepend_path(e, index)
+                    prepend_path(e, "$graph")
+                    raise
+        # the processes in a graph inherit the version of the document
+        if process is not None and self.cwlVersion and "cwlVersion" not in entry:
+            process.cwlVersion = self.cwlVersion
+        return process
+
+    def get_dict(self):
+        graph = []
+        for entry, process in zip(self._entries, self._processes):
+            if process is not None:
+                entry = process.get_dict()
+                entry.pop("cwlVersion", None)
+            graph.append(Serializable.serialize(entry))
+        d = {"$graph": graph}
+        if self.cwlVersion:
+            d["cwlVersion"] = self.cwlVersion
+        return d
+
+    def export_string(self):
+        ruamel.yaml.add_representer(literal, literal_presenter)
+        return ruamel.yaml.dump(self.get_dict(), default_flow_style=False)
+
+    def export(self, outfile=None):
+        """
+        Export the graph in CWL either on STDOUT or in outfile.
+        """
+        rep = self.export_string()
+
+        # Write CWL file in YAML
+        if outfile is None:
+            six.print_(CWL_SHEBANG, "\n", sep='')
+            six.print_(rep)
+        else:
+            out_write = open(outfile, 'w')
+            out_write.write(CWL_SHEBANG + '\n\n')
+            out_write.write(rep)
+            out_write.close()
@@ -11,49 +11,126 @@ import logging
 
 # External libraries
 import ruamel.yaml as ryaml
-import cwlgen
+from .errors import get_context, parse_context, report, UnknownClassError
+from .sourcemap import load_with_positions
+from .roundtrip import load_round_trip
+from .commandlinetool import CommandLineTool
+from .expressiontool import ExpressionTool
+from .workflow import Workflow
+from .graph import GraphDocument
 
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger(__name__)
 
+# the types the processes are parsed as, by their CWL class
+_process_types = {
+    CommandLineTool.__CLASS__: CommandLineTool,
+    ExpressionTool.__CLASS__: ExpressionTool,
+    Workflow.__CLASS__: Workflow,
+}
+
 #  Class(es)  ------------------------------
 
 
-def parse_cwl(cwl_path):
+def register_process_type(cwl_class, process_type):
+    """
+    Register the type to parse the processes of a CWL class with, for documents and the
+    (inline) ``run`` of workflow steps.
+
+    :param cwl_class: The value of the ``class`` field of the process, eg: 'ExpressionTool'
+    :type cwl_class: STRING
+    :param process_type: The type to parse the process with, it must have a ``parse_dict`` class method
+    :type process_type: type
+    """
+    _process_types[cwl_class] = process_type
+
+
+def get_process_type(cwl_class):
+    """
+    :param cwl_class: The value of the ``class`` field of a process
+    :return: The registered type, or None if the class is not known
+    """
+    return _process_types.get(cwl_class)
+
+
+def parse_cwl(cwl_path, errors=None, source_map=None, round_trip=False):
     """
     Method that parses a CWL file and will a
-    :class:`cwlgen.Workflow` or :class:`cwlgen.CommandLineTool`.
+    :class:`cwlgen.Workflow`, :class:`cwlgen.CommandLineTool` or :class:`cwlgen.ExpressionTool`.
     Note: this will not import additional files.
+    Documents with a ``$graph`` return a :class:`cwlgen.GraphDocument`, which parses each process when it's accessed.
 
     :param cwl_path: PATH to the CWL file
     :type cwl_path: str
-    :return: :class:`cwlgen.Workflow` | :class:`cwlgen.CommandLineTool`
+    :param errors: Collect the parse errors here and keep parsing, instead of raising the first error
+    :type errors: :class:`cwlgen.ErrorCollector`
+    :param source_map: Record the location of each parsed object here
+    :type source_map: :class:`cwlgen.SourceMap`
+    :param round_trip: Keep the loaded document, so the comments, key order and formatting are kept on export
+    :type round_trip: bool
+    :return: :class:`cwlgen.Workflow` | :class:`cwlgen.CommandLineTool` | :class:`cwlgen.ExpressionTool`
+             | :class:`cwlgen.GraphDocument`
     """
 
     with open(cwl_path) as yaml_file:
-        cwl_dict = ryaml.load(yaml_file, Loader=ryaml.Loader)
-    return parse_cwl_dict(cwl_dict)
+        if round_trip:
+            return _parse_round_trip(load_round_trip(yaml_file), cwl_path, errors, source_map)
+        cwl_dict = _load(yaml_file, with_positions=errors is not None or source_map is not None)
+    with parse_context(document=cwl_path, collector=errors, source_map=source_map):
+        return _parse_cwl_dict(cwl_dict)
+
+
+def parse_cwl_string(cwlstr, errors=None, source_map=None, round_trip=False):
+    if round_trip:
+        return _parse_round_trip(load_round_trip(cwlstr), None, errors, source_map)
+    cwl_dict = _load(cwlstr, with_positions=errors is not None or source_map is not None)
+    return parse_cwl_dict(cwl_dict, errors=errors, source_map=source_map)
 
 
-def parse_cwl_string(cwlstr):
-    cwl_dict = ryaml.load(cwlstr, Loader=ryaml.Loader)
-    return parse_cwl_dict(cwl_dict)
+def _parse_round_trip(source, cwl_path, errors, source_map):
+    with parse_context(document=cwl_path, collector=errors, source_map=source_map):
+        parsed = _parse_cwl_dict(source.node)
+    if parsed is not None:
+        parsed._round_trip_source = source
+    return parsed
 
 
-def parse_cwl_dict(cwl_dict):
+def parse_cwl_dict(cwl_dict, errors=None, source_map=None):
     """
     Method that parses a dictionary and will return a
-    :class:`cwlgen.Workflow` or :class:`cwlgen.CommandLineTool`.
+    :class:`cwlgen.Workflow`, :class:`cwlgen.CommandLineTool` or :class:`cwlgen.ExpressionTool`.
 
     :param cwl_dict: The dictionary to pass, must contain a 'class' field.
     :type cwl_dict: :class:`dict`
-    :return: :class:`cwlgen.Workflow` | :class:`cwlgen.CommandLineTool`
+    :param errors: Collect the parse errors here and keep parsing, instead of raising the first error
+    :type errors: :class:`cwlgen.ErrorCollector`
+    :param source_map: Record the location of each parsed object here, this requires the dictionary to
+                       have been loaded with positions (eg: :func:`cwlgen.sourcemap.load_with_positions`)
+    :type source_map: :class:`cwlgen.SourceMap`
+    :return: :class:`cwlgen.Workflow` | :class:`cwlgen.CommandLineTool` | :class:`cwlgen.ExpressionTool`
+             | :class:`cwlgen.GraphDocument`
     """
-    cl = cwl_dict.get("class")
+    if errors is None and source_map is None and get_context() is not None:
+        # we're already inside a document (eg: parse_cwl)
+        return _parse_cwl_dict(cwl_dict)
+    with parse_context(collector=errors, source_map=source_map):
+        return _parse_cwl_dict(cwl_dict)
+
 
-    if cl == "CommandLineTool":
-        return cwlgen.CommandLineTool.parse_dict(cwl_dict)
-    elif cl == "Workflow":
-        return cwlgen.Workflow.parse_dict(cwl_dict)
+def _load(stream, with_positions=False):
+    # the position loader is slower, so only use it when the positions will be reported
+    if with_positions:
+        return load_with_positions(stream)
+    return ryaml.load(stream, Loader=ryaml.Loader)
+
+
+def _parse_cwl_dict(cwl_dict):
+    if "$graph" in cwl_dict:
+        return GraphDocument.parse_dict(cwl_dict)
+
+    cl = cwl_dict.get("class")
+    process_type = _process_types.get(cl)
+    if process_type is not None:
+        return process_type.parse_dict(cwl_dict)
 
-    raise NotImplementedError("The CWL class '" + str(cl) + "' was not a recognised CWL class")
+    report(UnknownClassError("The CWL class '" + str(cl) + "' was not a recognised CWL class"), cwl_dict, "class")
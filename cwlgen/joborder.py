@@ -0,0 +1,143 @@
+"""
+Generate the jobs (input objects) of a parameter sweep of a process, and write them as job order
+files, without holding all the jobs in memory:
+
+.. code-block:: python
+
+   jobs = cwlgen.generate_jobs(tool, {"reads": reads, "threads": [1, 2, 4]},
+                               scatter_method="flat_crossproduct", base={"reference": ref})
+   cwlgen.write_jobs(jobs, "sweep.jsonl", shards=8)     # sweep-0.jsonl ... sweep-7.jsonl
+
+The values of the parameters can be any iterables (eg: generators), they're combined like the
+``scatter`` of a workflow step (see :data:`cwlgen.workflowdeps.SCATTER_METHODS`): a dotproduct pairs
+the n-th values of each parameter, a crossproduct makes every combination of them. A crossproduct
+only keeps the values of each parameter in memory, never the combinations.
+"""
+
+import io
+import itertools
+import json
+import os
+
+import ruamel.yaml
+import six
+
+from .canonical import normalize
+from .utils import Serializable
+from .workflowdeps import SCATTER_METHODS
+
+FORMATS = ["jsonl", "json", "yaml"]
+
+_EXHAUSTED = object()
+
+
+def _dotproduct(names, iterables):
+    for values in six.moves.zip_longest(*iterables, fillvalue=_EXHAUSTED):
+        if any(v is _EXHAUSTED for v in values):
+            ended = [n for n, v in zip(names, values) if v is _EXHAUSTED]
+            raise ValueError("The parameters of a dotproduct must have the same length, %s ended first"
+                             % ", ".join(ended))
+        yield values
+
+
+def generate_jobs(process, parameters, scatter_method="dotproduct", base=None):
+    """
+    Generate the jobs of a parameter sweep, lazily.
+
+    :param process: The process the jobs are for, the parameters must be its inputs
+    :type process: :class:`cwlgen.CommandLineTool` | :class:`cwlgen.Workflow` | dict
+    :param parameters: The values of each swept input, by input id
+    :type parameters: dict[STRING, iterable]
+    :param scatter_method: How the values are combined, one of :data:`cwlgen.workflowdeps.SCATTER_METHODS`
+                           (both crossproducts generate the same jobs)
+    :type scatter_method: STRING
+    :param base: The values of the inputs that are the same for every job
+    :type base: dict
+    :return: A generator of the jobs
+    :raises ValueError: If the scatter method is unknown, or the process has no input of a parameter
+                        (when it's called, before any job is generated)
+    """
+    if scatter_method not in SCATTER_METHODS:
+        raise ValueError("The scatter method '%s' isn't one of %s" % (scatter_method, ", ".join(SCATTER_METHODS)))
+    d = normalize(process.get_dict() if isinstance(process, Serializable) else process)
+    inputs = d.get("inputs") or {}
+    unknown = [name for name in list(parameters) + list(base or {}) if name not in inputs]
+    if unknown:
+        raise ValueError("The process '%s' has no inputs: %s" % (d.get("id"), ", ".join(sorted(unknown))))
+
+    names = list(parameters)
+    return _generate_jobs(names, [parameters[name] for name in names], scatter_method, dict(base or {}))
+
+
+def _generate_jobs(names, iterables, scatter_method, base):
+    if scatter_method == "dotproduct":
+        combinations = _dotproduct(names, iterables)
+    else:
+        combinations = itertools.product(*iterables)
+    for combination in combinations:
+        job = dict(base)
+        job.update(zip(names, combination))
+        yield job
+
+
+def _shard_path(path, shard, shards):
+    if shards == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return "%s-%d%s" % (root, shard, ext)
+
+
+def _dump(job, format):
+    if format == "yaml":
+        return ruamel.yaml.dump(job, default_flow_style=False)
+    return six.text_type(json.dumps(job, indent=2 if format == "json" else None, sort_keys=True)) + u"\n"
+
+
+def write_jobs(jobs, path, format="jsonl", shards=1):
+    """
+    Write jobs as they're generated (see :func:`generate_jobs`), spreading them round-robin over
+    ``shards`` outputs so they can be submitted in parallel.
+
+    :param jobs: The jobs
+    :type jobs: iterable[dict]
+    :param path: For the ``jsonl`` format, the file of the jobs (``-<shard>`` is added before the
+                 extension of each shard). For the ``json`` and ``yaml`` formats, the directory of the
+                 job order files (``job-<index>.<format>``, in a ``shard-<shard>`` directory of each shard)
+    :type path: STRING
+    :param format: One of ``jsonl`` (a job per line), ``json`` or ``yaml`` (a file per job)
+    :type format: STRING
+    :param shards: The number of outputs
+    :type shards: INT
+    :return: The paths of the shards (files or directories) and the number of jobs written
+    :rtype: (list[STRING], INT)
+    """
+    if format not in FORMATS:
+        raise ValueError("The format '%s' isn't one of %s" % (format, ", ".join(FORMATS)))
+    if shards < 1:
+        raise ValueError("The number of shards must be at least 1")
+
+    count = 0
+    if format == "jsonl":
+        paths = [_shard_path(path, shard, shards) for shard in range(shards)]
+        outputs = []
+        try:
+            for shard_path in paths:
+                outputs.append(io.open(shard_path, "w", encoding="utf-8"))
+            for job in jobs:
+                outputs[count % shards].write(_dump(job, format))
+                count += 1
+        finally:
+            for output in outputs:
+                output.close()
+        return paths, count
+
+    paths = [path if shards == 1 else os.path.join(path, "shard-%d" % shard) for shard in range(shards)]
+    for directory in paths:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+    for job in jobs:
+        job_path = os.path.join(paths[count % shards], "job-%d.%s" % (count, format))
+        with io.open(job_path, "w", encoding="utf-8") as output:
+            output.write(six.text_type(_dump(job, format)))
+        count += 1
+    return paths, count
@@ -0,0 +1,137 @@
+"""
+Pack a workflow, and every process that its steps run, into a single document with a ``$graph``:
+
+.. code-block:: yaml
+
+   cwlVersion: v1.0
+   $graph:
+   - id: '#main'
+     class: Workflow
+     steps:
+       align:
+         run: '#bwa'
+         ...
+   - id: '#bwa'
+     class: CommandLineTool
+     ...
+
+The processes are packed from the objects in memory (the ``run`` of each :class:`cwlgen.WorkflowStep`),
+so the documents don't have to be written and read again. A process that's run by more than one step,
+or an identical copy of it, is only included once. References to other documents (where ``run`` is a
+path) are kept as they are, unless a ``resolve`` function is given to load them.
+"""
+
+import copy
+
+import six
+
+from .canonical import digest
+from .utils import Serializable
+
+MAIN_ID = "main"
+
+
+class _Packer(object):
+
+    def __init__(self, resolve=None):
+        self.resolve = resolve
+        self.graph = []             # list[dict], the processes the main workflow depends on
+        self.refs = {}              # {id(process), '#id'}, the processes in the graph
+        self.refs_by_digest = {}    # {digest, '#id'}
+        self.resolved = {}          # {run path, process}
+        self.used_ids = set()
+        self.processes = []         # keeps the processes alive, so id(process) isn't reused
+
+    def _new_id(self, preferred):
+        preferred = (preferred or "process").lstrip("#")
+        identifier, i = preferred, 1
+        while identifier in self.used_ids:
+            i += 1
+            identifier = "%s_%d" % (preferred, i)
+        self.used_ids.add(identifier)
+        return identifier
+
+    def add(self, process, d, preferred_id):
+        """
+        Add the process (and the processes its steps run) to the graph.
+
+        :param process: The process object, or None if it only exists as the dictionary ``d``
+        :param d: The dictionary of the process, the run of each step can be inline
+        :return: The reference to the process in the graph, eg: '#bwa'
+        """
+        if process is not None and id(process) in self.refs:
+            return self.refs[id(process)]
+
+        entry = self._rewrite_steps(process, d)
+        entry.pop("cwlVersion", None)
+        entry.pop("id", None)
+        content_digest = digest(entry)
+        ref = self.refs_by_digest.get(content_digest)
+        if ref is None:
+            ref = "#" + self._new_id(preferred_id or d.get("id"))
+            self.refs_by_digest[content_digest] = ref
+            entry["id"] = ref
+            self.graph.append(entry)
+        if process is not None:
+            self.refs[id(process)] = ref
+            self.processes.append(process)
+        return ref
+
+    def _rewrite_steps(self, process, d):
+        # a copy of the dictionary where the run of each step is a reference to the graph
+        entry = dict(d)
+        if d.get("class") != "Workflow" or not isinstance(d.get("steps"), dict):
+            return entry
+
+        step_objects = {}
+        if process is not None:
+            step_objects = {s.id: s for s in getattr(process, "steps", None) or []}
+
+        steps = {}
+        for step_id, step in d["steps"].items():
+            run = step.get("run")
+            step_object = step_objects.get(step_id)
+            run_object = getattr(step_object, "run", None)
+            if isinstance(run, dict):
+                run_object = run_object if isinstance(run_object, Serializable) else None
+                step = dict(step, run=self.add(run_object, run, run.get("id") or step_id))
+            elif isinstance(run, six.string_types) and self.resolve is not None and not run.startswith("#"):
+                resolved = self.resolved.get(run)
+                if resolved is None:
+                    resolved = self.resolved[run] = self.resolve(run)
+                if resolved is not None:
+                    resolved_dict = resolved.get_dict() if isinstance(resolved, Serializable) else resolved
+                    resolved_object = resolved if isinstance(resolved, Serializable) else None
+                    step = dict(step, run=self.add(resolved_object, resolved_dict, resolved_dict.get("id") or step_id))
+            steps[step_id] = step
+        entry["steps"] = steps
+        return entry
+
+
+def pack(workflow, resolve=None):
+    """
+    Pack ``workflow`` and the processes its steps run into a single document with a ``$graph``
+    (see the module documentation), the workflow has the id '#main'.
+
+    :param workflow: The workflow to pack, or its dictionary
+    :type workflow: :class:`cwlgen.Workflow` | dict
+    :param resolve: Called with the ``run`` of a step when it's a reference to another document (eg: a path),
+                    and returns the process (or its dictionary) to pack, or None to keep the reference
+    :type resolve: (STRING) -> Serializable | dict | None
+    :return: The packed document as a dictionary
+    """
+    packer = _Packer(resolve=resolve)
+    process = workflow if isinstance(workflow, Serializable) else None
+    d = workflow.get_dict() if process is not None else workflow
+
+    # the main workflow is always added to the graph, even if one of its steps runs an identical workflow
+    packer.used_ids.add(MAIN_ID)
+    main = packer._rewrite_steps(process, d)
+    main.pop("cwlVersion", None)
+    main["id"] = "#" + MAIN_ID
+
+    # the nested dictionaries can be shared with the objects (see cwlgen.tracking), so they're copied
+    retval = {"$graph": [main] + packer.graph}
+    if d.get("cwlVersion"):
+        retval["cwlVersion"] = d["cwlVersion"]
+    return copy.deepcopy(retval)
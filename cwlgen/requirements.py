@@ -2,12 +2,31 @@ import six
 from cwlgen.commandlinebinding import CommandLineBinding
 
 from .common import parse_type, get_type_dict
-from .utils import Serializable
+from .errors import get_collecting_path, report, InvalidValueError, MissingFieldError
+from .tracking import TrackedMeta
+from .utils import Serializable, describe_parse_failure, value_or_default
 
 
+class _RequirementRegistry(TrackedMeta):
+    """
+    Metaclass that records the subclasses of :class:`Requirement` that declare a ``cwl_class``
+    in a registry keyed by that CWL class, so that parsing can dispatch on ``class`` with a
+    single lookup. A subclass that declares the same ``cwl_class`` replaces the registered type.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(_RequirementRegistry, cls).__init__(name, bases, namespace)
+        cwl_class = namespace.get("cwl_class")
+        if cwl_class is not None:
+            cls._registry[cwl_class] = cls
+
+
+@six.add_metaclass(_RequirementRegistry)
 class Requirement(Serializable):
 
     ignore_fields_on_parse = ["class"]
+    cwl_class = None    # the CWL class the subclasses are registered for, if they declare it
+    _registry = {}      # type: {str, type}
 
     '''
     Requirement that must be met in order to execute the process.
@@ -26,22 +45,129 @@ class Requirement(Serializable):
     def __hash__(self):
         return hash(self.get_class())
 
+    @staticmethod
+    def register(req_class, requirement_type):
+        """
+        Register a custom requirement (or hint) type, for example a vendor extension
+        such as ``cwltool:LoadListingRequirement``. Subclasses of :class:`Requirement`
+        that declare a ``cwl_class`` attribute are registered automatically under it.
+
+        :param req_class: The value of the ``class`` field this type should be parsed from
+        :type req_class: STRING
+        :param requirement_type: The type to parse the requirement with
+        :type requirement_type: type
+        """
+        Requirement._registry[req_class] = requirement_type
+
+    @staticmethod
+    def get_registered_type(req_class):
+        """
+        :param req_class: The value of the ``class`` field of a requirement
+        :return: The registered type, or None if the class is not known
+        """
+        return Requirement._registry.get(req_class)
+
     @classmethod
     def parse_dict(cls, d):
+        return Requirement.parse_dict_for_class(d["class"], d)
+
+    @staticmethod
+    def parse_dict_for_class(req_class, d):
+        """
+        Parse the fields of a requirement whose class is already known, as is the case for the
+        map form ``{ $class: { ...fields } }``. The ``class`` field doesn't need to be in ``d``.
+
+        :param req_class: The CWL class of the requirement
+        :type req_class: STRING
+        :param d: The fields of the requirement
+        :type d: dict
+        """
+        Req = Requirement._registry.get(req_class)
+        if Req is None:
+            return UnknownRequirement.parse_dict_with_class(req_class, d)
 
-        c = d["class"]
-        requirements = [
-            InlineJavascriptRequirement, SchemaDefRequirement, SoftwareRequirement, InitialWorkDirRequirement,
-            SubworkflowFeatureRequirement, ScatterFeatureRequirement, MultipleInputFeatureRequirement,
-            StepInputExpressionRequirement, DockerRequirement, EnvVarRequirement, ShellCommandRequirement,
-            ResourceRequirement
-        ]
+        return Req.parse_dict_generic(Req, d)
+
+
+class UnknownRequirement(Requirement):
+    """
+    An opaque requirement (or hint) whose class isn't registered, such as a vendor extension.
+    The fields are kept as-is so they survive a round trip through cwlgen.
+    """
 
-        for Req in requirements:
-            if Req.__name__ == c:
-                return Req.parse_dict_generic(Req, d)
+    def __init__(self, req_class, fields=None):
+        """
+        :param req_class: requirement class
+        :type req_class: STRING
+        :param fields: The remaining fields of the requirement (excluding ``class``)
+        :type fields: dict
+        """
+        Requirement.__init__(self, req_class)
+        self.fields = value_or_default(fields, {})
 
-        return None
+    def get_dict(self):
+        return self.serialize(self.fields)
+
+    @classmethod
+    def parse_dict_with_class(cls, req_class, d):
+        return cls(req_class, {k: v for k, v in d.items() if k != "class"})
+
+
+def parse_requirements(reqs, field=None):
+    """
+    Parse the ``requirements`` or ``hints`` field of a process or workflow step, which can
+    either be a list of requirements (each with a ``class`` field), or a dictionary
+    of the form ``{ $class: { ...fields } }``.
+
+    A requirement that can't be parsed is reported as an :class:`cwlgen.errors.InvalidValueError`
+    (or a :class:`cwlgen.errors.MissingFieldError` if it has no class), located at its index (or
+    class) within the field, and is left out of the result when errors are collected.
+
+    :param reqs: The list or dictionary of requirements
+    :type reqs: list[dict] | dict | None
+    :param field: The field of the process the requirements are parsed from (eg: 'hints'), to locate errors
+    :type field: STRING
+    :return: list[Requirement]
+    """
+    if not reqs:
+        return []
+    if field is None:
+        return _parse_requirements(reqs)
+    return Serializable.try_parse_at(get_collecting_path(), field, reqs, [Requirement], _parse_requirements)
+
+
+def _parse_requirements(reqs, types=None):
+    path = get_collecting_path()
+    retval = []
+    if isinstance(reqs, dict):
+        items = [(c, c, r if r is not None else {}) for c, r in reqs.items()]
+    else:
+        items = [(i, r.get("class") if isinstance(r, dict) else None, r) for i, r in enumerate(reqs)]
+    for key, req_class, value in items:
+        if isinstance(value, dict) and req_class is None:
+            report(MissingFieldError("The fields class were not found when parsing type 'Requirement'"), reqs, key)
+            continue
+        parsed = None
+        if isinstance(value, dict):
+            parsed = Serializable.try_parse_at(path, key, value, [Requirement],
+                                               lambda v, t: Requirement.parse_dict_for_class(req_class, v))
+        if parsed is None:
+            req_type = Requirement.get_registered_type(req_class) or Requirement
+            report(InvalidValueError(describe_parse_failure(value, [req_type])), reqs, key)
+            continue
+        retval.append(parsed)
+    return retval
+
+
+def get_requirements_dict(reqs):
+    """
+    Convert a list of requirements into the ``{ $class: { ...fields } }`` form.
+
+    :param reqs: The list of requirements
+    :type reqs: list[Requirement]
+    :return: dict
+    """
+    return {r.get_class(): r.get_dict() for r in reqs}
 
 
 class InlineJavascriptRequirement(Requirement):
@@ -52,6 +178,8 @@ class InlineJavascriptRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#InlineJavascriptRequirement
     """
 
+    cwl_class = 'InlineJavascriptRequirement'
+
     def __init__(self, expression_lib=None):
         '''
         :param expression_lib: List of Strings
@@ -72,6 +200,8 @@ class SchemaDefRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#SchemaDefRequirement
     """
 
+    cwl_class = "SchemaDefRequirement"
+
     def __init__(self, types):
         """
         :param types: The list of type definitions.
@@ -123,7 +253,7 @@ class SchemaDefRequirement(Requirement):
                 self.label = label
 
             def get_dict(self):
-                d = super(self, self).get_dict()
+                d = super(SchemaDefRequirement.InputRecordSchema.InputRecordField, self).get_dict()
                 d["type"] = get_type_dict(self.type)
                 return d
 
@@ -216,6 +346,9 @@ class SoftwareRequirement(Requirement):
 
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#SoftwareRequirement
     """
+
+    cwl_class = "SoftwareRequirement"
+
     def __init__(self, packages=None):
         Requirement.__init__(self, "SoftwareRequirement")
         self.packages = packages or []      # list[SoftwarePackage]
@@ -247,6 +380,9 @@ class InitialWorkDirRequirement(Requirement):
 
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#InitialWorkDirRequirement
     """
+
+    cwl_class = "InitialWorkDirRequirement"
+
     def __init__(self, listing):
         """
         :param listing: The list of files or subdirectories that must be placed in the
@@ -296,6 +432,8 @@ class SubworkflowFeatureRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#SubworkflowFeatureRequirement
     """
 
+    cwl_class = 'SubworkflowFeatureRequirement'
+
     def __init__(self):
         Requirement.__init__(self, 'SubworkflowFeatureRequirement')
 
@@ -307,6 +445,8 @@ class ScatterFeatureRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#ScatterFeatureRequirement
     """
 
+    cwl_class = 'ScatterFeatureRequirement'
+
     def __init__(self):
         Requirement.__init__(self, 'ScatterFeatureRequirement')
 
@@ -319,6 +459,8 @@ class MultipleInputFeatureRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#MultipleInputFeatureRequirement
     """
 
+    cwl_class = 'MultipleInputFeatureRequirement'
+
     def __init__(self):
         Requirement.__init__(self, 'MultipleInputFeatureRequirement')
 
@@ -330,6 +472,8 @@ class StepInputExpressionRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/Workflow.html#StepInputExpressionRequirement
     """
 
+    cwl_class = 'StepInputExpressionRequirement'
+
     def __init__(self):
         Requirement.__init__(self, 'StepInputExpressionRequirement')
 
@@ -342,6 +486,8 @@ class DockerRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/CommandLineTool.html#DockerRequirement
     """
 
+    cwl_class = 'DockerRequirement'
+
     def __init__(self, docker_pull=None, docker_load=None, docker_file=None,
                  docker_import=None, docker_image_id=None, docker_output_dir=None):
         """
@@ -374,7 +520,12 @@ class EnvVarRequirement(Requirement):
 
     Documentation: https://www.commonwl.org/v1.0/CommandLineTool.html#EnvVarRequirement
     """
-    def __init__(self, env_def):
+
+    cwl_class = 'EnvVarRequirement'
+
+    required_fields = ["envDef"]
+
+    def __init__(self, env_def=None):
         """
         :param env_def: The list of environment variables.
         :type env_def: list[EnvironmentDef]
@@ -390,7 +541,9 @@ class EnvVarRequirement(Requirement):
 
         Documentation: https://www.commonwl.org/v1.0/CommandLineTool.html#EnvironmentDef
         """
-        def __init__(self, env_name, env_value):
+        required_fields = ["envName", "envValue"]
+
+        def __init__(self, env_name=None, env_value=None):
             """
             :param env_name: The environment variable name
             :type env_name: STRING
@@ -400,6 +553,15 @@ class EnvVarRequirement(Requirement):
             self.envName = env_name
             self.envValue = env_value
 
+        @classmethod
+        def parse_with_id(cls, d, identifier):
+            # the map form is { $envName: envValue }, or { $envName: { envValue: value } }
+            if not isinstance(d, dict):
+                return cls(identifier, d)
+            return cls.parse_dict_generic(cls, dict(d, envName=identifier))
+
+    parse_types = {"envDef": [[EnvironmentDef]]}
+
 
 class ShellCommandRequirement(Requirement):
     """
@@ -408,6 +570,8 @@ class ShellCommandRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/CommandLineTool.html#ShellCommandRequirement
     """
 
+    cwl_class = 'ShellCommandRequirement'
+
     def __init__(self):
         Requirement.__init__(self, 'ShellCommandRequirement')
 
@@ -419,6 +583,8 @@ class ResourceRequirement(Requirement):
     Documentation: https://www.commonwl.org/v1.0/CommandLineTool.html#ResourceRequirement
     """
 
+    cwl_class = 'ResourceRequirement'
+
     def __init__(self, cores_min=None, cores_max=None, ram_min=None, ram_max=None, tmpdir_min=None, tmpdir_max=None,
                  outdir_min=None, outdir_max=None):
         """
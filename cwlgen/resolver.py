@@ -0,0 +1,243 @@
+"""
+Resolve the effective requirements and hints of the steps of a workflow, from the requirements
+of the workflow (and of the workflows it's nested in), of the step, and of the process the step runs:
+
+.. code-block:: python
+
+   resolver = cwlgen.RequirementResolver(workflow)
+   resolver.get("align", "DockerRequirement")        # {'dockerPull': 'biocontainers/bwa'}
+   resolver.get("qc/fastqc", "ResourceRequirement")  # a step of the subworkflow of the step 'qc'
+   workflow.steps[0].requirements.append(cwlgen.ResourceRequirement(ram_min=8000))
+   resolver.invalidate(workflow.steps[0])            # only the step (and its subworkflow) is resolved again
+
+Following https://www.commonwl.org/v1.0/Workflow.html#Requirements_and_hints, a requirement of any
+process applies to the processes within it, and the requirement of the innermost process takes
+precedence. Requirements take precedence over hints of the same class, wherever they're declared.
+
+The requirements of each process and the effective requirements of each step are computed once, and
+cached until they're invalidated. Invalidating a process (or one of its requirements) only drops the
+requirements of the steps within it.
+"""
+
+import six
+
+from .canonical import normalize
+from .requirements import Requirement
+from .utils import Serializable
+
+
+class _Level(object):
+    # a process or workflow step in the tree of a workflow, with the requirements it declares
+
+    def __init__(self, source, parent=None, path=None):
+        self.source = source        # Serializable | dict
+        self.parent = parent
+        self.path = path            # the path of the step, for the levels of a step and of the process it runs
+        self.run = None             # the level of the process a step runs, for the level of a step
+        self.own = None             # ({class: requirement}, {class: hint}), or None if not computed
+
+    def chain(self):
+        # the levels from the outermost to this one
+        levels, level = [], self
+        while level is not None:
+            levels.append(level)
+            level = level.parent
+        return levels[::-1]
+
+    def declared(self):
+        if self.own is None:
+            self.own = tuple(self._declared(field) for field in ("requirements", "hints"))
+        return self.own
+
+    def _declared(self, field):
+        source = self.source
+        if isinstance(source, Serializable):
+            # the requirements can be objects, or dictionaries (eg: with their class)
+            requirements = [dict(r.get_dict(), **{"class": r.get_class()}) if isinstance(r, Requirement) else r
+                            for r in getattr(source, field, None) or []]
+        else:
+            requirements = source.get(field) if isinstance(source, dict) else None
+        requirements = normalize({field: requirements}).get(field)
+        return dict(requirements) if isinstance(requirements, dict) else {}
+
+    def declares(self, requirement):
+        for field in ("requirements", "hints"):
+            if any(r is requirement for r in getattr(self.source, field, None) or []):
+                return True
+        return False
+
+
+class RequirementResolver(object):
+    """
+    The effective requirements and hints of the steps of a workflow, cached until they're invalidated.
+    """
+
+    def __init__(self, workflow, resolve=None):
+        """
+        :param workflow: The workflow, or its dictionary
+        :type workflow: :class:`cwlgen.Workflow` | dict
+        :param resolve: Called with the ``run`` of a step when it's a reference to another document (eg: a path),
+                        and returns the process (or its dictionary), or None to ignore its requirements
+        :type resolve: (STRING) -> Serializable | dict | None
+        """
+        self.workflow = workflow
+        self.resolve = resolve
+        self._resolved = {}     # {run path, process}
+        self._index = None      # {step path, the level of the process it runs}
+        self._root = None       # the level of the workflow
+        self._levels = None     # list[_Level]
+        self._effective = {}    # {step path, ({class: requirement}, {class: hint})}
+
+    def _build_index(self):
+        self._index, self._levels = {}, []
+        self._root = self._level(self.workflow, None)
+        self._add_process(self._root, "")
+
+    def _level(self, source, parent, path=None):
+        level = _Level(source, parent, path)
+        self._levels.append(level)
+        return level
+
+    def _add_process(self, process_level, prefix):
+        process = process_level.source
+        if isinstance(process, Serializable):
+            steps = [(s.id, s) for s in getattr(process, "steps", None) or []]
+        elif isinstance(process, dict) and process.get("class") == "Workflow":
+            steps = normalize({"steps": process.get("steps")}).get("steps") or {}
+            steps = sorted(steps.items()) if isinstance(steps, dict) else []
+        else:
+            return
+
+        for step_id, step in steps:
+            self._add_run(self._level(step, process_level, prefix + step_id))
+
+    def _add_run(self, step_level):
+        # index the process a step runs (and its steps)
+        step = step_level.source
+        run = step.run if isinstance(step, Serializable) else step.get("run") if isinstance(step, dict) else None
+        if isinstance(run, six.string_types):
+            run = self._resolve(run)
+        run_level = step_level.run = self._level(run if isinstance(run, (Serializable, dict)) else {},
+                                                 step_level, step_level.path)
+        self._index[step_level.path] = run_level
+        self._add_process(run_level, step_level.path + "/")
+
+    def _rebuild_run(self, step_level):
+        # index the process of a step again (eg: after its run changed)
+        old = step_level.run
+        self._levels = [level for level in self._levels if old not in level.chain()]
+        prefix = step_level.path + "/"
+        for path in list(self._index):
+            if path.startswith(prefix):
+                del self._index[path]
+                self._effective.pop(path, None)
+        self._add_run(step_level)
+
+    def _resolve(self, run):
+        if self.resolve is None or run.startswith("#"):
+            return None
+        if run not in self._resolved:
+            self._resolved[run] = self.resolve(run)
+        return self._resolved[run]
+
+    def steps(self):
+        """
+        :return: The paths of the steps of the workflow, and of the workflows they run (eg: 'qc/fastqc')
+        """
+        if self._index is None:
+            self._build_index()
+        return list(self._index)
+
+    def process(self, step):
+        """
+        :param step: The path of the step (eg: 'qc/fastqc')
+        :type step: STRING
+        :return: The process the step runs (resolved if it's a reference), or an empty dictionary if it's unknown
+        :rtype: Serializable | dict
+        """
+        if self._index is None:
+            self._build_index()
+        level = self._index.get(step)
+        if level is None:
+            raise KeyError("The workflow has no step '%s'" % step)
+        return level.source
+
+    def _resolve_step(self, step):
+        if step is not None and not isinstance(step, six.string_types):
+            step = step.id
+        effective = self._effective.get(step)
+        if effective is not None:
+            return effective
+
+        if self._index is None:
+            self._build_index()
+        level = self._root if step is None else self._index.get(step)
+        if level is None:
+            raise KeyError("The workflow has no step '%s'" % step)
+        requirements, hints = {}, {}
+        for outer in level.chain():
+            declared_requirements, declared_hints = outer.declared()
+            requirements.update(declared_requirements)
+            hints.update(declared_hints)
+        for cwl_class in requirements:
+            hints.pop(cwl_class, None)
+        effective = self._effective[step] = (requirements, hints)
+        return effective
+
+    def requirements(self, step):
+        """
+        :param step: The step, or its path (eg: 'align', or 'qc/fastqc' for a step of a subworkflow), or
+                     None for the workflow itself (eg: when the resolver is given a tool)
+        :type step: :class:`cwlgen.WorkflowStep` | STRING
+        :return: The requirements that apply to the step, by class
+        :rtype: dict[STRING, dict]
+        """
+        return self._resolve_step(step)[0]
+
+    def hints(self, step):
+        """
+        :return: The hints that apply to the step (and that aren't overridden by a requirement), by class
+        :rtype: dict[STRING, dict]
+        """
+        return self._resolve_step(step)[1]
+
+    def get(self, step, cwl_class, default=None):
+        """
+        :return: The requirement (or else the hint) of the class ``cwl_class`` that applies to the step
+        """
+        requirements, hints = self._resolve_step(step)
+        requirement = requirements.get(cwl_class)
+        if requirement is None:
+            requirement = hints.get(cwl_class, default)
+        return requirement
+
+    def invalidate(self, obj=None):
+        """
+        Drop the cached requirements after a change.
+
+        :param obj: The process, workflow step or requirement that changed, or None to drop everything
+                    (eg: after adding or removing steps). The process a step runs is indexed again when
+                    the step is invalidated, and everything is dropped when ``obj`` isn't in the workflow
+                    (eg: a requirement that was removed)
+        """
+        if obj is None or self._index is None:
+            self._effective.clear()
+            self._index = self._levels = self._root = None
+            return
+        levels = [level for level in self._levels if level.source is obj or level.declares(obj)]
+        if not levels or any(level.source is obj and getattr(obj, "steps", None) for level in levels):
+            # the steps of a workflow may have changed too, or the object can't be found
+            self.invalidate()
+            return
+        for level in levels:
+            level.own = None
+        for level in levels:
+            if level.source is obj and level.run is not None and level in self._levels:
+                # the step may run another process
+                self._rebuild_run(level)
+        changed = set(levels)
+        for path, run_level in self._index.items():
+            if path in self._effective and any(level in changed for level in run_level.chain()):
+                del self._effective[path]
+        if self._root in changed:
+            self._effective.pop(None, None)
@@ -0,0 +1,190 @@
+"""
+Round trip import / export, which keeps the comments, key order and formatting of a CWL document.
+
+A document parsed with ``parse_cwl(path, round_trip=True)`` keeps the node that ruamel's round trip
+loader produced. When it's exported, the dictionary from ``get_dict()`` is merged into a copy of that
+node, so only the fields that were modified are re-emitted and the rest of the document is written back
+as it was.
+"""
+
+import copy
+import re
+
+import ruamel.yaml
+import six
+from ruamel.yaml.compat import StringIO
+
+from .utils import literal, literal_presenter
+
+ruamel.yaml.add_representer(literal, literal_presenter, representer=ruamel.yaml.RoundTripRepresenter)
+
+_KEY_LINE = re.compile(r"^( *)[^\s#-][^:#]*:\s*(#.*)?$")
+
+
+class RoundTripSource(object):
+    """
+    The round trip node of a parsed document, and the indentation it was written with.
+    """
+
+    def __init__(self, node, mapping_indent=2, sequence_indent=4, sequence_offset=2):
+        self.node = node
+        self.mapping_indent = mapping_indent
+        self.sequence_indent = sequence_indent
+        self.sequence_offset = sequence_offset
+
+
+def guess_indent(text):
+    """
+    Guess the indentation of a YAML document from the first nested mapping, and the first
+    block sequence nested in a mapping.
+
+    :return: (mapping indent, sequence indent, sequence dash offset)
+    """
+    mapping_indent, sequence = None, None
+    lines = [l for l in text.splitlines() if l.strip() and not l.lstrip().startswith("#")]
+    for line, next_line in zip(lines, lines[1:]):
+        match = _KEY_LINE.match(line)
+        if not match:
+            continue
+        indent = len(next_line) - len(next_line.lstrip(" "))
+        content = next_line.lstrip(" ")
+        if content.startswith("- ") and sequence is None:
+            offset = indent - len(match.group(1))
+            sequence = (offset + len(content) - len(content[1:].lstrip(" ")), offset)
+        elif indent > len(match.group(1)) and mapping_indent is None and not content.startswith("-"):
+            mapping_indent = indent - len(match.group(1))
+        if mapping_indent is not None and sequence is not None:
+            break
+    mapping_indent = mapping_indent or 2
+    sequence_indent, sequence_offset = sequence or (mapping_indent + 2, mapping_indent)
+    return mapping_indent, max(sequence_indent, 2), sequence_offset
+
+
+def load_round_trip(stream):
+    """
+    Load a YAML document with ruamel's round trip loader.
+
+    :param stream: A string or file containing the YAML document
+    :return: :class:`RoundTripSource`
+    """
+    if not isinstance(stream, six.string_types):
+        stream = stream.read()
+    yaml = ruamel.yaml.YAML()
+    yaml.preserve_quotes = True
+    return RoundTripSource(yaml.load(stream), *guess_indent(stream))
+
+
+def dump_round_trip(source, value):
+    """
+    Merge ``value`` into a copy of the node of ``source`` (see :func:`update_node`), and dump it.
+    The node of ``source`` isn't modified, so every export is compared to the document as it was parsed.
+
+    :type source: RoundTripSource
+    :param value: The dictionary of the (possibly modified) object
+    :return: str
+    """
+    node = update_node(copy.deepcopy(source.node), value)
+    yaml = ruamel.yaml.YAML()
+    yaml.indent(mapping=source.mapping_indent, sequence=source.sequence_indent, offset=source.sequence_offset)
+    stream = StringIO()
+    yaml.dump(node, stream)
+    return stream.getvalue()
+
+
+# The fields that a CWL shorthand stands for, eg: { x: File } for { x: { type: File } }
+SHORTHAND_FIELDS = ["type", "source", "id"]
+
+
+def _is_equivalent_short_form(short, full):
+    if not isinstance(full, dict) or len(full) != 1 or isinstance(short, (dict, list)):
+        return False
+    field, value = list(full.items())[0]
+    return field in SHORTHAND_FIELDS and value == short
+
+
+def _get_list_key(items):
+    # The field that identifies the items of a list form, eg: inputs (id) or requirements (class)
+    for key in ("id", "class"):
+        if items and all(isinstance(i, dict) and key in i for i in items):
+            return key
+    return None
+
+
+def _list_to_map(items, key, node):
+    # [{ id: x, ...fields }] -> { x: { ...fields } }, keeping the key inside the entry if the node does
+    retval = {}
+    for item in items:
+        entry_key = item[key]
+        existing = node.get(entry_key)
+        keep_key = isinstance(existing, dict) and key in existing
+        retval[entry_key] = item if keep_key else {k: v for k, v in item.items() if k != key}
+    return retval
+
+
+def _map_to_list(mapping, key, node):
+    # { x: { ...fields } } -> [{ id: x, ...fields }], in the order of the items in node
+    existing = {item[key]: i for i, item in enumerate(node)}
+    retval = [None] * len(node)
+    added = []
+    for entry_key, fields in mapping.items():
+        item = {key: entry_key}
+        if isinstance(fields, dict):
+            item.update(fields)
+        if entry_key in existing:
+            retval[existing[entry_key]] = item
+        else:
+            added.append(item)
+    return [i for i in retval if i is not None] + added
+
+
+def update_node(node, value):
+    """
+    Update the round trip ``node`` in place so that it's equivalent to ``value``, leaving the
+    parts of the node that haven't changed (and their comments and formatting) untouched. The
+    list and map forms of CWL fields (eg: ``inputs``, ``requirements``) are matched up,
+    and the form of the node is kept.
+
+    :param node: The node loaded by the round trip loader (or a value within it)
+    :param value: The new value
+    :return: The updated node, or the new value if the node had to be replaced
+    """
+    if isinstance(node, dict) and isinstance(value, list):
+        key = _get_list_key(value)
+        if key is not None:
+            value = _list_to_map(value, key, node)
+    elif isinstance(node, list) and isinstance(value, dict):
+        key = _get_list_key(node)
+        if key is not None:
+            value = _map_to_list(value, key, node)
+
+    if isinstance(node, dict) and isinstance(value, dict):
+        for k in [k for k in node if k not in value]:
+            del node[k]
+        for k, v in value.items():
+            if k not in node:
+                node[k] = copy.deepcopy(v)
+                continue
+            updated = update_node(node[k], v)
+            if updated is not node[k]:
+                node[k] = updated
+        return node
+
+    if isinstance(node, list) and isinstance(value, list):
+        if len(node) > len(value):
+            del node[len(value):]
+        for i, v in enumerate(value):
+            if i >= len(node):
+                node.append(copy.deepcopy(v))
+                continue
+            updated = update_node(node[i], v)
+            if updated is not node[i]:
+                node[i] = updated
+        return node
+
+    if node == value or _is_equivalent_short_form(node, value) or _is_equivalent_short_form(value, node):
+        return node
+    if isinstance(node, (dict, list)) and isinstance(value, (dict, list)) and not node and not value:
+        # eg: outputs: [] and outputs: {}
+        return node
+    # the value could be shared with the cached dictionaries of the objects (see cwlgen.tracking)
+    return copy.deepcopy(value)
@@ -0,0 +1,357 @@
+"""
+Run a :class:`cwlgen.Workflow` on the local machine, running the steps (and the jobs of their
+scatters) in parallel as soon as the outputs they depend on are ready:
+
+.. code-block:: python
+
+   scheduler = cwlgen.WorkflowScheduler(cores=16, ram=32768)
+   result = scheduler.run(workflow, {"reads": [...]})
+   result.status, result.outputs, result.steps["align"].wall_time
+
+The jobs are started while their ``ResourceRequirement`` (``coresMin`` and ``ramMin``, in MiB, as
+resolved by :class:`cwlgen.RequirementResolver`) fits in the cores and memory that aren't used by the
+running jobs, by a fixed number of worker threads that take them from a queue. The jobs of the tools are run with a :class:`cwlgen.LocalExecutor`,
+nested workflows are run by the same scheduler and share its resources.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+import six
+
+from .canonical import normalize
+from .dag import source_id, step_dependencies
+from .executor import LocalExecutor, StepResult, scatter_job, _reshape, SUCCESS, PERMANENT_FAIL
+from .resolver import RequirementResolver
+from .utils import Serializable
+
+logging.basicConfig(level=logging.INFO)
+_LOGGER = logging.getLogger(__name__)
+
+
+def _host_ram():
+    # the physical memory of the host in MiB, or None if it isn't known
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _as_dict(process):
+    if isinstance(process, Serializable):
+        return normalize(process.get_dict())
+    return normalize(process) if isinstance(process, dict) else {}
+
+
+def merge_sources(values, link_merge=None):
+    """
+    Merge the values of the sources of an input (see ``linkMerge``).
+
+    :param values: The value of each source
+    :param link_merge: 'merge_nested' (the default) or 'merge_flattened'
+    """
+    if link_merge == "merge_flattened":
+        merged = []
+        for v in values:
+            if isinstance(v, list):
+                merged.extend(v)
+            else:
+                merged.append(v)
+        return merged
+    return list(values)
+
+
+class _Resources(object):
+    # the cores and memory that aren't used by the running jobs
+
+    def __init__(self, cores, ram):
+        self.cores = cores
+        self.ram = ram
+        self.free_cores = cores
+        self.free_ram = ram
+        self.condition = threading.Condition()
+
+    def request(self, cores, ram):
+        # a job that needs more than the host has is run on its own
+        return min(cores, self.cores), (min(ram, self.ram) if self.ram is not None else 0)
+
+    def acquire(self, cores, ram):
+        with self.condition:
+            while self.free_cores < cores or (self.free_ram is not None and self.free_ram < ram):
+                self.condition.wait()
+            self.free_cores -= cores
+            if self.free_ram is not None:
+                self.free_ram -= ram
+
+    def release(self, cores, ram):
+        with self.condition:
+            self.free_cores += cores
+            if self.free_ram is not None:
+                self.free_ram += ram
+            self.condition.notify_all()
+
+
+class WorkflowResult(object):
+    """
+    The result of running a workflow.
+    """
+
+    def __init__(self, outputs, steps, status, wall_time):
+        """
+        :param outputs: The values of the outputs of the workflow, None if it failed
+        :param steps: The results of the steps that were run, by step id
+        :type steps: dict[STRING, StepResult]
+        :param status: 'success', or the status of the first step that failed
+        :param wall_time: The number of seconds the workflow took
+        """
+        self.outputs = outputs
+        self.steps = steps
+        self.status = status
+        self.wall_time = wall_time
+
+    @property
+    def success(self):
+        return self.status == SUCCESS
+
+    @property
+    def jobs(self):
+        """
+        The results of the jobs of every step
+        """
+        return [job for step in self.steps.values() for job in step.jobs]
+
+
+class _Step(object):
+    # the state of a step while the workflow is running
+
+    def __init__(self, step, path, tool, resources, resolver, sources):
+        self.step = step
+        self.id = step.id
+        self.path = path                # eg: 'qc/fastqc' for a step of the subworkflow of the step 'qc'
+        self.run = step.run
+        self.tool = tool
+        self.inputs = list(step.inputs)
+        self.sources = set(sources)     # the ids of the steps it depends on
+        self.waiting = set(self.sources)
+        requirement = resolver.get(path, "ResourceRequirement") or {}
+        cores, ram = requirement.get("coresMin", 1), requirement.get("ramMin", 0)
+        if not isinstance(cores, six.integer_types + (float,)):
+            cores = 1       # an expression
+        if not isinstance(ram, six.integer_types + (float,)):
+            ram = 0
+        self.cores, self.ram = resources.request(cores, ram)
+        self.output_ids = [o if isinstance(o, six.string_types) else o.id for o in step.out]
+        self.expression = None          # the compiled expression of an ExpressionTool
+        self.shape = None
+        self.results = None
+        self.remaining = 0
+
+
+class WorkflowScheduler(object):
+    """
+    Runs the steps of workflows in parallel, within the cores and memory of the host.
+
+    The expressions are compiled by ``compile_expression``, which by default only supports parameter
+    references (see :mod:`cwlgen.expression`): the steps that run an :class:`cwlgen.ExpressionTool`
+    with JavaScript (``${ ... }``, eg: those of :func:`cwlgen.chunk_scatter`) need a ``compile_expression``
+    that evaluates JavaScript, otherwise the workflow is rejected before any job runs.
+    """
+
+    def __init__(self, executor=None, cores=None, ram=None, compile_expression=None, workers=None):
+        """
+        :param executor: Runs the jobs of the tools (default: a :class:`cwlgen.LocalExecutor`)
+        :type executor: LocalExecutor
+        :param cores: The number of cores the jobs can use (default: the number of CPUs)
+        :type cores: INT
+        :param ram: The memory the jobs can use in MiB (default: the memory of the host)
+        :type ram: INT
+        :param compile_expression: Compiles the expressions of the tools (default: only parameter references
+                                   are supported, see :class:`cwlgen.CommandLinePlan`)
+        :param workers: The number of threads that run the jobs of a workflow (default: the number of cores)
+        :type workers: INT
+        """
+        self.executor = executor or LocalExecutor(compile_expression=compile_expression)
+        self.compile_expression = compile_expression or self.executor.compile_expression
+        self.resources = _Resources(cores or multiprocessing.cpu_count(), ram if ram is not None else _host_ram())
+        self.workers = workers or max(int(self.resources.cores), 1)
+
+    def run(self, workflow, inputs):
+        """
+        Run a workflow.
+
+        :param workflow: The workflow, the steps must run a :class:`cwlgen.CommandLineTool`,
+                         :class:`cwlgen.ExpressionTool` or :class:`cwlgen.Workflow` object (or dictionary)
+        :type workflow: :class:`cwlgen.Workflow`
+        :param inputs: The values of the inputs of the workflow
+        :type inputs: dict
+        :rtype: WorkflowResult
+        :raises ValueError: If a step can't be run (eg: an expression can't be compiled)
+        """
+        return _WorkflowRun(self, workflow, inputs, RequirementResolver(workflow), "").run()
+
+
+class _WorkflowRun(object):
+
+    def __init__(self, scheduler, workflow, inputs, resolver, prefix):
+        self.scheduler = scheduler
+        self.executor = scheduler.executor
+        self.resources = scheduler.resources
+        self.workflow = workflow
+        self.workflow_id = source_id(workflow.id or "")
+
+        self.values = {}    # {source id, value}
+        for param in workflow.inputs:
+            value = inputs.get(param.id)
+            self.values[param.id] = value if value is not None else getattr(param, "default", None)
+
+        self.resolver = resolver     # of the outermost workflow
+        self.prefix = prefix        # the path of the steps of this workflow in the outermost workflow
+        dependencies = step_dependencies(workflow)
+        self.steps = {}
+        for step in workflow.steps:
+            tool = _as_dict(step.run)
+            if not tool.get("class"):
+                raise ValueError("The step '%s' must run a process object, not '%s'" % (step.id, step.run))
+            self.steps[step.id] = _Step(step, prefix + step.id, tool, self.resources, resolver,
+                                        dependencies[step.id])
+            if tool.get("class") == "ExpressionTool":
+                # compiled before any job runs, eg: JavaScript needs a compile_expression that supports it
+                self.steps[step.id].expression = scheduler.compile_expression(tool.get("expression"))
+        self.dependents = dict((step_id, []) for step_id in self.steps)
+        for s in self.steps.values():
+            for source in s.sources:
+                self.dependents[source].append(s)
+
+        self.condition = threading.Condition()
+        self.queue = deque()        # [(_Step, index of the job, job)]
+        self.running = 0
+        self.pending_steps = len(self.steps)
+        self.results = {}
+        self.status = SUCCESS
+
+    def run(self):
+        start = time.time()
+        with self.condition:
+            for s in self.steps.values():
+                if not s.waiting:
+                    self._start_step(s)
+
+        workers = []
+        for _ in range(self.scheduler.workers):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+        if self.pending_steps and self.status == SUCCESS:
+            waiting = sorted(s.id for s in self.steps.values() if s.results is None)
+            raise ValueError("The steps %s depend on each other" % ", ".join(waiting))
+
+        outputs = None
+        if self.status == SUCCESS:
+            outputs = {}
+            for param in self.workflow.outputs:
+                outputs[param.id] = self._get_source_value(param.outputSource, getattr(param, "linkMerge", None))
+        return WorkflowResult(outputs, self.results, self.status, time.time() - start)
+
+    def _get_source_value(self, sources, link_merge=None):
+        if sources is None:
+            return None
+        if isinstance(sources, six.string_types):
+            value = self.values.get(source_id(sources, self.workflow_id))
+            # a single source is only merged when the linkMerge is given
+            return merge_sources([value], link_merge) if link_merge else value
+        return merge_sources([self.values.get(source_id(s, self.workflow_id)) for s in sources], link_merge)
+
+    def _start_step(self, s):
+        # called with the condition held, when the outputs the step depends on are ready
+        job = {}
+        for step_input in s.inputs:
+            value = self._get_source_value(step_input.source, step_input.linkMerge)
+            job[step_input.id] = value if value is not None else step_input.default
+        scatter = s.step.scatter
+        if scatter:
+            scatter = [scatter] if isinstance(scatter, six.string_types) else list(scatter)
+            jobs, s.shape = scatter_job(job, scatter, s.step.scatterMethod)
+        else:
+            jobs = [job]
+        s.results = [None] * len(jobs)
+        s.remaining = len(jobs)
+        if not jobs:
+            self._finish_step(s)
+            return
+        for i, j in enumerate(jobs):
+            self.queue.append((s, i, j))
+        self.condition.notify_all()
+
+    def _work(self):
+        # run the jobs of the queue, until every step has finished (or can't run)
+        while True:
+            with self.condition:
+                while not self.queue and self.pending_steps and self.running and self.status == SUCCESS:
+                    self.condition.wait()
+                if not self.queue or self.status != SUCCESS:
+                    return
+                s, index, job = self.queue.popleft()
+                self.running += 1
+            self.resources.acquire(s.cores, s.ram)
+            self._run_job(s, index, job)
+
+    def _run_job(self, s, index, job):
+        try:
+            result = self._execute(s, job)
+        except Exception as e:
+            _LOGGER.error("The job %d of the step '%s' failed: %s" % (index, s.id, e))
+            result = StepResult(None, [], PERMANENT_FAIL)
+        finally:
+            self.resources.release(s.cores, s.ram)
+        with self.condition:
+            self.running -= 1
+            s.results[index] = result
+            s.remaining -= 1
+            if not result.success and self.status == SUCCESS:
+                self.status = result.status
+                jobs = [job for r in s.results if r is not None for job in r.jobs]
+                self.results[s.id] = StepResult(None, jobs, result.status)
+            elif s.remaining == 0:
+                self._finish_step(s)
+            self.condition.notify_all()
+
+    def _execute(self, s, job):
+        process_class = s.tool.get("class")
+        if process_class == "Workflow":
+            # the jobs of the nested workflow share the resources of this one
+            workflow = s.run
+            self.resources.release(s.cores, s.ram)
+            try:
+                result = _WorkflowRun(self.scheduler, workflow, job, self.resolver, s.path + "/").run()
+            finally:
+                self.resources.acquire(s.cores, s.ram)
+            return StepResult(result.outputs, result.jobs, result.status)
+        if process_class == "ExpressionTool":
+            outputs = s.expression(job, None, None)
+            return StepResult(outputs, [], SUCCESS)
+        result = self.executor.run(s.run, job, self.resolver, s.path)
+        return StepResult(result.outputs, [result], result.status)
+
+    def _finish_step(self, s):
+        # called with the condition held, when every job of the step has finished
+        results = [r for r in s.results if r is not None]
+        if s.step.scatter:
+            outputs = dict((o, _reshape([(r.outputs or {}).get(o) for r in results], s.shape)) for o in s.output_ids)
+        else:
+            outputs = results[0].outputs or {} if results else {}
+        for o in s.output_ids:
+            self.values["%s/%s" % (s.id, o)] = outputs.get(o)
+        self.results[s.id] = StepResult(outputs, [job for r in results for job in r.jobs], SUCCESS)
+        self.pending_steps -= 1
+        for dependent in self.dependents[s.id]:
+            dependent.waiting.discard(s.id)
+            if not dependent.waiting:
+                self._start_step(dependent)
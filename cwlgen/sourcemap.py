@@ -0,0 +1,182 @@
+"""
+Source maps record where in a YAML document each parsed :class:`cwlgen.utils.Serializable` came from,
+so tools that lint or diff imported CWL can report locations without parsing the document again.
+
+The locations are kept in a side table (arrays of integers indexed by object) rather than on the
+objects, so the memory cost stays small for large documents. The table only keeps weak references
+to the objects, so it doesn't keep them alive, and the rows of the objects that are garbage collected
+are reused:
+
+.. code-block:: python
+
+   source_map = cwlgen.SourceMap()
+   wf = cwlgen.parse_cwl("workflow.cwl", source_map=source_map)
+   source_map.get(wf.steps[0])     # SourceLocation(document='workflow.cwl', line=12, column=3)
+"""
+
+import weakref
+from array import array
+from collections import namedtuple
+
+import ruamel.yaml as ryaml
+
+from .errors import get_position
+
+SourceLocation = namedtuple("SourceLocation", ["document", "line", "column"])
+
+
+class _Ref(weakref.ref):
+    # a weak reference to an object of a SourceMap, with the key of its row
+    __slots__ = ("key",)
+
+
+class SourceMap(object):
+    """
+    A table of the document and (1-based) line / column of each parsed object.
+    """
+
+    def __init__(self):
+        self._documents = []        # type: list[str]
+        self._document_index = {}   # type: {str, int}
+        self._rows = {}             # type: {int, int}, the row of each object by its id
+        self._refs = []             # type: list[_Ref], the object of each row
+        self._free = []             # type: list[int], the rows of the objects that were collected
+        self._document = array("i")
+        self._line = array("i")
+        self._column = array("i")
+
+        rows, free = self._rows, self._free
+
+        def collected(ref):
+            # shared by the references of every row, it doesn't reference the map so the objects don't keep it alive
+            row = rows.pop(ref.key, None)
+            if row is not None:
+                free.append(row)
+
+        self._collected = collected
+
+    def _row(self, obj):
+        row = self._rows.get(id(obj))
+        if row is None or self._refs[row]() is not obj:
+            return None
+        return row
+
+    def add(self, obj, document, line, column):
+        """
+        Record the location of ``obj``.
+
+        :param obj: The parsed object, it must support weak references (as the :class:`cwlgen.utils.Serializable` do)
+        :param document: The path of the document that obj was parsed from (or None)
+        :param line: The 1-based line of the object
+        :param column: The 1-based column of the object
+        """
+        doc = self._document_index.get(document)
+        if doc is None:
+            doc = self._document_index[document] = len(self._documents)
+            self._documents.append(document)
+
+        row = self._row(obj)
+        if row is not None:
+            self._document[row], self._line[row], self._column[row] = doc, line, column
+            return
+
+        ref = _Ref(obj, self._collected)
+        ref.key = id(obj)
+        if self._free:
+            row = self._free.pop()
+            self._refs[row] = ref
+            self._document[row], self._line[row], self._column[row] = doc, line, column
+        else:
+            row = len(self._refs)
+            self._refs.append(ref)
+            self._document.append(doc)
+            self._line.append(line)
+            self._column.append(column)
+        self._rows[ref.key] = row
+
+    def add_mapping(self, obj, document, mapping):
+        """
+        Record the location of ``obj`` from the mapping it was parsed from, this
+        does nothing if the mapping was loaded without position information.
+        """
+        line, column = get_position(mapping)
+        if line is not None:
+            self.add(obj, document, line, column)
+
+    def get(self, obj):
+        """
+        :return: The :class:`SourceLocation` of ``obj``, or None if it wasn't recorded
+        """
+        row = self._row(obj)
+        if row is None:
+            return None
+        return SourceLocation(self._documents[self._document[row]], self._line[row], self._column[row])
+
+    def __contains__(self, obj):
+        return self._row(obj) is not None
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class _LineCol(object):
+    """
+    The (0-based) position of a loaded mapping or sequence, and of its keys or items.
+    This has the same interface as the ``lc`` attribute of ruamel's round trip types.
+    """
+    __slots__ = ("line", "col", "_positions")
+
+    def __init__(self, mark, positions):
+        self.line = mark.line
+        self.col = mark.column
+        self._positions = positions
+
+    def key(self, key):
+        return self._positions[key]
+
+    def item(self, index):
+        return self._positions[index]
+
+
+class PositionDict(dict):
+    __slots__ = ("lc",)
+
+
+class PositionList(list):
+    __slots__ = ("lc",)
+
+
+class PositionLoader(ryaml.Loader):
+    """
+    A loader that keeps the position of every mapping and sequence in the document, while still
+    producing plain Python values (unlike the round trip loader).
+    """
+
+
+def _construct_position_map(loader, node):
+    data = PositionDict()
+    yield data
+    data.update(loader.construct_mapping(node))
+    data.lc = _LineCol(node.start_mark, {
+        k.value: (k.start_mark.line, k.start_mark.column) for k, _ in node.value if isinstance(k, ryaml.ScalarNode)
+    })
+
+
+def _construct_position_seq(loader, node):
+    data = PositionList()
+    yield data
+    data.extend(loader.construct_sequence(node))
+    data.lc = _LineCol(node.start_mark, [(n.start_mark.line, n.start_mark.column) for n in node.value])
+
+
+PositionLoader.add_constructor(u"tag:yaml.org,2002:map", _construct_position_map)
+PositionLoader.add_constructor(u"tag:yaml.org,2002:seq", _construct_position_seq)
+
+
+def load_with_positions(stream):
+    """
+    Load a YAML document, keeping the position of each mapping and sequence (see :class:`PositionLoader`).
+
+    :param stream: A string or file containing the YAML document
+    """
+    return ryaml.load(stream, Loader=PositionLoader)
@@ -0,0 +1,161 @@
+"""
+Templates for generating many variants of a document that only differ in a few fields.
+
+The document is serialized to text once, with a placeholder in each *slot*. Rendering a variant
+then only formats the slot values and joins them with the pre-serialized text, instead of building
+the objects and calling ``get_dict()`` for every variant:
+
+.. code-block:: python
+
+   tool = cwlgen.CommandLineTool("align", base_command=["bwa", "mem"])
+   tool.requirements.append(cwlgen.DockerRequirement(docker_pull="biocontainers/bwa"))
+   ...
+   template = cwlgen.Template(tool, slots={
+       "image": ["requirements", "DockerRequirement", "dockerPull"],
+       "command": ["baseCommand"],
+   })
+   template.render(image="biocontainers/bwa:0.7.17", command=["bwa", "aln"])
+
+The slots are paths of keys into the dictionary of the document (see ``get_dict``). Items of
+a list are selected by their index or their identifier (``id``, or ``class`` for requirements), and
+the last key doesn't have to exist in the template, eg: ``["inputs", "threads"]`` adds an input. Slot values are written in JSON, which is
+also valid YAML (in flow style), and :class:`cwlgen.utils.Serializable` values are converted
+with ``get_dict()``.
+"""
+
+import copy
+import json
+import re
+
+import ruamel.yaml
+
+from .utils import Serializable, literal, literal_presenter
+
+_MARKER = "__cwlgen_slot_%d__"
+_MARKER_PATTERN = re.compile(r"([\"']?)__cwlgen_slot_(\d+)__\1")
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+def format_value(value):
+    """
+    Format a slot value as JSON text (which is also a valid YAML flow value).
+    """
+    cls = value.__class__
+    if cls is str:
+        return _encode_string(value)
+    if cls is bool:
+        return "true" if value else "false"
+    if cls is int:
+        return str(value)
+    if value is None:
+        return "null"
+    return json.dumps(Serializable.serialize(value))
+
+
+def _get_key(container, key, allow_missing=False):
+    # items of a list can be selected by their identifier ('id' or 'class'), as well as their index
+    if not isinstance(container, list) or isinstance(key, int):
+        return key
+    for i, item in enumerate(container):
+        if isinstance(item, dict) and key in (item.get("id"), item.get("class")):
+            return i
+    if allow_missing:
+        return None
+    raise KeyError(key)
+
+
+class Template(object):
+    """
+    A document that's been serialized with placeholders for the values that change between variants.
+    """
+
+    FORMATS = ("yaml", "json")
+
+    def __init__(self, obj, slots, format="yaml", indent=None):
+        """
+        :param obj: The template document, eg: a :class:`cwlgen.CommandLineTool`
+        :type obj: Serializable
+        :param slots: The paths into ``obj.get_dict()`` of the values that change, by slot name
+        :type slots: dict[STRING, list[STRING | INT]]
+        :param format: The format of the rendered text, 'yaml' or 'json'
+        :type format: STRING
+        :param indent: The indent of the JSON output (default: a single line)
+        :type indent: INT
+        """
+        if format not in self.FORMATS:
+            raise ValueError("Unrecognised format '%s', expected one of: %s" % (format, ", ".join(self.FORMATS)))
+        self.format = format
+        self.slot_names = list(slots)
+        self._slot_set = frozenset(self.slot_names)
+        self.defaults = {}
+
+        # get_dict can share the nested dictionaries with the objects (see cwlgen.tracking)
+        d = copy.deepcopy(obj.get_dict())
+        for i, name in enumerate(self.slot_names):
+            path = list(slots[name])
+            if not path:
+                raise ValueError("The path of slot '%s' is empty" % name)
+            parent = d
+            try:
+                for key in path[:-1]:
+                    parent = parent[_get_key(parent, key)]
+                key = _get_key(parent, path[-1], allow_missing=True)
+                if key is None:
+                    # a new item of a list, eg: an input in a slot ["inputs", $id]
+                    key = len(parent)
+                    parent.append(None)
+                elif isinstance(parent, list) or key in parent:
+                    self.defaults[name] = format_value(parent[key])
+            except (KeyError, IndexError, TypeError):
+                raise KeyError("The path %s of slot '%s' doesn't exist in the template" % (path, name))
+            parent[key] = _MARKER % i
+
+        if format == "json":
+            text = json.dumps(d, indent=indent)
+        else:
+            ruamel.yaml.add_representer(literal, literal_presenter)
+            text = ruamel.yaml.dump(d, default_flow_style=False)
+
+        # [text, slot index, text, slot index, ..., text]
+        self._parts = []
+        self._positions = [[] for _ in self.slot_names]
+        start = 0
+        for match in _MARKER_PATTERN.finditer(text):
+            self._parts.append(text[start:match.start()])
+            self._positions[int(match.group(2))].append(len(self._parts))
+            self._parts.append(None)
+            start = match.end()
+        self._parts.append(text[start:])
+
+    def render(self, **values):
+        """
+        Render a variant of the template.
+
+        :param values: The value of each slot, the slots that aren't given keep the value from the template
+        :return: STRING
+        """
+        parts = list(self._parts)
+        for i, name in enumerate(self.slot_names):
+            if name in values:
+                text = format_value(values[name])
+            elif name in self.defaults:
+                text = self.defaults[name]
+            else:
+                raise KeyError("There's no value for the slot '%s'" % name)
+            for position in self._positions[i]:
+                parts[position] = text
+        for k in values:
+            if k not in self._slot_set:
+                raise KeyError("Unrecognised slot '%s'" % k)
+        return "".join(parts)
+
+    def render_many(self, rows):
+        """
+        Render a variant for each dictionary of slot values in ``rows``.
+
+        :param rows: An iterable of {slot name: value}
+        :return: A generator of STRING
+        """
+        for row in rows:
+            yield self.render(**row)
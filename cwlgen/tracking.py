@@ -0,0 +1,240 @@
+"""
+Change tracking for :class:`cwlgen.utils.Serializable` objects, so that exporting a large tree
+again after a small change only re-serializes the objects along the path of that change.
+
+When tracking is enabled, the dictionary returned by ``get_dict()`` is cached on each object.
+Setting an attribute (or modifying a list or dictionary held by an attribute) drops the cache of
+the object, and of every object whose dictionary contains it (its *parents*, which are recorded
+while serializing):
+
+.. code-block:: python
+
+   cwlgen.tracking.enable()
+   tool.get_dict()                              # serializes the whole tool
+   tool.requirements[0].dockerPull = "ubuntu:20.04"
+   tool.get_dict()                              # only the requirement and the tool are serialized again
+
+Tracking is off by default, as intercepting every attribute assignment makes constructing and
+parsing objects slower.
+
+When an object is first cached, the lists and dictionaries held by its attributes are replaced by an
+:class:`ObservedList` or :class:`ObservedDict` with the same items, so modifying the original
+container after that won't change the object. Changes to containers nested within those (eg: a list
+inside a list) aren't tracked, assign the attribute again (or call :func:`invalidate`) after modifying them.
+
+The cached dictionaries are shared with the parents' dictionaries, so the dictionaries returned
+by ``get_dict()`` shouldn't be modified below the top level (the top level is a copy).
+"""
+
+import threading
+import weakref
+from functools import wraps
+
+
+class _State(threading.local):
+
+    def __init__(self):
+        # the objects that are currently being serialized, innermost last
+        self.stack = []
+
+
+_state = _State()
+
+# the tracking attributes are set without going through the tracked __setattr__, which would invalidate the object
+_set = object.__setattr__
+
+# the classes that enable() installs __setattr__ on (cwlgen.utils.Serializable)
+_root_classes = []
+
+# incremented whenever tracking is enabled, to discard the dictionaries cached before it was last disabled
+_generation = 0
+
+
+def is_enabled():
+    """
+    :return: Whether the dictionaries of :class:`cwlgen.utils.Serializable` objects are being cached
+    """
+    return bool(_root_classes) and "__setattr__" in vars(_root_classes[0])
+
+
+def enable():
+    """
+    Start caching the dictionaries of :class:`cwlgen.utils.Serializable` objects, and tracking their changes.
+    """
+    global _generation
+    if is_enabled():
+        return
+    _generation += 1
+    for cls in _root_classes:
+        cls.__setattr__ = _tracked_setattr
+        cls.__delattr__ = _tracked_delattr
+
+
+def disable():
+    """
+    Stop caching the dictionaries of :class:`cwlgen.utils.Serializable` objects.
+    """
+    for cls in _root_classes:
+        if "__setattr__" in vars(cls):
+            del cls.__setattr__
+            del cls.__delattr__
+
+
+def _tracked_setattr(self, name, value):
+    object.__setattr__(self, name, value)
+    if self._tracking_cache is not None:
+        invalidate(self)
+
+
+def _tracked_delattr(self, name):
+    object.__delattr__(self, name)
+    invalidate(self)
+
+
+def invalidate(obj):
+    """
+    Drop the cached dictionary of ``obj`` and of its parents.
+    """
+    while obj is not None:
+        if obj._tracking_cache is None:
+            return
+        _set(obj, "_tracking_cache", None)
+        parents = obj._tracking_parents
+        if not parents:
+            return
+        parents = list(parents)
+        if len(parents) == 1:
+            obj = parents[0]
+            continue
+        for parent in parents:
+            invalidate(parent)
+        return
+
+
+def observe(value, owner):
+    """
+    Get a tracked version of ``value`` (if it's a list or dict) that invalidates ``owner`` when it's
+    modified. A container that's already tracked for another object is copied.
+    """
+    cls = value.__class__
+    if cls is ObservedList or cls is ObservedDict:
+        if value._owner() is owner:
+            return value
+        value = cls(value)
+    elif cls is list:
+        value = ObservedList(value)
+    elif cls is dict:
+        value = ObservedDict(value)
+    else:
+        return value
+    value._owner = weakref.ref(owner)
+    return value
+
+
+def _observed(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        retval = method(self, *args, **kwargs)
+        owner = self._owner()
+        if owner is not None and owner._tracking_cache is not None:
+            invalidate(owner)
+        return retval
+    return wrapper
+
+
+class ObservedList(list):
+    """
+    A list that drops the cached dictionary of the object it belongs to when it's modified.
+    """
+    __slots__ = ("_owner",)
+
+    def __reduce_ex__(self, protocol):
+        # copies are plain lists, they're tracked again when the copied object is cached
+        return list, (list(self),)
+
+
+class ObservedDict(dict):
+    """
+    A dictionary that drops the cached dictionary of the object it belongs to when it's modified.
+    """
+    __slots__ = ("_owner",)
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+def _observe_methods(cls, names):
+    base = cls.__bases__[0]
+    for name in names:
+        if hasattr(base, name):
+            setattr(cls, name, _observed(getattr(base, name)))
+
+
+_observe_methods(ObservedList, ["append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+                                "__setitem__", "__delitem__", "__iadd__", "__imul__", "__setslice__", "__delslice__"])
+_observe_methods(ObservedDict, ["__setitem__", "__delitem__", "clear", "pop", "popitem", "setdefault", "update"])
+
+_observable_types = frozenset([list, dict, ObservedList, ObservedDict])
+
+
+def _observe_attributes(obj):
+    attrs = obj.__dict__
+    for k, v in list(attrs.items()):
+        if v.__class__ in _observable_types:
+            attrs[k] = observe(v, obj)
+
+
+def cached_get_dict(get_dict):
+    """
+    Wrap the ``get_dict`` method of a :class:`cwlgen.utils.Serializable` subclass so its result is cached
+    until the object (or one of the objects within it) changes. Calls through ``super()`` from within
+    the object's own ``get_dict`` aren't cached, as the caller will add to the dictionary.
+
+    The top level of the returned dictionary is a copy, while the nested dictionaries are shared with
+    the cache (see ``Serializable.get_dict``).
+    """
+    @wraps(get_dict)
+    def wrapper(self):
+        stack = _state.stack
+        if stack:
+            parent = stack[-1]
+            if parent is self:
+                return get_dict(self)
+            parents = self._tracking_parents
+            if parents is None:
+                parents = weakref.WeakSet()
+                _set(self, "_tracking_parents", parents)
+            parents.add(parent)
+        elif not is_enabled():
+            return get_dict(self)
+
+        cache = self._tracking_cache
+        if cache is not None and cache[0] == _generation:
+            d = cache[1]
+        else:
+            stack.append(self)
+            try:
+                d = get_dict(self)
+            finally:
+                stack.pop()
+            _observe_attributes(self)
+            _set(self, "_tracking_cache", (_generation, d))
+        return d if stack or not isinstance(d, dict) else dict(d)
+
+    wrapper._tracked = True
+    return wrapper
+
+
+class TrackedMeta(type):
+    """
+    Metaclass of :class:`cwlgen.utils.Serializable` that wraps the ``get_dict`` of each class
+    with :func:`cached_get_dict`.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(TrackedMeta, cls).__init__(name, bases, namespace)
+        if not any(isinstance(b, TrackedMeta) for b in bases):
+            _root_classes.append(cls)
+        get_dict = namespace.get("get_dict")
+        if get_dict is not None and not getattr(get_dict, "_tracked", False):
+            cls.get_dict = cached_get_dict(get_dict)
@@ -1,17 +1,27 @@
 """
 Set of util functions and classes
 """
-import inspect
+import six
+
+from . import codegen
+from .tracking import TrackedMeta
+from .errors import get_context, get_collecting_path, prepend_path, report, ParseError, InvalidValueError, \
+    MissingFieldError, UnknownFieldError
 
 class literal(str): pass
 
 _unparseable_types = [str, int, float, bool]
 
+# prefixes of the attributes that aren't part of the value of an object (the bookkeeping of cwlgen.tracking,
+# cwlgen.roundtrip and cwlgen.frozen), and aren't copied when freezing or detaching it
+TRANSIENT_PREFIXES = ("_tracking_", "_round_trip_", "_frozen_")
+
 
 def literal_presenter(dumper, data):
     return dumper.represent_scalar('tag:yaml.org,2002:str', data, style="|")
 
 
+@six.add_metaclass(TrackedMeta)
 class Serializable(object):
     """
     The Serializable class contains logic to automatically serialize a class based on
@@ -25,6 +35,9 @@ class Serializable(object):
     to your initializer (or pull it from the { $id: value } dictionary). Typing hints can be
     provided by the ``parse_types`` static attribute, and required attributes can be tagged
     the ``required_fields`` attribute.
+
+    The result of ``get_dict`` can be cached until the object (or an object within it) is modified,
+    see :mod:`cwlgen.tracking`.
     """
 
 
@@ -39,6 +52,22 @@ class Serializable(object):
     ignore_fields_on_convert = []
     required_fields = []    # type: str
 
+    """
+    Convert through the specialised functions generated by :mod:`cwlgen.codegen`,
+    set this to False to use the reflective converters instead.
+    """
+    use_generated_code = True
+
+    # the cached result of get_dict, and the objects whose dictionary contains it (see cwlgen.tracking)
+    _tracking_cache = None
+    _tracking_parents = None
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_tracking_")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     @staticmethod
     def serialize(obj):
         if isinstance(obj, str) or isinstance(obj, int) or isinstance(obj, float) or isinstance(obj, bool):
@@ -58,6 +87,18 @@ class Serializable(object):
         return value is None or ((isinstance(value, list) or isinstance(value, dict)) and len(value) == 0)
 
     def get_dict(self):
+        """
+        :return: The dictionary of this object, as it's exported in CWL
+
+        When change tracking is enabled (see :mod:`cwlgen.tracking`), the dictionaries (and lists) nested
+        in the result are shared with the cache of this object and of the objects within it: treat them as
+        read-only, modifying them changes the later exports. Only the top level dictionary is a copy, use
+        ``copy.deepcopy`` to get a dictionary that can be modified at any depth.
+        """
+        if Serializable.use_generated_code:
+            attrs = vars(self)
+            return codegen.get_serializer(type(self), attrs, Serializable.serialize)(attrs)
+
         d = {}
         ignore_attributes = set()
         req_fields = set(self.required_fields or [])
@@ -89,7 +130,24 @@ class Serializable(object):
         return cls.parse_dict_generic(cls, d)
 
     @staticmethod
-    def parse_dict_generic(T, d, parse_types=None, required_fields=None, ignore_fields_on_parse=None):
+    def parse_dict_generic(T, d, parse_types=None, required_fields=None, ignore_fields_on_parse=None,
+                           identifier=None, renamed_fields=None):
+        """
+        Parse the dictionary ``d`` into a new instance of ``T``. The dictionary is never modified, so
+        it's safe to parse from a shared (or cached) document tree.
+
+        :param identifier: The identifier of the object when it's parsed from the ``{ $identifier: T }``
+                           form, this takes precedence over an 'id' field within ``d``.
+        :param renamed_fields: A mapping of {dictionary key: attribute name} for keys that can't be used
+                               as attribute names (eg: 'in' -> 'inputs' on a WorkflowStep).
+        :return: The instance of ``T``, or None if ``d`` isn't a dictionary or is missing an argument of
+                 ``T.__init__`` (the caller reports it as an :class:`cwlgen.errors.InvalidValueError`).
+                 Errors raised by ``T.__init__`` itself are propagated.
+        """
+
+        if Serializable.use_generated_code and parse_types is None and required_fields is None \
+                and ignore_fields_on_parse is None:
+            return codegen.get_parser(T, Serializable.try_parse)(d, identifier, renamed_fields)
 
         if parse_types is None and hasattr(T, "parse_types"):
             parse_types = T.parse_types
@@ -101,21 +159,35 @@ class Serializable(object):
         pts = parse_types
         req = {r: False for r in required_fields}
         ignore = set(ignore_fields_on_parse)
+        if identifier is not None:
+            # the identifier was already passed to the initialiser
+            ignore.add("id")
+            req["id"] = True
 
         # may not be able to just initialise blank class
         # but we can use inspect to get required params and init using **kwargs
-        try:
-            required_init_kwargs = T.get_required_input_params_for_cls(T, d)
-            self = T(**required_init_kwargs)
-        except Exception as e:
+        if not isinstance(d, dict):
+            return None
+        if any(k not in d for k in codegen.get_init_params(T)[0]):
+            # not a T, the caller reports the value as invalid (see describe_parse_failure)
             return None
+        required_init_kwargs = T.get_required_input_params_for_cls(T, d, identifier=identifier)
+        self = T(**required_init_kwargs)
+
+        context = get_context()
+        path = get_collecting_path()
+        if context is not None and context.source_map is not None:
+            context.source_map.add_mapping(self, context.document, d)
 
         for k, v in d.items():
+            if renamed_fields:
+                k = renamed_fields.get(k, k)
             if k in ignore: continue
-            val = T.try_parse(v, pts.get(k))
+            val = Serializable.try_parse_at(path, k, v, pts.get(k))
             if val is None: continue
             if not hasattr(self, k):
-                raise KeyError("Key '%s' does not exist on type '%s'" % (k, type(self)))
+                report(UnknownFieldError("Key '%s' does not exist on type '%s'" % (k, type(self))), d, k)
+                continue
             self.__setattr__(k, val)
             req[k] = True
 
@@ -124,7 +196,7 @@ class Serializable(object):
             req_fields = ", ".join(r for r in req if not req[r])
             clsname = T.__name__
 
-            raise Exception("The fields %s were not found when parsing type '%s'" % (req_fields, clsname))
+            report(MissingFieldError("The fields %s were not found when parsing type '%s'" % (req_fields, clsname)), d)
 
         return self
 
@@ -132,63 +204,119 @@ class Serializable(object):
     def parse_with_id(cls, d, identifier):
         if not isinstance(d, dict):
             raise Exception("parse_with_id will require override to handle default object of type '%s'" % type(d))
-        d["id"] = identifier
-        return d
+        return cls.parse_dict_generic(cls, d, identifier=identifier)
 
     @staticmethod
-    def get_required_input_params_for_cls(cls, valuesdict):
-        try:
-            argspec = inspect.getfullargspec(cls.__init__)
-        except:
-            # we're in Python 2
-            argspec = inspect.getargspec(cls.__init__)
-
-        args, defaults = argspec.args, argspec.defaults
-        required_param_keys = set(args[1:-len(defaults)]) if defaults is not None and len(defaults) > 0 else args[1:]
-
-        inspect_ignore_keys = {"self", "args", "kwargs"}
+    def get_required_input_params_for_cls(cls, valuesdict, identifier=None):
         # Params can't shadow the built in 'id', so we'll put in a little hack
         # to guess the required param name that ends in
+        required_param_keys, id_field_name = codegen.get_init_params(cls)
 
-        id_field_names = [k for k in required_param_keys if k == "id" or k.endswith("_id")]
-        id_field_name = None
-        id_field_value = valuesdict.get("id")
-
-        if len(id_field_names) == 1:
-            id_field_name = id_field_names[0]
-            inspect_ignore_keys.add(id_field_name)
-        elif len(id_field_names) > 1:
-            print("Warning, can't determine if there are multiple id fieldnames")
-
-        required_init_kwargs = {k: valuesdict[k] for k in required_param_keys if (k not in inspect_ignore_keys)}
+        required_init_kwargs = {k: valuesdict[k] for k in required_param_keys}
         if id_field_name:
-            required_init_kwargs[id_field_name] = id_field_value
+            required_init_kwargs[id_field_name] = identifier if identifier is not None else valuesdict.get("id")
 
         return required_init_kwargs
 
     @staticmethod
     def try_parse(value, types):
+        """
+        Parse the value as the first of the ``types`` that it matches (see ``parse_types``). If the
+        value can't be parsed, an :class:`cwlgen.errors.InvalidValueError` is reported, and None is
+        returned when errors are being collected.
+        """
         if types is None: return value
         if isinstance(value, (dict, list)) and len(value) == 0: return []
 
-        # If it's an array, we should call try_parse (recursively)
-
+        # If it's an array, each item is parsed as one of the types (where an item of [T] is a T)
         if isinstance(value, list):
-            retval = [Serializable.try_parse(t, types) for t in value]
-            invalid_values = get_indices_of_element_in_list([False if v is None else True for v in retval], False)
+            item_types = [T[0] if isinstance(T, list) else T for T in types]
+            path = get_collecting_path()
+            retval, invalid_values = [], []
+            for i, t in enumerate(value):
+                if isinstance(t, list):
+                    parsed = Serializable.try_parse_at(path, i, t, item_types)
+                else:
+                    parsed = Serializable.try_parse_at(path, i, t, item_types, Serializable.try_parse_types)
+                if parsed is None:
+                    invalid_values.append(i)
+                else:
+                    retval.append(parsed)
             if invalid_values:
-                invalid_valuesstr = ','.join(str(i) for i in invalid_values)
-                invalid_itemstr = ", ".join([str(value[i]) for i in invalid_values])
-                raise Exception("Couldn't parse items at indices " + invalid_valuesstr + ", corresponding to: " + invalid_itemstr)
+                Serializable.report_invalid_items(value, invalid_values, item_types)
+            return retval
+
+        retval = Serializable.try_parse_types(value, types)
+        if retval is None and value is not None:
+            report(InvalidValueError(describe_parse_failure(value, types)), value)
+        return retval
+
+    @staticmethod
+    def try_parse_at(path, key, value, types, parse=None):
+        """
+        Parse the value at ``key`` with ``parse`` (default: :meth:`try_parse`), while tracking where
+        we are in the document so errors can be located. ``path`` is the collecting path of the
+        current :class:`cwlgen.errors.ParseContext` (or None if errors are raised).
+        """
+        if types is None:
+            return value
+        parse = parse or Serializable.try_parse
+        if path is not None:
+            path.append(key)
+            retval = parse(value, types)
+            path.pop()
             return retval
+        try:
+            return parse(value, types)
+        except ParseError as e:
+            prepend_path(e, key)
+            raise
 
+    @staticmethod
+    def try_parse_types(value, types):
         for T in types:
             retval = Serializable.try_parse_type(value, T)
-            if retval:
+            if retval is not None:
                 return retval
 
-        return
+        return None
+
+    @staticmethod
+    def report_invalid_items(value, indices, types):
+        context = get_context()
+        if context is not None and context.collector is not None:
+            for i in indices:
+                report(InvalidValueError(describe_parse_failure(value[i], types)), value, i)
+            return
+
+        invalid_valuesstr = ','.join(str(i) for i in indices)
+        invalid_itemstr = ", ".join([str(value[i]) for i in indices])
+        report(InvalidValueError("Couldn't parse items at indices " + invalid_valuesstr
+                                 + ", corresponding to: " + invalid_itemstr), value)
 
+    @staticmethod
+    def parse_keyed_items(T, value):
+        """
+        Parse the dictionary ``{ $identifier: T }`` into a list of T.
+        """
+        path = get_collecting_path()
+        retval = []
+        for nested_key in value:
+            if path is not None:
+                path.append(nested_key)
+                parsed = T.parse_with_id(value[nested_key], nested_key)
+                path.pop()
+            else:
+                try:
+                    parsed = T.parse_with_id(value[nested_key], nested_key)
+                except ParseError as e:
+                    prepend_path(e, nested_key)
+                    raise
+            if parsed is None:
+                report(InvalidValueError(describe_parse_failure(value[nested_key], [T])), value, nested_key)
+            else:
+                retval.append(parsed)
+        return retval
 
     @staticmethod
     def try_parse_type(value, T):
@@ -219,11 +347,7 @@ class Serializable(object):
                 return [T.parse_dict(vv) for vv in value]
             elif isinstance(value, dict):
                 # We'll need to map the 'id' back in
-                retval = []
-                for nested_key in value:
-                    dd = value[nested_key]
-                    retval.append(T.parse_with_id(dd, nested_key))
-                return retval
+                return Serializable.parse_keyed_items(T, value)
             else:
                 raise Exception("Don't recognise type '%s', expected dictionary or list" % type(value))
 
@@ -231,6 +355,28 @@ class Serializable(object):
         return T.parse_dict_generic(T, value) if not isinstance(value, list) else [T.parse_dict_generic(T, vv) for vv in value]
 
 
+def describe_parse_failure(value, types):
+    """
+    Describe why ``value`` couldn't be parsed as any of the ``types``, this is only
+    called once parsing has failed so it can afford to inspect the value again.
+    """
+    names = [("[%s]" % T[0].__name__) if isinstance(T, list) else T.__name__ for T in types]
+    valuestr = str(value)
+    if len(valuestr) > 80:
+        valuestr = valuestr[:77] + "..."
+    message = "Couldn't parse '%s' as %s" % (valuestr, " | ".join(names))
+
+    if isinstance(value, dict):
+        missing = set()
+        for T in types:
+            T = T[0] if isinstance(T, list) else T
+            if isinstance(T, type) and issubclass(T, Serializable):
+                missing.update(k for k in codegen.get_init_params(T)[0] if k not in value)
+        if missing:
+            message += ", missing the field(s): " + ", ".join(sorted(missing))
+    return message
+
+
 def get_indices_of_element_in_list(searchable, element):
     indices = []
     for i in range(len(searchable)):
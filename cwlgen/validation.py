@@ -0,0 +1,286 @@
+"""
+Validate jobs (the values of the inputs of a process) against the types of its inputs, before
+submitting them:
+
+.. code-block:: python
+
+   validator = cwlgen.JobValidator(tool)
+   errors = validator.validate({"reads": {"class": "File", "path": "/data/a.fq"}, "threads": "4"})
+   # [InvalidValueError("threads: expected int, got '4'")]
+   for index, errors in validator.validate_many(jobs):
+       ...                                             # only the invalid jobs
+   for line, errors in validator.validate_jsonl("jobs.jsonl"):
+       ...
+
+The types of the inputs (including the array, enum and record schemas, unions and the types of a
+``SchemaDefRequirement``) are compiled once into a function per input, so validating a job only
+checks its values. The errors are :class:`cwlgen.InvalidValueError` objects with the path of the
+value in the job (and the line of the job in a JSONL file).
+"""
+
+import io
+import json
+import numbers
+
+import six
+
+from .canonical import normalize
+from .errors import InvalidValueError
+from .utils import Serializable
+
+
+def _describe(value):
+    text = repr(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _check_null(value):
+    return value is None
+
+
+def _check_boolean(value):
+    return isinstance(value, bool)
+
+
+def _check_int(value):
+    return isinstance(value, six.integer_types) and not isinstance(value, bool)
+
+
+def _check_float(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _check_string(value):
+    return isinstance(value, six.string_types)
+
+
+def _check_any(value):
+    return value is not None
+
+
+def _check_file(value):
+    return isinstance(value, dict) and value.get("class") == "File" \
+        and ("path" in value or "location" in value or "contents" in value)
+
+
+def _check_directory(value):
+    return isinstance(value, dict) and value.get("class") == "Directory" \
+        and ("path" in value or "location" in value or "listing" in value)
+
+
+_PRIMITIVES = {
+    "null": _check_null,
+    "boolean": _check_boolean,
+    "int": _check_int,
+    "long": _check_int,
+    "float": _check_float,
+    "double": _check_float,
+    "string": _check_string,
+    "Any": _check_any,
+    "File": _check_file,
+    "stdin": _check_file,
+    "Directory": _check_directory,
+}
+
+
+def _short_name(name):
+    # '#main/Sample', 'types.yml#Sample' -> 'Sample', the symbols of an enum can be prefixed the same way
+    return name.rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+
+class _Compiler(object):
+    """
+    Compiles a type into a function of ``(value, path, errors)`` that appends the errors of the value
+    and returns whether it's valid.
+    """
+
+    def __init__(self, schema_defs):
+        self.schema_defs = {}       # {short name: type}
+        for schema in schema_defs or []:
+            if isinstance(schema, dict) and schema.get("name"):
+                self.schema_defs[_short_name(schema["name"])] = schema
+        self.named = {}             # {short name: compiled}, to compile the recursive types once
+
+    def compile(self, param_type):
+        if isinstance(param_type, six.string_types):
+            return self._compile_name(param_type)
+        if isinstance(param_type, list):
+            return self._compile_union(param_type)
+        if isinstance(param_type, dict):
+            schema_type = param_type.get("type")
+            if schema_type == "array":
+                return self._compile_array(param_type)
+            if schema_type == "enum":
+                return self._compile_enum(param_type)
+            if schema_type == "record":
+                return self._compile_record(param_type)
+            return self.compile(schema_type)
+        raise ValueError("Unknown type: %r" % (param_type,))
+
+    def _compile_name(self, name):
+        check = _PRIMITIVES.get(name)
+        if check is not None:
+            def validate_primitive(value, path, errors):
+                if check(value):
+                    return True
+                errors.append(InvalidValueError("expected %s, got %s" % (name, _describe(value)), path=path))
+                return False
+            return validate_primitive
+
+        short_name = _short_name(name)
+        if short_name not in self.schema_defs:
+            raise ValueError("Unknown type '%s', it isn't defined in a SchemaDefRequirement" % name)
+        if short_name not in self.named:
+            # a placeholder for the recursive references, replaced once the type is compiled
+            compiled = []
+            self.named[short_name] = lambda value, path, errors: compiled[0](value, path, errors)
+            compiled.append(self.compile(self.schema_defs[short_name]))
+            self.named[short_name] = compiled[0]
+        return self.named[short_name]
+
+    def _compile_union(self, types):
+        if len(types) == 1:
+            return self.compile(types[0])
+        nullable = any(t == "null" for t in types)
+        alternatives = [self.compile(t) for t in types if t != "null"]
+        names = ", ".join(t if isinstance(t, six.string_types) else (t.get("name") or t.get("type"))
+                          for t in types if isinstance(t, (six.string_types, dict)))
+
+        def validate_union(value, path, errors):
+            if value is None and nullable:
+                return True
+            for alternative in alternatives:
+                if alternative(value, path, []):
+                    return True
+            if len(alternatives) == 1 and value is not None:
+                # report the errors within the value itself (eg: a field of a record)
+                return alternatives[0](value, path, errors)
+            errors.append(InvalidValueError("expected one of [%s], got %s" % (names, _describe(value)), path=path))
+            return False
+        return validate_union
+
+    def _compile_array(self, schema):
+        validate_item = self.compile(schema.get("items"))
+
+        def validate_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(InvalidValueError("expected an array, got %s" % _describe(value), path=path))
+                return False
+            valid = True
+            for i, item in enumerate(value):
+                valid = validate_item(item, path + [i], errors) and valid
+            return valid
+        return validate_array
+
+    def _compile_enum(self, schema):
+        symbols = frozenset(_short_name(s) for s in schema.get("symbols") or [])
+        description = ", ".join(sorted(symbols))
+
+        def validate_enum(value, path, errors):
+            if isinstance(value, six.string_types) and (value in symbols or _short_name(value) in symbols):
+                return True
+            errors.append(InvalidValueError("expected one of the symbols [%s], got %s"
+                                            % (description, _describe(value)), path=path))
+            return False
+        return validate_enum
+
+    def _compile_record(self, schema):
+        fields = schema.get("fields") or []
+        if isinstance(fields, dict):
+            fields = [dict(f, name=name) if isinstance(f, dict) else {"name": name, "type": f}
+                      for name, f in fields.items()]
+        validate_fields = [(_short_name(f["name"]), self.compile(f.get("type"))) for f in fields]
+
+        def validate_record(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(InvalidValueError("expected a record, got %s" % _describe(value), path=path))
+                return False
+            valid = True
+            for name, validate_field in validate_fields:
+                valid = validate_field(value.get(name), path + [name], errors) and valid
+            return valid
+        return validate_record
+
+
+class JobValidator(object):
+    """
+    The compiled types of the inputs of a process, which validates many jobs.
+    """
+
+    def __init__(self, process, strict=False):
+        """
+        :param process: The process (eg: a :class:`cwlgen.CommandLineTool`), or its dictionary
+        :type process: :class:`cwlgen.CommandLineTool` | :class:`cwlgen.Workflow` | dict
+        :param strict: Whether the values of a job that aren't inputs of the process are errors
+        :type strict: BOOLEAN
+        """
+        d = normalize(process.get_dict() if isinstance(process, Serializable) else process)
+        schema_defs = ((d.get("requirements") or {}).get("SchemaDefRequirement") or {}).get("types")
+        compiler = _Compiler(schema_defs)
+        self.strict = strict
+        self._inputs = []       # [(input id, has default, compiled type)]
+        for name, param in (d.get("inputs") or {}).items():
+            self._inputs.append((name, "default" in param, compiler.compile(param.get("type", "Any"))))
+        self._names = frozenset(name for name, _, _ in self._inputs)
+
+    def validate(self, job):
+        """
+        :param job: The values of the inputs of the process, by input id
+        :type job: dict
+        :return: The errors of the job, empty if it's valid
+        :rtype: list[:class:`cwlgen.InvalidValueError`]
+        """
+        if not isinstance(job, dict):
+            return [InvalidValueError("expected a job object, got %s" % _describe(job))]
+        errors = []
+        for name, has_default, validate_input in self._inputs:
+            value = job.get(name)
+            if value is None and has_default:
+                continue
+            validate_input(value, [name], errors)
+        if self.strict:
+            for name in job:
+                if name not in self._names:
+                    errors.append(InvalidValueError("unknown input", path=[name]))
+        return errors
+
+    def is_valid(self, job):
+        """
+        :return: Whether the job is valid
+        """
+        return not self.validate(job)
+
+    def validate_many(self, jobs):
+        """
+        Validate each of the ``jobs``.
+
+        :return: A generator of ``(index, errors)`` for the invalid jobs
+        """
+        for i, job in enumerate(jobs):
+            errors = self.validate(job)
+            if errors:
+                yield i, errors
+
+    def validate_jsonl(self, path):
+        """
+        Validate the jobs of a JSONL file (a job per line), without loading the whole file.
+
+        :param path: The path of the file
+        :type path: STRING
+        :return: A generator of ``(line, errors)`` for the invalid jobs (the lines are 1-based)
+        """
+        with io.open(path, encoding="utf-8") as jsonl:
+            for line_number, line in enumerate(jsonl, 1):
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                except ValueError as e:
+                    errors = [InvalidValueError("invalid JSON: %s" % e)]
+                else:
+                    errors = self.validate(job)
+                if errors:
+                    for error in errors:
+                        error.line = line_number
+                        error.document = path
+                    yield line_number, errors
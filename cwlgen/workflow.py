@@ -4,14 +4,14 @@
 import logging
 
 # External libraries
-import ruamel.yaml
 import six
 
 # Internal libraries
 
-from .requirements import Requirement
-from .utils import literal, literal_presenter, Serializable, value_or_default
-from .common import Parameter, CWL_SHEBANG
+from .requirements import parse_requirements, get_requirements_dict
+from .utils import Serializable, value_or_default
+from .packing import pack
+from .common import export_process_string, Parameter, CWL_SHEBANG
 from .workflowdeps import InputParameter, WorkflowOutputParameter, WorkflowStep
 
 
@@ -36,8 +36,8 @@ class Workflow(Serializable):
     """
     __CLASS__ = 'Workflow'
     required_fields = ["inputs", "outputs", "steps"]
-    ignore_fields_on_parse = ["class", "requirements"]
-    ignore_fields_on_convert = ["inputs", "outputs", "requirements"]
+    ignore_fields_on_parse = ["class", "requirements", "hints"]
+    ignore_fields_on_convert = ["inputs", "outputs", "requirements", "hints"]
     parse_types = {
         "inputs": [[InputParameter]],
         "outputs": [[WorkflowOutputParameter]],
@@ -78,60 +78,59 @@ class Workflow(Serializable):
         cwl_workflow['outputs'] = {o.id: o.get_dict() for o in self.outputs}
 
         if self.requirements:
-            cwl_workflow['requirements'] = {r.get_class(): r.get_dict() for r in self.requirements}
+            cwl_workflow['requirements'] = get_requirements_dict(self.requirements)
         if self.hints:
-            cwl_workflow["hints"] = {r.get_class(): r.get_dict() for r in self.hints}
+            cwl_workflow["hints"] = get_requirements_dict(self.hints)
 
         return cwl_workflow
 
     @classmethod
     def parse_dict(cls, d):
         wf = super(Workflow, cls).parse_dict(d)
+        if wf is None:
+            return None
+        wf.requirements = parse_requirements(d.get("requirements"), "requirements")
+        wf.hints = parse_requirements(d.get("hints"), "hints")
+        return wf
 
-        reqs = d.get("requirements")
-        if reqs:
-            if isinstance(reqs, list):
-                wf.requirements = [Requirement.parse_dict(r) for r in reqs]
-            elif isinstance(reqs, dict):
-                # splat operator here would be so nice {**r, "class": c}
-                wf.requirements = []
-                for c, r in reqs.items():
-                    rdict = {'class': c}
-                    rdict.update(r)
-                    wf.requirements.append(Requirement.parse_dict(rdict))
-
-        hnts = d.get("hints")
-        if hnts:
-            if isinstance(hnts, list):
-                wf.hints = [Requirement.parse_dict(r) for r in hnts]
-            elif isinstance(hnts, dict):
-                # splat operator here would be so nice {**r, "class": c}
-                wf.hints = []
-                for c, r in hnts.items():
-                    rdict = {'class': c}
-                    rdict.update(r)
-                    wf.hints.append(Requirement.parse_dict(rdict))
+    def pack(self, resolve=None):
+        """
+        Pack this workflow and the processes its steps run into a single document with a ``$graph``
+        (see :mod:`cwlgen.packing`).
 
-        return wf
+        :param resolve: Called with the ``run`` of a step that's a reference to another document,
+                        returns the process to pack (or None to keep the reference)
+        :return: The packed document as a dictionary
+        """
+        return pack(self, resolve=resolve)
 
-    def export_string(self):
-        ruamel.yaml.add_representer(literal, literal_presenter)
-        cwl_tool = self.get_dict()
-        return ruamel.yaml.dump(cwl_tool, default_flow_style=False)
+    def export_string(self, round_trip=True, canonical=False, compact=False, packed=False):
+        """
+        :param round_trip: If this was parsed with ``round_trip=True``, only re-emit the fields that were
+                           modified, keeping the comments, key order and formatting of the original document.
+        :param canonical: Export the canonical form of the document (see :mod:`cwlgen.canonical`)
+        :param compact: Use the CWL shorthand forms wherever they're equivalent (see :mod:`cwlgen.compact`)
+        :param packed: Export the workflow and the processes its steps run as a single document (see :meth:`pack`)
+        :raises ValueError: If more than one of ``canonical``, ``compact`` and ``packed`` is set
+        """
+        return export_process_string(self, round_trip=round_trip, canonical=canonical, compact=compact, packed=packed)
 
     def export(self, outfile=None):
         """
         Export the workflow in CWL either on STDOUT or in outfile.
         """
         rep = self.export_string()
+        shebang = "" if rep.startswith("#!") else CWL_SHEBANG
 
         # Write CWL file in YAML
         if outfile is None:
-            six.print_(CWL_SHEBANG, "\n", sep='')
+            if shebang:
+                six.print_(shebang, "\n", sep='')
             six.print_(rep)
         else:
             out_write = open(outfile, 'w')
-            out_write.write(CWL_SHEBANG + '\n\n')
+            if shebang:
+                out_write.write(shebang + '\n\n')
             out_write.write(rep)
             out_write.close()
 
@@ -13,6 +13,8 @@ from .version import __version__
 
 from .utils import literal, literal_presenter, Serializable
 from .common import Parameter, CWL_SHEBANG
+from .requirements import parse_requirements, get_requirements_dict
+from .errors import get_collecting_path
 
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger(__name__)
@@ -88,10 +90,9 @@ class InputParameter(Parameter):
 
     @classmethod
     def parse_with_id(cls, d, identifier):
-        if isinstance(d, str):
+        if isinstance(d, (str, list)):
             d = {"type": d}
-        d["id"] = identifier
-        return super(InputParameter, cls).parse_dict(d)
+        return cls.parse_dict_generic(cls, d, identifier=identifier)
 
 
 class WorkflowStepInput(Serializable):
@@ -128,10 +129,9 @@ class WorkflowStepInput(Serializable):
 
     @classmethod
     def parse_with_id(cls, d, identifier):
-        if isinstance(d, str):
+        if isinstance(d, (str, list)):
             d = {"source": d}
-        d["id"] = identifier
-        return super(WorkflowStepInput, cls).parse_dict(d)
+        return cls.parse_dict_generic(cls, d, identifier=identifier)
 
 
 class WorkflowStepOutput(Serializable):
@@ -168,6 +168,7 @@ class WorkflowStep(Serializable):
         "inputs": [[WorkflowStepInput]],
         "out": [str, [WorkflowStepOutput]]
     }
+    ignore_fields_on_parse = ["requirements", "hints"]
 
     def __init__(self, step_id, run, label=None, doc=None, scatter=None, scatter_method=None):
         """
@@ -197,23 +198,47 @@ class WorkflowStep(Serializable):
         self.requirements = []
         self.hints = []
 
-        self.ignore_attributes = ["id", "inputs"]
+        self.ignore_attributes = ["id", "inputs", "requirements", "hints"]
 
     def get_dict(self):
         d = super(WorkflowStep, self).get_dict()
         d['in'] = {i.id: self.serialize(i) for i in self.inputs}
+        if self.requirements:
+            d['requirements'] = get_requirements_dict(self.requirements)
+        if self.hints:
+            d['hints'] = get_requirements_dict(self.hints)
         return d
 
     @classmethod
     def parse_with_id(cls, d, identifier):
-        d["id"] = identifier
-        return cls.parse_dict(d)
+        # We just need to map in -> inputs instead
+        step = cls.parse_dict_generic(cls, d, identifier=identifier, renamed_fields={"in": "inputs"})
+        if step is None:
+            return None
+        if isinstance(step.run, dict):
+            step.run = cls.parse_run(step.run)
+        step.requirements = parse_requirements(d.get("requirements"), "requirements")
+        step.hints = parse_requirements(d.get("hints"), "hints")
+        return step
 
     @classmethod
     def parse_dict(cls, d):
-        # We just need to map in -> inputs instead
-        d["inputs"] = d.pop("in", [])
-        return super(WorkflowStep, cls).parse_dict(d)
+        return cls.parse_with_id(d, None)
+
+    @staticmethod
+    def parse_run(run):
+        """
+        Parse an inline process (eg: a :class:`cwlgen.CommandLineTool`) with the type registered for
+        its class, processes of an unknown class are kept as a dictionary.
+        """
+        # imported here, as the processes contain workflow steps
+        from .import_cwl import get_process_type
+
+        process_type = get_process_type(run.get("class"))
+        if process_type is None:
+            return run
+        return Serializable.try_parse_at(get_collecting_path(), "run", run, process_type,
+                                         lambda value, T: T.parse_dict(value))
 
 
 class WorkflowOutputParameter(Parameter):
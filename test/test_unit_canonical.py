@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the canonical export of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import json
+import unittest
+from os import path
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+from cwlgen.canonical import canonical_dict
+from cwlgen.import_cwl import parse_cwl, parse_cwl_dict
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+
+class TestCanonical(unittest.TestCase):
+
+    def test_key_order_independent(self):
+        d = {"class": "CommandLineTool", "cwlVersion": "v1.0", "id": "t", "baseCommand": ["echo"],
+             "inputs": {"b": {"type": "int"}, "a": {"type": "string"}}, "outputs": {}}
+        reordered = dict(reversed(list(d.items())))
+        reordered["inputs"] = {"a": {"type": "string"}, "b": {"type": "int"}}
+        self.assertEqual(cwlgen.canonical_string(d), cwlgen.canonical_string(reordered))
+        self.assertEqual(cwlgen.digest(d), cwlgen.digest(reordered))
+
+    def test_shorthand_forms(self):
+        short = {
+            "class": "Workflow",
+            "inputs": {"x": "string?", "y": "File[]"},
+            "outputs": [{"id": "o", "type": "File", "outputSource": "s/o"}],
+            "requirements": [{"class": "ScatterFeatureRequirement"}],
+            "steps": {"s": {"run": "t.cwl", "in": {"x": "x"}, "out": [{"id": "o"}]}},
+        }
+        full = {
+            "class": "Workflow",
+            "inputs": {"x": {"type": ["null", "string"]}, "y": {"type": {"type": "array", "items": "File"}}},
+            "outputs": {"o": {"type": "File", "outputSource": "s/o"}},
+            "requirements": {"ScatterFeatureRequirement": {}},
+            "steps": {"s": {"run": "t.cwl", "in": {"x": {"source": "x"}}, "out": ["o"]}},
+        }
+        self.assertEqual(canonical_dict(full), canonical_dict(short))
+        self.assertEqual(cwlgen.digest(full), cwlgen.digest(short))
+
+    def test_objects_and_dicts(self):
+        wf = parse_cwl(test_dir + '/import_workflow.cwl')
+        self.assertEqual(cwlgen.digest(wf.get_dict()), cwlgen.digest(wf))
+        self.assertEqual(cwlgen.digest(wf), cwlgen.digest(parse_cwl_dict(json.loads(cwlgen.canonical_string(wf)))))
+
+    def test_stable_text(self):
+        d = {"class": "CommandLineTool", "doc": u"café", "x": 0.1, "y": 1e-07, "n": None}
+        self.assertEqual(u'{"class":"CommandLineTool","doc":"café","x":0.1,"y":1e-07}', cwlgen.canonical_string(d))
+        self.assertEqual(canonical_dict(d), ryaml.safe_load(cwlgen.canonical_string(d, format="yaml")))
+
+    def test_digest_changes(self):
+        tool = cwlgen.CommandLineTool("t", base_command=["echo"])
+        before = cwlgen.digest(tool)
+        tool.baseCommand = ["cat"]
+        self.assertNotEqual(before, cwlgen.digest(tool))
+        self.assertTrue(before.startswith("sha256:"))
+        self.assertTrue(cwlgen.digest(tool, algorithm="md5").startswith("md5:"))
+
+    def test_export_string(self):
+        wf = parse_cwl(test_dir + '/import_workflow.cwl')
+        self.assertEqual(cwlgen.canonical_string(wf, format="yaml"), wf.export_string(canonical=True))
+
+    def test_values(self):
+        # the values (eg: a default) aren't in the canonical form, even with the fields of a process
+        default = {"steps": [{"id": "a", "v": 1}], "type": "int[]", "n": None}
+        d = {"class": "CommandLineTool", "inputs": {"x": {"type": "Any", "default": default}}}
+        self.assertEqual(default, canonical_dict(d)["inputs"]["x"]["default"])
+        other = {"class": "CommandLineTool", "inputs": {"x": {"type": "Any", "default": {"steps": {"a": {"v": 1}}}}}}
+        self.assertNotEqual(cwlgen.digest(d), cwlgen.digest(other))
+
+    def test_literal(self):
+        tool = cwlgen.CommandLineTool("t", doc=cwlgen.literal("line\nline"))
+        plain = cwlgen.CommandLineTool("t", doc="line\nline")
+        self.assertEqual(cwlgen.canonical_string(plain, format="yaml"), cwlgen.canonical_string(tool, format="yaml"))
+        self.assertEqual(cwlgen.digest(plain), cwlgen.digest(tool))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the scatter chunking of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.canonical import normalize
+from cwlgen.chunking import chunk_scatter
+from cwlgen.dag import topological_order
+
+#  Class(es)  ------------------------------
+
+
+class TestChunkScatter(unittest.TestCase):
+
+    def setUp(self):
+        tool = cwlgen.CommandLineTool("align", base_command="bwa", stdout="out.sam")
+        tool.inputs.append(cwlgen.CommandInputParameter("reads", param_type="File"))
+        tool.inputs.append(cwlgen.CommandInputParameter("name", param_type="string"))
+        tool.inputs.append(cwlgen.CommandInputParameter("reference", param_type="File"))
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+
+        self.workflow = cwlgen.Workflow("main")
+        self.workflow.inputs.append(cwlgen.InputParameter("reads", param_type="File[]"))
+        self.workflow.inputs.append(cwlgen.InputParameter("names", param_type="string[]"))
+        self.workflow.inputs.append(cwlgen.InputParameter("reference", param_type="File"))
+        step = cwlgen.WorkflowStep("align", run=tool, scatter=["reads", "name"],
+                                   scatter_method="dotproduct")
+        step.inputs.append(cwlgen.WorkflowStepInput("reads", source="reads"))
+        step.inputs.append(cwlgen.WorkflowStepInput("name", source="#main/names"))
+        step.inputs.append(cwlgen.WorkflowStepInput("reference", source="reference"))
+        step.out.append(cwlgen.WorkflowStepOutput("out"))
+        self.workflow.steps.append(step)
+        self.workflow.outputs.append(cwlgen.WorkflowOutputParameter("sams", output_source="align/out", param_type="File[]"))
+
+    def test_chunk(self):
+        workflow = self.workflow
+        before = workflow.get_dict()
+        chunked = chunk_scatter(workflow, "align", batch_size=100)
+        self.assertEqual(workflow.get_dict(), before)
+
+        self.assertEqual(topological_order(chunked), ["align_batches", "align_chunks", "align"])
+        classes = [r.get_class() for r in chunked.requirements]
+        self.assertIn("SubworkflowFeatureRequirement", classes)
+        self.assertIn("ScatterFeatureRequirement", classes)
+
+        d = normalize(chunked.get_dict())
+        batches = d["steps"]["align_batches"]
+        self.assertEqual(batches["in"], {"reads": {"source": "reads"}, "name": {"source": "#main/names"}})
+        self.assertIn("var size = 100;", batches["run"]["expression"])
+        self.assertEqual(batches["run"]["outputs"]["reads"]["type"],
+                         {"type": "array", "items": {"type": "array", "items": "File"}})
+
+        chunks = d["steps"]["align_chunks"]
+        self.assertEqual(chunks["scatter"], ["reads", "name"])
+        self.assertEqual(chunks["scatterMethod"], "dotproduct")
+        self.assertEqual(chunks["in"], {"reads": {"source": "align_batches/reads"},
+                                        "name": {"source": "align_batches/name"},
+                                        "reference": {"source": "reference"}})
+        sub = chunks["run"]
+        self.assertEqual(sub["inputs"]["reference"], {"type": "File"})
+        self.assertEqual(sub["inputs"]["reads"], {"type": {"type": "array", "items": "File"}})
+        self.assertEqual(sub["steps"]["align"]["scatter"], ["reads", "name"])
+        self.assertEqual(sub["steps"]["align"]["in"]["name"], {"source": "name"})
+        self.assertEqual(sub["outputs"]["out"]["outputSource"], "align/out")
+
+        flatten = d["steps"]["align"]
+        self.assertEqual(flatten["in"], {"out": {"source": "align_chunks/out"}})
+        self.assertEqual(flatten["out"], ["out"])
+        self.assertEqual(flatten["run"]["outputs"]["out"]["type"], {"type": "array", "items": "File"})
+        self.assertEqual(d["outputs"]["sams"]["outputSource"], "align/out")
+
+    def test_invalid(self):
+        workflow = self.workflow
+        self.assertRaises(KeyError, chunk_scatter, workflow, "missing")
+        self.assertRaises(ValueError, chunk_scatter, workflow, "align", batch_size=0)
+
+        workflow.steps[0].scatterMethod = "flat_crossproduct"
+        self.assertRaises(ValueError, chunk_scatter, workflow, "align")
+
+        workflow.steps[0].scatterMethod = "dotproduct"
+        workflow.steps[0].scatter = None
+        self.assertRaises(ValueError, chunk_scatter, workflow, "align")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the generated converters of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+from os import path
+
+# External libraries
+import ruamel.yaml as ryaml
+
+import cwlgen
+from cwlgen import codegen
+from cwlgen.utils import Serializable
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+
+class TestGeneratedConverters(unittest.TestCase):
+
+    def tearDown(self):
+        Serializable.use_generated_code = True
+
+    def convert(self, filename, use_generated_code):
+        Serializable.use_generated_code = use_generated_code
+        with open(path.join(test_dir, filename)) as f:
+            d = ryaml.load(f, Loader=ryaml.Loader)
+        return cwlgen.parse_cwl_dict(d).get_dict()
+
+    def test_matches_reflective_workflow(self):
+        self.assertDictEqual(self.convert("import_workflow.cwl", False), self.convert("import_workflow.cwl", True))
+
+    def test_matches_reflective_tool(self):
+        self.assertDictEqual(self.convert("import_commandlinetool.cwl", False),
+                             self.convert("import_commandlinetool.cwl", True))
+
+    def test_required_field_missing(self):
+        with self.assertRaises(Exception):
+            cwlgen.CommandLineTool.parse_dict({"class": "CommandLineTool", "inputs": {}})
+
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            cwlgen.CommandLineBinding.parse_dict({"notAField": 1})
+
+    def test_serializer_is_cached(self):
+        b1 = cwlgen.CommandLineBinding(position=1)
+        b2 = cwlgen.CommandLineBinding(prefix="-x")
+        attrs = vars(b1)
+        self.assertIs(codegen.get_serializer(type(b1), attrs, Serializable.serialize),
+                      codegen.get_serializer(type(b2), vars(b2), Serializable.serialize))
+        self.assertDictEqual({"position": 1}, b1.get_dict())
+        self.assertDictEqual({"prefix": "-x"}, b2.get_dict())
+
+    def test_serializer_source_skips_ignored(self):
+        source = codegen.generate_serializer_source(["id", "_path", "label"], set(), {"id"})
+        self.assertNotIn("'id'", source)
+        self.assertNotIn("'_path'", source)
+        self.assertIn("'label'", source)
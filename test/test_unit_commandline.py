@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the command line rendering of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.commandline import CommandLinePlan, is_expression
+from cwlgen.import_cwl import parse_cwl_string
+from workflow_fixtures import align_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestCommandLinePlan(unittest.TestCase):
+
+    def setUp(self):
+        self.tool = align_tool([
+            cwlgen.CommandInputParameter(
+                "reads", param_type="File", input_binding=cwlgen.CommandLineBinding(position=2)),
+            cwlgen.CommandInputParameter(
+                "reference", param_type="File", input_binding=cwlgen.CommandLineBinding(position=1)),
+            cwlgen.CommandInputParameter(
+                "threads", param_type="int?", input_binding=cwlgen.CommandLineBinding(prefix="-t")),
+            cwlgen.CommandInputParameter(
+                "paired", param_type="boolean", input_binding=cwlgen.CommandLineBinding(prefix="-p")),
+            ("unbound", "string"),
+        ], base_command=["bwa", "mem"])
+
+    def test_render(self):
+        plan = CommandLinePlan(self.tool)
+        job = {"reads": {"class": "File", "path": "/data/a.fq"},
+               "reference": {"class": "File", "location": "file:///ref/hg38.fa"},
+               "threads": 4, "paired": True, "unbound": "x"}
+        self.assertEqual(plan.render(job), ["bwa", "mem", "-p", "-t", "4", "/ref/hg38.fa", "/data/a.fq"])
+
+    def test_optional_values(self):
+        plan = CommandLinePlan(self.tool)
+        job = {"reads": {"class": "File", "path": "a.fq"}, "reference": {"class": "File", "path": "r.fa"},
+               "paired": False}
+        self.assertEqual(plan.render(job), ["bwa", "mem", "r.fa", "a.fq"])
+
+    def test_render_many(self):
+        plan = CommandLinePlan(self.tool)
+        jobs = [{"reads": {"class": "File", "path": "%d.fq" % i}, "reference": {"class": "File", "path": "r.fa"}}
+                for i in range(3)]
+        self.assertEqual([argv[-1] for argv in plan.render_many(jobs)], ["0.fq", "1.fq", "2.fq"])
+        self.assertEqual(list(plan.render_many(jobs)), [plan.render(j) for j in jobs])
+
+    def test_arguments(self):
+        tool = cwlgen.CommandLineTool("tool", base_command="sort")
+        tool.arguments = ["-n", cwlgen.CommandLineBinding(position=3, prefix="-o", value_from="out.txt")]
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "input", param_type="File", input_binding=cwlgen.CommandLineBinding(position=2)))
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "key", param_type="int", input_binding=cwlgen.CommandLineBinding(prefix="-k", separate=False)))
+        plan = CommandLinePlan(tool)
+        job = {"input": {"class": "File", "path": "in.txt"}, "key": 2}
+        self.assertEqual(plan.render(job), ["sort", "-n", "-k2", "in.txt", "-o", "out.txt"])
+
+    def test_arrays(self):
+        tool = cwlgen.CommandLineTool("tool", base_command="cat")
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "files", param_type="string[]", input_binding=cwlgen.CommandLineBinding(prefix="-I", position=1)))
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "joined", param_type="int[]", input_binding=cwlgen.CommandLineBinding(prefix="-j", item_separator=",")))
+        items = cwlgen.CommandInputArraySchema(items="string", input_binding=cwlgen.CommandLineBinding(prefix="-x"))
+        tool.inputs.append(cwlgen.CommandInputParameter("each", param_type=items))
+        plan = CommandLinePlan(tool)
+        job = {"files": ["a", "b"], "joined": [1, 2, 3], "each": ["c", "d"]}
+        self.assertEqual(plan.render(job), ["cat", "-x", "c", "-x", "d", "-j", "1,2,3", "-I", "a", "b"])
+        self.assertEqual(plan.render({"files": [], "joined": [], "each": []}), ["cat"])
+
+    def test_records(self):
+        tool = parse_cwl_string("""
+class: CommandLineTool
+baseCommand: tool
+inputs:
+  options:
+    type:
+      type: record
+      fields:
+      - name: b
+        type: int
+        inputBinding: {prefix: -b, position: 2}
+      - name: a
+        type: string
+        inputBinding: {prefix: -a, position: 1}
+outputs: {}
+""")
+        plan = CommandLinePlan(tool)
+        self.assertEqual(plan.render({"options": {"a": "x", "b": 1}}), ["tool", "-a", "x", "-b", "1"])
+
+    def test_defaults(self):
+        tool = parse_cwl_string("""
+class: CommandLineTool
+baseCommand: head
+inputs:
+  lines:
+    type: int
+    default: 10
+    inputBinding: {prefix: -n}
+outputs: {}
+""")
+        plan = CommandLinePlan(tool)
+        self.assertEqual(plan.render({}), ["head", "-n", "10"])
+        self.assertEqual(plan.render({"lines": 5}), ["head", "-n", "5"])
+
+    def test_shell_quote(self):
+        tool = cwlgen.CommandLineTool("tool", base_command="echo")
+        tool.requirements.append(cwlgen.ShellCommandRequirement())
+        tool.arguments = [cwlgen.CommandLineBinding(value_from="|", shell_quote=False, position=2)]
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "message", param_type="string", input_binding=cwlgen.CommandLineBinding(position=1)))
+        plan = CommandLinePlan(tool)
+        self.assertEqual(plan.render_string({"message": "a b"}), "echo 'a b' |")
+
+    def test_expressions(self):
+        tool = cwlgen.CommandLineTool("tool", base_command="echo")
+        tool.arguments = ["$(inputs.x)", "$(runtime.outdir)/out.txt"]
+        self.assertEqual(CommandLinePlan(tool).render({"x": 2}, {"outdir": "/out"}), ["echo", "2", "/out/out.txt"])
+
+        tool.arguments = ["${ return inputs.x * 2; }"]
+        with self.assertRaises(ValueError):
+            CommandLinePlan(tool)
+        plan = CommandLinePlan(tool, compile_expression=lambda e: lambda inputs, self_value, runtime: inputs["x"] * 2)
+        self.assertEqual(plan.render({"x": 2}), ["echo", "4"])
+
+    def test_value_from_self(self):
+        tool = cwlgen.CommandLineTool("tool", base_command="cat")
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "reads", param_type="File",
+            input_binding=cwlgen.CommandLineBinding(position=1, value_from="$(self.nameroot).bam")))
+        self.assertEqual(CommandLinePlan(tool).render({"reads": {"class": "File", "path": "/data/a.fq"}}),
+                         ["cat", "a.bam"])
+
+    def test_is_expression(self):
+        self.assertTrue(is_expression("$(inputs.x)"))
+        self.assertTrue(is_expression("${ return 1; }"))
+        self.assertFalse(is_expression("out.txt"))
+        self.assertFalse(is_expression(None))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the compact export of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+from os import path
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+from cwlgen.compact import compact
+from cwlgen.import_cwl import parse_cwl, parse_cwl_string
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_shorthand_forms(self):
+        full = {
+            "class": "Workflow",
+            "inputs": [{"id": "x", "type": ["null", "string"]},
+                       {"id": "y", "type": {"type": "array", "items": "File"}},
+                       {"id": "z", "type": "int", "default": 1}],
+            "outputs": {"o": {"type": "File", "outputSource": "s/o"}},
+            "steps": {"s": {"run": "t.cwl", "in": {"x": {"source": "x"}, "y": {"source": ["y", "z"]},
+                                                  "z": {"source": "z", "default": 2}},
+                            "out": [{"id": "o"}]}},
+        }
+        expected = {
+            "class": "Workflow",
+            "inputs": {"x": "string?", "y": "File[]", "z": {"type": "int", "default": 1}},
+            "outputs": {"o": {"type": "File", "outputSource": "s/o"}},
+            "steps": {"s": {"run": "t.cwl", "in": {"x": "x", "y": ["y", "z"], "z": {"source": "z", "default": 2}},
+                            "out": ["o"]}},
+        }
+        self.assertEqual(expected, compact(full))
+
+    def test_not_shortened(self):
+        d = {"inputs": {"x": {"type": ["null", "string", "int"]}, "y": {"type": {"type": "array", "items": "File",
+                                                                              "label": "l"}}}}
+        self.assertEqual({"inputs": {"x": ["null", "string", "int"],
+                                     "y": {"type": {"type": "array", "items": "File", "label": "l"}}}}, compact(d))
+
+    def test_values(self):
+        default = {"inputs": {"x": {"type": "File"}}, "type": {"type": "array", "items": "int"}}
+        d = {"inputs": {"x": {"type": "Any", "default": default}}}
+        self.assertEqual({"inputs": {"x": {"type": "Any", "default": default}}}, compact(d))
+
+    def test_parses_to_same(self):
+        for f in ["import_workflow.cwl", "import_commandlinetool.cwl", "test_full_export.cwl"]:
+            original = parse_cwl(path.join(test_dir, f))
+            compacted = parse_cwl_string(original.export_string(compact=True))
+            self.assertEqual(cwlgen.digest(original), cwlgen.digest(compacted))
+
+    def test_smaller(self):
+        wf = parse_cwl(test_dir + '/import_workflow.cwl')
+        exported = wf.export_string(compact=True)
+        self.assertLess(len(exported), len(wf.export_string()))
+        self.assertIn("name_of_file_to_extract: string", exported)
+        self.assertEqual(compact(wf), ryaml.safe_load(exported))
+
+    def test_list_shorthand_import(self):
+        wf = parse_cwl_string("class: Workflow\ninputs: {x: ['null', string]}\noutputs: {}\n"
+                              "steps: {s: {run: t.cwl, in: {a: [x, x]}, out: []}}\n")
+        self.assertEqual(["null", "string"], wf.inputs[0].type)
+        self.assertEqual(["x", "x"], wf.steps[0].inputs[0].source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the container image manifest of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.containers import image_manifest, image_references
+from workflow_fixtures import add_step, make_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestImageManifest(unittest.TestCase):
+
+    def setUp(self):
+        qc = cwlgen.Workflow("qc")
+        add_step(qc, "fastqc", make_tool("fastqc", "biocontainers/fastqc"), {"in": "reads"})
+        add_step(qc, "align", make_tool("bwa", "biocontainers/bwa", hint=False), {"in": "reads"})
+
+        self.workflow = cwlgen.Workflow("main")
+        add_step(self.workflow, "sort", make_tool("samtools", "biocontainers/samtools"), {"in": "align/out"})
+        add_step(self.workflow, "align", make_tool("bwa", "biocontainers/bwa"), {"in": "reads"})
+        add_step(self.workflow, "qc", qc, {"in": "sort/out"})
+        add_step(self.workflow, "report", make_tool("report"), {"in": "qc/out"})
+        add_step(self.workflow, "external", "external.cwl", {"in": "reads"})
+
+    def test_manifest(self):
+        manifest = image_manifest(self.workflow)
+        self.assertEqual(manifest, [
+            {"image": {"dockerPull": "biocontainers/bwa"}, "steps": ["align", "qc/align"], "count": 2,
+             "required": True},
+            {"image": {"dockerPull": "biocontainers/samtools"}, "steps": ["sort"], "count": 1, "required": False},
+            {"image": {"dockerPull": "biocontainers/fastqc"}, "steps": ["qc/fastqc"], "count": 1,
+             "required": False},
+        ])
+
+    def test_workflow_requirement(self):
+        workflow = self.workflow
+        workflow.hints.append(cwlgen.DockerRequirement(docker_pull="ubuntu"))
+        manifest = image_manifest(workflow)
+        self.assertEqual([e["image"]["dockerPull"] for e in manifest],
+                         ["biocontainers/bwa", "ubuntu", "biocontainers/samtools", "biocontainers/fastqc"])
+        self.assertEqual(manifest[1]["steps"], ["external", "report"])
+
+    def test_resolve(self):
+        resolve = {"external.cwl": make_tool("external", "alpine")}.get
+        self.assertEqual(image_references(self.workflow, resolve=resolve),
+                         ["biocontainers/bwa", "alpine", "biocontainers/samtools", "biocontainers/fastqc"])
+
+    def test_image_fields(self):
+        tool = cwlgen.CommandLineTool("tool")
+        tool.requirements.append(cwlgen.DockerRequirement(docker_load="image.tar", docker_output_dir="/out"))
+        workflow = cwlgen.Workflow("main")
+        add_step(workflow, "a", tool, {"in": "reads"})
+        self.assertEqual(image_manifest(workflow)[0]["image"], {"dockerLoad": "image.tar"})
+        self.assertEqual(image_references(workflow), [])
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the dependencies between workflow steps of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.dag import item_type, source_id, source_type, step_dependencies, topological_order
+from workflow_fixtures import add_step
+
+#  Class(es)  ------------------------------
+
+
+class TestDag(unittest.TestCase):
+
+    def test_source_id(self):
+        self.assertEqual(source_id("#main/align/out", "main"), "align/out")
+        self.assertEqual(source_id("#align/out"), "align/out")
+        self.assertEqual(source_id("reads", "main"), "reads")
+
+    def test_order(self):
+        workflow = cwlgen.Workflow("main")
+        add_step(workflow, "index", "tool.cwl", {"in": "sort/out"})
+        add_step(workflow, "sort", "tool.cwl", {"in": "#main/align/out"})
+        add_step(workflow, "align", "tool.cwl", {"in": "reads"})
+        add_step(workflow, "qc", "tool.cwl", {"in": "reads"})
+        add_step(workflow, "report", "tool.cwl", {"in": ["index/out", "qc/out"]})
+        self.assertEqual(step_dependencies(workflow),
+                         {"index": ["sort"], "sort": ["align"], "align": [], "qc": [], "report": ["index", "qc"]})
+        self.assertEqual(topological_order(workflow), ["align", "qc", "sort", "index", "report"])
+
+    def test_no_id(self):
+        workflow = cwlgen.Workflow()
+        add_step(workflow, "b", "tool.cwl", {"in": "a/out"})
+        add_step(workflow, "a", "tool.cwl", {"in": "reads"})
+        self.assertEqual(topological_order(workflow), ["a", "b"])
+        self.assertEqual(cwlgen.image_manifest(workflow), [])
+
+    def test_dict(self):
+        d = {"class": "Workflow", "steps": {"b": {"in": {"x": "a/out"}, "run": "b.cwl"},
+                                            "a": {"in": {"x": "reads"}, "run": "a.cwl"}}}
+        self.assertEqual(topological_order(d), ["a", "b"])
+
+    def test_errors(self):
+        workflow = cwlgen.Workflow("main")
+        add_step(workflow, "a", "tool.cwl", {"in": "b/out"})
+        add_step(workflow, "b", "tool.cwl", {"in": "a/out"})
+        self.assertRaises(ValueError, topological_order, workflow)
+
+        workflow = cwlgen.Workflow("main")
+        add_step(workflow, "a", "tool.cwl", {"in": "missing/out"})
+        self.assertRaises(ValueError, step_dependencies, workflow)
+
+    def test_types(self):
+        workflow = cwlgen.Workflow("main")
+        workflow.inputs.append(cwlgen.InputParameter("reads", param_type="string"))
+        step = add_step(workflow, "align", "tool.cwl", {"in": "reads"})
+        step.run = cwlgen.CommandLineTool("bwa")
+        step.run.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        self.assertEqual(source_type(workflow, "reads"), "string")
+        self.assertEqual(source_type(workflow, "align/out"), "File")
+        self.assertEqual(source_type(workflow, "align/missing"), "Any")
+        step.scatter = "in"
+        self.assertEqual(source_type(workflow, "align/out"), {"type": "array", "items": "File"})
+        self.assertEqual(item_type(source_type(workflow, "align/out")), "File")
+        self.assertEqual(item_type("File[]"), "File")
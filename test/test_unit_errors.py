@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the parse errors of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import ruamel.yaml as ryaml
+
+import cwlgen
+from cwlgen.import_cwl import parse_cwl_dict, parse_cwl_string
+
+#  Class(es)  ------------------------------
+
+TOOL = """\
+class: CommandLineTool
+cwlVersion: v1.0
+inputs:
+  good:
+    type: File
+  bad:
+    notAField: 1
+outputs:
+  out:
+    type: File
+    outputBinding: 3
+"""
+
+
+class TestRaiseErrors(unittest.TestCase):
+
+    def test_unknown_field_raises(self):
+        with self.assertRaises(cwlgen.UnknownFieldError) as cm:
+            parse_cwl_string(TOOL)
+        self.assertIsInstance(cm.exception, KeyError)
+        self.assertEqual(cm.exception.path, ["inputs", "bad", "notAField"])
+
+    def test_missing_field_raises(self):
+        with self.assertRaises(cwlgen.MissingFieldError):
+            parse_cwl_dict({"class": "Workflow", "inputs": {}, "outputs": {}})
+
+    def test_unknown_class(self):
+        with self.assertRaises(cwlgen.UnknownClassError):
+            parse_cwl_dict({"class": "NotAProcess"})
+        with self.assertRaises(NotImplementedError):
+            parse_cwl_dict({"class": "NotAProcess"})
+
+    def test_invalid_items_raise(self):
+        d = {"class": "SoftwareRequirement", "packages": [{"package": "a"}, {"version": "1"}]}
+        with self.assertRaises(cwlgen.InvalidValueError) as cm:
+            cwlgen.Requirement.parse_dict(d)
+        self.assertIn("indices 1", str(cm.exception))
+
+    def test_invalid_requirement_raises(self):
+        d = {"class": "CommandLineTool", "inputs": {}, "outputs": {},
+             "hints": [{"class": "DockerRequirement"}, {"class": "InitialWorkDirRequirement"}]}
+        with self.assertRaises(cwlgen.InvalidValueError) as cm:
+            parse_cwl_dict(d)
+        self.assertEqual(["hints", 1], cm.exception.path)
+        self.assertIn("missing the field(s): listing", cm.exception.message)
+
+
+class TestCollectErrors(unittest.TestCase):
+
+    def setUp(self):
+        self.errors = cwlgen.ErrorCollector()
+        self.tool = parse_cwl_string(TOOL, errors=self.errors)
+
+    def test_keeps_parsing(self):
+        self.assertIsInstance(self.tool, cwlgen.CommandLineTool)
+        self.assertEqual(["good", "bad"], [i.id for i in self.tool.inputs])
+        self.assertEqual("out", self.tool.outputs[0].id)
+        self.assertIsNone(self.tool.outputs[0].outputBinding)
+
+    def test_collects_all_errors(self):
+        self.assertEqual(2, len(self.errors))
+        unknown, invalid = self.errors.errors
+        self.assertIsInstance(unknown, cwlgen.UnknownFieldError)
+        self.assertEqual(["inputs", "bad", "notAField"], unknown.path)
+        self.assertIsInstance(invalid, cwlgen.InvalidValueError)
+        self.assertEqual(["outputs", "out", "outputBinding"], invalid.path)
+        self.assertIn("CommandOutputBinding", invalid.message)
+
+    def test_invalid_items_are_dropped(self):
+        errors = cwlgen.ErrorCollector()
+        d = {"class": "SoftwareRequirement", "packages": [{"package": "a"}, {"version": "1"}]}
+        with cwlgen.errors.parse_context(collector=errors):
+            req = cwlgen.Requirement.parse_dict(d)
+        self.assertEqual(1, len(req.packages))
+        self.assertEqual(["packages", 1], errors.errors[0].path)
+        self.assertIn("missing the field(s): package", errors.errors[0].message)
+
+    def test_invalid_requirements_are_dropped(self):
+        errors = cwlgen.ErrorCollector()
+        workflow = parse_cwl_dict({
+            "class": "Workflow", "inputs": {}, "outputs": {},
+            "requirements": [{"class": "InitialWorkDirRequirement"}, {"class": "DockerRequirement"}, "Docker"],
+            "steps": {"a": {"run": "a.cwl", "in": {}, "out": [], "hints": {"InitialWorkDirRequirement": None}}},
+        }, errors=errors)
+        self.assertEqual(["DockerRequirement"], [r.get_class() for r in workflow.requirements])
+        self.assertEqual([], workflow.steps[0].hints)
+        self.assertEqual([["steps", "a", "hints", "InitialWorkDirRequirement"],
+                          ["requirements", 0], ["requirements", 2]], [e.path for e in errors])
+        self.assertTrue(all(isinstance(e, cwlgen.InvalidValueError) for e in errors))
+        self.assertIn("requirements", workflow.get_dict())
+
+    def test_unknown_class_is_collected(self):
+        errors = cwlgen.ErrorCollector()
+        self.assertIsNone(parse_cwl_dict({"class": "NotAProcess"}, errors=errors))
+        self.assertIsInstance(errors.errors[0], cwlgen.UnknownClassError)
+
+
+class TestErrorLocation(unittest.TestCase):
+
+    def test_line_and_column(self):
+        errors = cwlgen.ErrorCollector()
+        parse_cwl_dict(ryaml.round_trip_load(TOOL), errors=errors)
+        unknown = errors.errors[0]
+        self.assertEqual((7, 5), (unknown.line, unknown.column))
+        self.assertEqual("7:5 (inputs/bad/notAField): Key 'notAField' does not exist on type "
+                         "'<class 'cwlgen.commandlinetool.CommandInputParameter'>'", str(unknown))
+
+    def test_document_path(self):
+        error = cwlgen.ParseError("message", path=["steps", 0], line=3, column=1, document="wf.cwl")
+        self.assertEqual("wf.cwl:3:1 (steps/0): message", str(error))
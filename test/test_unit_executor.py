@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the local executor of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import os
+import shutil
+import tempfile
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen import executor as executor_module
+from cwlgen.executor import LocalExecutor, scatter_job
+from workflow_fixtures import echo_tool, read
+
+#  Class(es)  ------------------------------
+
+
+class TestLocalExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.executor = LocalExecutor(workers=4, base_dir=self.base_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def test_run(self):
+        result = self.executor.run(echo_tool(), {"message": "hello"})
+        self.assertTrue(result.success)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.argv, ["echo", "hello"])
+        self.assertEqual(read(result.outputs["out"]), "hello\n")
+        self.assertEqual(result.outputs["out"]["basename"], "out.txt")
+        self.assertGreaterEqual(result.wall_time, 0)
+        self.assertEqual(os.path.dirname(result.outdir), self.base_dir)
+
+    def test_run_many(self):
+        jobs = [{"message": str(i)} for i in range(10)]
+        results = self.executor.run_many(echo_tool(), jobs)
+        self.assertEqual([read(r.outputs["out"]) for r in results], ["%d\n" % i for i in range(10)])
+        self.assertEqual(len(set(r.outdir for r in results)), 10)
+
+    def test_compiled_cache(self):
+        tool = echo_tool()
+        compiled = self.executor._compile(tool)
+        self.assertIs(self.executor._compile(tool), compiled)
+        for _ in range(executor_module.CACHE_SIZE):
+            self.executor._compile(echo_tool())
+        self.assertEqual(len(self.executor._compiled), executor_module.CACHE_SIZE)
+        self.assertIsNot(self.executor._compile(tool), compiled)
+
+    def test_glob(self):
+        tool = cwlgen.CommandLineTool("touch", base_command="touch")
+        tool.inputs.append(cwlgen.CommandInputParameter(
+            "names", param_type="string[]", input_binding=cwlgen.CommandLineBinding(position=1)))
+        tool.outputs.append(cwlgen.CommandOutputParameter(
+            "first", param_type="File", output_binding=cwlgen.CommandOutputBinding(glob="*.txt")))
+        tool.outputs.append(cwlgen.CommandOutputParameter(
+            "all", param_type="File[]", output_binding=cwlgen.CommandOutputBinding(glob="*.txt")))
+        tool.outputs.append(cwlgen.CommandOutputParameter(
+            "contents", param_type="File?", output_binding=cwlgen.CommandOutputBinding(glob="b.txt",
+                                                                                       load_contents=True)))
+        result = self.executor.run(tool, {"names": ["b.txt", "a.txt", "c.log"]})
+        self.assertEqual(result.outputs["first"]["basename"], "a.txt")
+        self.assertEqual([f["basename"] for f in result.outputs["all"]], ["a.txt", "b.txt"])
+        self.assertEqual(result.outputs["contents"]["contents"], "")
+
+    def test_exit_codes(self):
+        tool = cwlgen.CommandLineTool("fail", base_command=["sh", "-c", "exit 3"])
+        result = self.executor.run(tool, {})
+        self.assertEqual(result.status, "permanentFail")
+        self.assertEqual(result.exit_code, 3)
+        self.assertIsNone(result.outputs)
+
+        tool.successCodes = [3]
+        self.assertTrue(LocalExecutor(base_dir=self.base_dir).run(tool, {}).success)
+
+        tool.successCodes = []
+        tool.temporaryFailCodes = [3]
+        self.assertEqual(LocalExecutor(base_dir=self.base_dir).run(tool, {}).status, "temporaryFail")
+
+    def test_missing_command(self):
+        tool = cwlgen.CommandLineTool("missing", base_command="cwlgen-command-that-does-not-exist")
+        result = self.executor.run(tool, {})
+        self.assertEqual(result.status, "permanentFail")
+        self.assertIsNone(result.exit_code)
+        self.assertIsNotNone(result.error)
+
+    def test_failed_outdir(self):
+        tool = cwlgen.CommandLineTool("fail", base_command=["sh", "-c", "exit 3"])
+        self.assertIsNone(self.executor.run(tool, {}).outdir)
+        self.assertEqual(os.listdir(self.base_dir), [])
+        result = LocalExecutor(base_dir=self.base_dir, keep_failed=True).run(tool, {})
+        self.assertTrue(os.path.isdir(result.outdir))
+
+    def test_expression_error(self):
+        def compile_expression(expression):
+            # fails for the job 'b', with an error that isn't an OSError or a ValueError
+            return lambda inputs, self, runtime: {"a": "a.txt"}[inputs["message"]]
+
+        tool = echo_tool()
+        tool.stdout = "$(inputs.message).txt"
+        executor = LocalExecutor(workers=2, base_dir=self.base_dir, compile_expression=compile_expression)
+        results = executor.run_many(tool, [{"message": "a"}, {"message": "b"}])
+        self.assertTrue(results[0].success)
+        self.assertEqual(results[1].status, "permanentFail")
+        self.assertIsNotNone(results[1].error)
+
+    def test_env_and_stdin(self):
+        tool = cwlgen.CommandLineTool("env", base_command=["sh", "-c", "echo $GREETING; cat"], stdout="out.txt")
+        tool.requirements.append(cwlgen.EnvVarRequirement([cwlgen.EnvVarRequirement.EnvironmentDef("GREETING", "hi")]))
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        stdin = os.path.join(self.base_dir, "in.txt")
+        with open(stdin, "w") as f:
+            f.write("from stdin\n")
+        tool.stdin = stdin
+        result = self.executor.run(tool, {})
+        self.assertEqual(read(result.outputs["out"]), "hi\nfrom stdin\n")
+
+    def test_initial_work_dir(self):
+        source = os.path.join(self.base_dir, "data.txt")
+        with open(source, "w") as f:
+            f.write("data\n")
+        tool = cwlgen.CommandLineTool("cat", base_command=["cat", "config.txt", "data.txt"], stdout="out.txt")
+        tool.requirements.append(cwlgen.InitialWorkDirRequirement([
+            cwlgen.InitialWorkDirRequirement.Dirent("config\n", entryname="config.txt")]))
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        d = tool.get_dict()
+        d["requirements"]["InitialWorkDirRequirement"]["listing"].append({"class": "File", "path": source})
+        result = self.executor.run(d, {})
+        self.assertEqual(read(result.outputs["out"]), "config\ndata\n")
+
+    def test_shell_command(self):
+        tool = cwlgen.CommandLineTool("shell", base_command="echo", stdout="out.txt")
+        tool.requirements.append(cwlgen.ShellCommandRequirement())
+        tool.arguments = ["a b", cwlgen.CommandLineBinding(value_from="| tr a-z A-Z", shell_quote=False, position=1)]
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        result = self.executor.run(tool, {})
+        self.assertEqual(read(result.outputs["out"]), "A B\n")
+
+    def test_parameter_references(self):
+        tool = echo_tool()
+        tool.stdout = "$(inputs.message).txt"
+        result = self.executor.run(tool, {"message": "x"})
+        self.assertTrue(result.success)
+        self.assertEqual(os.path.basename(result.outputs["out"]["path"]), "x.txt")
+
+        tool = cwlgen.CommandLineTool("pwd", base_command="echo", stdout="out.txt")
+        tool.arguments = ["$(runtime.outdir)", "$(runtime.cores)"]
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        result = self.executor.run(tool, {})
+        self.assertEqual(read(result.outputs["out"]), "%s 1\n" % result.outdir)
+
+    def test_javascript_needs_compiler(self):
+        tool = echo_tool()
+        tool.stdout = "${ return inputs.message + '.txt'; }"
+        with self.assertRaises(ValueError):
+            self.executor.run(tool, {"message": "x"})
+
+    def test_run_step(self):
+        step = cwlgen.WorkflowStep("echo", run=echo_tool(), scatter="message")
+        step.inputs.append(cwlgen.WorkflowStepInput("message", source="messages"))
+        step.out.append(cwlgen.WorkflowStepOutput("out"))
+        result = self.executor.run_step(step, {"message": ["a", "b", "c"]})
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.jobs), 3)
+        self.assertEqual([read(f) for f in result.outputs["out"]], ["a\n", "b\n", "c\n"])
+
+        step.scatter = None
+        result = self.executor.run_step(step, {"message": "d"})
+        self.assertEqual(read(result.outputs["out"]), "d\n")
+
+    def test_workflow_requirements(self):
+        tool = cwlgen.CommandLineTool("env", base_command=["sh", "-c", 'echo "$GREETING" "$1"', "sh"],
+                                      stdout="out.txt")
+        tool.arguments = ["$(runtime.cores)"]
+        tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+        tool.hints.append(cwlgen.ResourceRequirement(cores_min=1))
+        step = cwlgen.WorkflowStep("env", run=tool)
+        step.out.append(cwlgen.WorkflowStepOutput("out"))
+        workflow = cwlgen.Workflow("wf", steps=[step])
+        workflow.requirements.append(cwlgen.ResourceRequirement(cores_min=3))
+        workflow.hints.append(cwlgen.EnvVarRequirement([cwlgen.EnvVarRequirement.EnvironmentDef("GREETING", "hi")]))
+
+        result = self.executor.run_step(step, {}, resolver=cwlgen.RequirementResolver(workflow))
+        self.assertEqual(read(result.outputs["out"]), "hi 3\n")
+        result = self.executor.run(tool, {})
+        self.assertEqual(read(result.outputs["out"]), " 1\n")
+
+
+class TestScatter(unittest.TestCase):
+
+    def test_dotproduct(self):
+        jobs, shape = scatter_job({"a": [1, 2], "b": [3, 4], "c": 0}, ["a", "b"], "dotproduct")
+        self.assertEqual(jobs, [{"a": 1, "b": 3, "c": 0}, {"a": 2, "b": 4, "c": 0}])
+        self.assertIsNone(shape)
+        with self.assertRaises(ValueError):
+            scatter_job({"a": [1, 2], "b": [3]}, ["a", "b"])
+
+    def test_crossproduct(self):
+        jobs, shape = scatter_job({"a": [1, 2], "b": [3, 4, 5]}, ["a", "b"], "flat_crossproduct")
+        self.assertEqual(len(jobs), 6)
+        self.assertEqual(jobs[1], {"a": 1, "b": 4})
+        self.assertIsNone(shape)
+        jobs, shape = scatter_job({"a": [1, 2], "b": [3, 4, 5]}, ["a", "b"], "nested_crossproduct")
+        self.assertEqual(shape, [2, 3])
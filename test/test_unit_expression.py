@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the parameter references of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+from cwlgen import expression
+from cwlgen.expression import ExpressionError, clear_cache, compile_expression, evaluate, evaluate_many
+
+#  Class(es)  ------------------------------
+
+
+class TestParameterReferences(unittest.TestCase):
+
+    def setUp(self):
+        self.job = {
+            "reads": {"class": "File", "path": "/data/sample.fq.gz"},
+            "threads": 4,
+            "names": ["a", "b", "c"],
+            "options": {"min-length": 20},
+        }
+
+    def test_reference_keeps_type(self):
+        self.assertEqual(evaluate("$(inputs.threads)", self.job), 4)
+        self.assertEqual(evaluate("$(inputs.reads)", self.job), self.job["reads"])
+        self.assertEqual(evaluate("$(inputs.names)", self.job), ["a", "b", "c"])
+
+    def test_interpolation(self):
+        self.assertEqual(evaluate("-t $(inputs.threads)", self.job), "-t 4")
+        self.assertEqual(evaluate("$(inputs.names[1])_$(inputs.names[2]).txt", self.job), "b_c.txt")
+        self.assertEqual(evaluate("names=$(inputs.names)", self.job), 'names=["a", "b", "c"]')
+        self.assertEqual(evaluate("out.txt", self.job), "out.txt")
+
+    def test_segments(self):
+        self.assertEqual(evaluate("$(inputs.options['min-length'])", self.job), 20)
+        self.assertEqual(evaluate('$(inputs["options"]["min-length"])', self.job), 20)
+        self.assertEqual(evaluate("$(inputs.names.length)", self.job), 3)
+        self.assertIsNone(evaluate("$(inputs.missing)", self.job))
+        self.assertIsNone(evaluate("$(inputs.names[5])", self.job))
+
+    def test_file_properties(self):
+        self.assertEqual(evaluate("$(inputs.reads.basename)", self.job), "sample.fq.gz")
+        self.assertEqual(evaluate("$(inputs.reads.dirname)", self.job), "/data")
+        self.assertEqual(evaluate("$(inputs.reads.nameroot)", self.job), "sample.fq")
+        self.assertEqual(evaluate("$(inputs.reads.nameext)", self.job), ".gz")
+
+    def test_self_and_runtime(self):
+        self.assertEqual(evaluate("$(self.nameroot).bam", {}, self_value=self.job["reads"]), "sample.fq.bam")
+        self.assertEqual(evaluate("$(runtime.outdir)/out", {}, runtime={"outdir": "/tmp/x"}), "/tmp/x/out")
+
+    def test_escapes(self):
+        self.assertEqual(evaluate(r"\$(inputs.threads)", self.job), "$(inputs.threads)")
+        self.assertEqual(evaluate("cost: $5", self.job), "cost: $5")
+
+    def test_javascript(self):
+        self.assertRaises(ExpressionError, compile_expression, "${ return inputs.threads; }")
+        self.assertRaises(ExpressionError, compile_expression, "$(inputs.threads + 1)")
+        self.assertRaises(ExpressionError, compile_expression, "$(Math.max(1, 2))")
+        self.assertRaises(ExpressionError, evaluate, "$(inputs.threads.x.y)", self.job)
+
+    def test_cache(self):
+        self.assertIs(compile_expression("$(inputs.threads)"), compile_expression("$(inputs.threads)"))
+
+    def test_cache_size(self):
+        clear_cache()
+        first = compile_expression("$(inputs.threads)")
+        for i in range(expression.CACHE_SIZE):
+            compile_expression("$(inputs.x%d)" % i)
+            compile_expression("$(inputs.x0)")
+        self.assertEqual(len(expression._cache), expression.CACHE_SIZE)
+        self.assertIn("$(inputs.x0)", expression._cache)
+        self.assertIsNot(compile_expression("$(inputs.threads)"), first)
+
+    def test_evaluate_many(self):
+        jobs = [{"reads": {"class": "File", "path": "/data/%s.fq" % name}} for name in "abc"]
+        self.assertEqual(list(evaluate_many("$(inputs.reads.nameroot).bam", jobs)), ["a.bam", "b.bam", "c.bam"])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the ExpressionTool of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+from cwlgen.import_cwl import parse_cwl_string, get_process_type, _process_types
+
+#  Class(es)  ------------------------------
+
+EXPRESSION_TOOL = """
+cwlVersion: v1.0
+class: ExpressionTool
+id: double
+requirements:
+  InlineJavascriptRequirement: {}
+inputs:
+  x: int
+outputs:
+  y:
+    type: int
+expression: "$({'y': inputs.x * 2})"
+"""
+
+
+class TestExpressionTool(unittest.TestCase):
+
+    def test_export(self):
+        tool = cwlgen.ExpressionTool("double", expression="$({'y': inputs.x * 2})")
+        tool.requirements.append(cwlgen.InlineJavascriptRequirement())
+        tool.inputs.append(cwlgen.InputParameter("x", param_type="int"))
+        tool.outputs.append(cwlgen.ExpressionToolOutputParameter("y", param_type="int"))
+        d = tool.get_dict()
+        self.assertEqual(d["class"], "ExpressionTool")
+        self.assertEqual(d["expression"], "$({'y': inputs.x * 2})")
+        self.assertEqual(d["inputs"]["x"]["type"], "int")
+        self.assertEqual(d["outputs"]["y"]["type"], "int")
+        self.assertIn("InlineJavascriptRequirement", d["requirements"])
+
+    def test_parse(self):
+        tool = parse_cwl_string(EXPRESSION_TOOL)
+        self.assertIsInstance(tool, cwlgen.ExpressionTool)
+        self.assertEqual(tool.id, "double")
+        self.assertEqual(tool.expression, "$({'y': inputs.x * 2})")
+        self.assertEqual(tool.inputs[0].type, "int")
+        self.assertIsInstance(tool.outputs[0], cwlgen.ExpressionToolOutputParameter)
+        self.assertIsInstance(tool.requirements[0], cwlgen.InlineJavascriptRequirement)
+
+    def test_round_trip(self):
+        tool = parse_cwl_string(EXPRESSION_TOOL)
+        reparsed = parse_cwl_string(tool.export_string())
+        self.assertEqual(reparsed.get_dict(), tool.get_dict())
+
+    def test_conflicting_forms(self):
+        tool = parse_cwl_string(EXPRESSION_TOOL)
+        self.assertRaises(ValueError, tool.export_string, canonical=True, compact=True)
+        self.assertRaises(ValueError, cwlgen.Workflow("w").export_string, compact=True, packed=True)
+
+    def test_missing_expression(self):
+        with self.assertRaises(cwlgen.MissingFieldError):
+            parse_cwl_string(EXPRESSION_TOOL.replace("expression:", "label:"))
+
+
+class TestProcessRegistry(unittest.TestCase):
+
+    def workflow_with_run(self, run):
+        return {"cwlVersion": "v1.0", "class": "Workflow", "inputs": {}, "outputs": {},
+                "steps": {"s": {"run": run, "in": {}, "out": []}}}
+
+    def test_inline_runs_parsed(self):
+        run = ryaml.safe_load(EXPRESSION_TOOL)
+        w = cwlgen.parse_cwl_dict(self.workflow_with_run(run))
+        self.assertIsInstance(w.steps[0].run, cwlgen.ExpressionTool)
+        self.assertEqual(w.get_dict()["steps"]["s"]["run"]["expression"], run["expression"])
+
+    def test_unknown_run_kept(self):
+        run = {"class": "Operation", "inputs": {}, "outputs": {}}
+        w = cwlgen.parse_cwl_dict(self.workflow_with_run(run))
+        self.assertEqual(w.steps[0].run, run)
+
+    def test_run_errors_located(self):
+        run = ryaml.safe_load(EXPRESSION_TOOL)
+        del run["expression"]
+        with self.assertRaises(cwlgen.MissingFieldError) as cm:
+            cwlgen.parse_cwl_dict(self.workflow_with_run(run))
+        self.assertEqual(cm.exception.path[:3], ["steps", "s", "run"])
+
+        errors = cwlgen.ErrorCollector()
+        cwlgen.parse_cwl_dict(self.workflow_with_run(run), errors=errors)
+        self.assertEqual(errors.errors[0].path[:3], ["steps", "s", "run"])
+
+    def test_register(self):
+        class Operation(cwlgen.ExpressionTool):
+            __CLASS__ = "Operation"
+            required_fields = ["inputs", "outputs"]
+
+        cwlgen.register_process_type("Operation", Operation)
+        try:
+            self.assertIs(get_process_type("Operation"), Operation)
+            op = parse_cwl_string("class: Operation\ninputs: {}\noutputs: {}\n")
+            self.assertIsInstance(op, Operation)
+        finally:
+            del _process_types["Operation"]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the frozen model classes of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import copy
+import pickle
+import unittest
+from os import path
+
+# External libraries
+import cwlgen
+from cwlgen.frozen import freeze, FrozenList, FrozenDict
+from cwlgen.import_cwl import parse_cwl
+from workflow_fixtures import shared_tool_workflow
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+
+class TestFrozen(unittest.TestCase):
+
+    def setUp(self):
+        self.w = shared_tool_workflow()
+        self.frozen = freeze(self.w)
+
+    def test_same_dict(self):
+        self.assertEqual(self.w.get_dict(), self.frozen.get_dict())
+        self.assertIsInstance(self.frozen, cwlgen.Workflow)
+        self.assertIsInstance(self.frozen.steps, FrozenList)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.frozen.label = "label"
+        with self.assertRaises(TypeError):
+            self.frozen.steps.append(None)
+        with self.assertRaises(TypeError):
+            freeze({"a": 1})["b"] = 2
+
+    def test_shared_objects_stay_shared(self):
+        self.assertIs(self.frozen.steps[0].run, self.frozen.steps[1].run)
+
+    def test_hash_and_equality(self):
+        other = freeze(shared_tool_workflow())
+        self.assertIsNot(self.frozen, other)
+        self.assertEqual(self.frozen, other)
+        self.assertEqual(hash(self.frozen), hash(other))
+        self.assertEqual(1, len({self.frozen, other}))
+        self.assertNotEqual(self.frozen, self.frozen.evolve(label="label"))
+
+    def test_evolve(self):
+        evolved = self.frozen.evolve(label="label", doc=None)
+        self.assertEqual("label", evolved.label)
+        self.assertIsNone(self.frozen.label)
+        self.assertIs(self.frozen.steps, evolved.steps)
+        with self.assertRaises(AttributeError):
+            self.frozen.evolve(unknown=1)
+
+    def test_replace(self):
+        changed = self.frozen.replace(["steps", "step1", "run", "requirements", "DockerRequirement", "dockerPull"],
+                                      "ubuntu:20.04")
+        self.assertEqual("ubuntu:20.04", changed.steps[1].run.requirements[0].dockerPull)
+        self.assertEqual("ubuntu:18.04", self.frozen.steps[1].run.requirements[0].dockerPull)
+        # only the path to the change is copied
+        self.assertIs(self.frozen.steps[0], changed.steps[0])
+        self.assertIs(self.frozen.inputs, changed.inputs)
+        self.assertIs(self.frozen.steps[1].inputs, changed.steps[1].inputs)
+
+        by_index = self.frozen.replace(["steps", 1, "run", "requirements", 0, "dockerPull"], "ubuntu:20.04")
+        self.assertEqual(changed, by_index)
+
+    def test_replace_missing(self):
+        with self.assertRaises(KeyError):
+            self.frozen.replace(["steps", "step9", "label"], "label")
+        with self.assertRaises(AttributeError):
+            self.frozen.replace(["unknown"], 1)
+
+    def test_thaw(self):
+        thawed = self.frozen.thaw()
+        self.assertIs(type(thawed), cwlgen.Workflow)
+        self.assertIs(type(thawed.steps), list)
+        thawed.steps[0].label = "label"
+        self.assertEqual(self.w.get_dict(), self.frozen.get_dict())
+        self.assertIs(thawed.steps[0].run, thawed.steps[1].run)
+
+    def test_copy_and_pickle(self):
+        self.assertIs(self.frozen, copy.deepcopy(self.frozen))
+        unpickled = pickle.loads(pickle.dumps(self.frozen))
+        self.assertEqual(self.frozen, unpickled)
+
+    def test_parsed(self):
+        tool = parse_cwl(test_dir + '/import_commandlinetool.cwl')
+        frozen = freeze(tool)
+        self.assertEqual(tool.get_dict(), frozen.get_dict())
+        self.assertIn("cwlVersion", frozen.export_string())
+
+    def test_not_registered(self):
+        freeze(cwlgen.DockerRequirement(docker_pull="ubuntu"))
+        self.assertIs(cwlgen.DockerRequirement, cwlgen.Requirement.get_registered_type("DockerRequirement"))
+        self.assertIsNone(cwlgen.Requirement.get_registered_type("FrozenDockerRequirement"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the fusion of workflow steps of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.canonical import normalize
+from cwlgen.dag import topological_order
+from cwlgen.fusion import find_fusible_chains, fuse_steps
+from workflow_fixtures import add_step, make_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestFusion(unittest.TestCase):
+
+    def setUp(self):
+        self.workflow = cwlgen.Workflow("main")
+        self.workflow.inputs.append(cwlgen.InputParameter("reads", param_type="File"))
+        self.workflow.outputs.append(cwlgen.WorkflowOutputParameter("report", output_source="report/out",
+                                                                    param_type="File"))
+        add_step(self.workflow, "trim", make_tool("trim", "ubuntu"), {"in": "reads"})
+        add_step(self.workflow, "align", make_tool("align", "ubuntu"), {"in": "trim/out"})
+        add_step(self.workflow, "sort", make_tool("sort", "ubuntu"), {"in": "#main/align/out"})
+        add_step(self.workflow, "qc", make_tool("qc", "fastqc"), {"in": "reads"})
+        add_step(self.workflow, "report", make_tool("report", "ubuntu"), {"in": ["sort/out", "qc/out"]},
+                 link_merge="merge_flattened")
+
+    def test_chains(self):
+        workflow = self.workflow
+        self.assertEqual(find_fusible_chains(workflow), [["trim", "align", "sort"]])
+
+        # a step with two consumers ends the chain
+        add_step(workflow, "stats", make_tool("stats", "ubuntu"), {"in": "align/out"})
+        workflow.outputs.append(cwlgen.WorkflowOutputParameter("stats", output_source="stats/out"))
+        self.assertEqual(find_fusible_chains(workflow), [["trim", "align"]])
+
+    def test_docker(self):
+        workflow = self.workflow
+        workflow.steps[1].run.hints[0].dockerPull = "bwa"
+        self.assertEqual(find_fusible_chains(workflow), [])
+        workflow.steps[1].requirements.append(cwlgen.DockerRequirement(docker_pull="ubuntu"))
+        self.assertEqual(find_fusible_chains(workflow), [["trim", "align", "sort"]])
+
+    def test_fuse(self):
+        workflow = self.workflow
+        before = workflow.get_dict()
+        fused, report = fuse_steps(workflow, step_overhead=30)
+        self.assertEqual(workflow.get_dict(), before)
+
+        self.assertEqual(report.chains, [["trim", "align", "sort"]])
+        self.assertEqual((report.steps_before, report.steps_after, report.steps_saved), (5, 3, 2))
+        self.assertEqual(report.estimated_savings, 60)
+
+        self.assertEqual([s.id for s in fused.steps], ["sort", "qc", "report"])
+        self.assertIn("SubworkflowFeatureRequirement", [r.get_class() for r in fused.requirements])
+        d = normalize(fused.get_dict())
+        self.assertEqual(d["steps"]["sort"]["in"], {"reads": {"source": "reads"}})
+        self.assertEqual(d["steps"]["sort"]["out"], ["out"])
+        sub = d["steps"]["sort"]["run"]
+        self.assertEqual(sub["inputs"], {"reads": {"type": "File"}})
+        self.assertEqual(sub["outputs"], {"out": {"type": "File", "outputSource": "sort/out"}})
+        self.assertEqual(sub["steps"]["trim"]["in"], {"in": {"source": "reads"}})
+        self.assertEqual(sub["steps"]["sort"]["in"], {"in": {"source": "align/out"}})
+        self.assertEqual(topological_order(fused), ["sort", "qc", "report"])
+
+    def test_scatter(self):
+        workflow = cwlgen.Workflow("main")
+        workflow.inputs.append(cwlgen.InputParameter("reads", param_type="File[]"))
+        add_step(workflow, "trim", make_tool("trim", "ubuntu"), {"in": "reads"}, scatter="in")
+        add_step(workflow, "align", make_tool("align", "ubuntu"), {"in": "trim/out"}, scatter="in")
+        add_step(workflow, "merge", make_tool("merge", "ubuntu"), {"in": "align/out"})
+        self.assertEqual(find_fusible_chains(workflow), [["trim", "align"]])
+
+        fused, _ = fuse_steps(workflow)
+        d = normalize(fused.get_dict())
+        self.assertEqual(d["steps"]["align"]["scatter"], "reads")
+        sub = d["steps"]["align"]["run"]
+        self.assertEqual(sub["inputs"]["reads"]["type"], "File")
+        self.assertNotIn("scatter", sub["steps"]["trim"])
+        self.assertEqual(d["steps"]["merge"]["in"], {"in": {"source": "align/out"}})
+
+    def test_scatter_mismatch(self):
+        workflow = cwlgen.Workflow("main")
+        add_step(workflow, "trim", make_tool("trim", "ubuntu"), {"in": "reads"}, scatter="in")
+        add_step(workflow, "merge", make_tool("merge", "ubuntu"), {"in": "trim/out"})
+        self.assertEqual(find_fusible_chains(workflow), [])
+        self.assertRaises(ValueError, fuse_steps, workflow, [["trim", "merge"]])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the $graph documents of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import os
+import shutil
+import tempfile
+import unittest
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+from cwlgen.import_cwl import parse_cwl_string
+from workflow_fixtures import message_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestGraphDocument(unittest.TestCase):
+
+    def setUp(self):
+        w = cwlgen.Workflow("wf")
+        w.steps.append(cwlgen.WorkflowStep("step0", run=message_tool(stdout=False)))
+        w.steps.append(cwlgen.WorkflowStep("step1", run=message_tool("cat", "cat", stdout=False)))
+        self.text = ryaml.dump(w.pack(), default_flow_style=False)
+
+    def test_parse(self):
+        graph = parse_cwl_string(self.text)
+        self.assertIsInstance(graph, cwlgen.GraphDocument)
+        self.assertEqual(graph.cwlVersion, "v1.0")
+        self.assertEqual(graph.ids(), ["main", "echo", "cat"])
+        self.assertEqual(len(graph), 3)
+        self.assertIn("#echo", graph)
+        self.assertIn("echo", graph)
+        self.assertNotIn("ls", graph)
+
+    def test_lazy(self):
+        graph = parse_cwl_string(self.text)
+        self.assertFalse(graph.is_parsed("echo"))
+        tool = graph["#echo"]
+        self.assertIsInstance(tool, cwlgen.CommandLineTool)
+        self.assertEqual(tool.baseCommand, "echo")
+        self.assertEqual(tool.cwlVersion, "v1.0")
+        self.assertTrue(graph.is_parsed("echo"))
+        self.assertFalse(graph.is_parsed("main"))
+        self.assertFalse(graph.is_parsed("cat"))
+        self.assertIs(graph["echo"], tool)
+
+    def test_main(self):
+        graph = parse_cwl_string(self.text)
+        self.assertIsInstance(graph.main, cwlgen.Workflow)
+        self.assertEqual(graph.main.steps[0].run, "#echo")
+        self.assertIsNone(graph.get("ls"))
+        with self.assertRaises(KeyError):
+            graph["ls"]
+
+    def test_export_unparsed(self):
+        graph = parse_cwl_string(self.text)
+        self.assertEqual(graph.get_dict(), ryaml.safe_load(self.text))
+
+    def test_export_modified(self):
+        graph = parse_cwl_string(self.text)
+        graph["echo"].baseCommand = "printf"
+        d = graph.get_dict()
+        entries = {e["id"]: e for e in d["$graph"]}
+        self.assertEqual(entries["#echo"]["baseCommand"], "printf")
+        self.assertNotIn("cwlVersion", entries["#echo"])
+        self.assertEqual(entries["#cat"]["baseCommand"], "cat")
+        self.assertEqual(list(entries), ["#main", "#echo", "#cat"])
+
+    def test_build(self):
+        graph = cwlgen.GraphDocument([message_tool(stdout=False), message_tool("cat", "cat", stdout=False)])
+        reparsed = parse_cwl_string(graph.export_string())
+        self.assertEqual(reparsed.ids(), ["echo", "cat"])
+        self.assertEqual(reparsed["cat"].baseCommand, "cat")
+        with self.assertRaises(ValueError):
+            graph.append(message_tool(stdout=False))
+
+    def test_export_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            outfile = os.path.join(tmp_dir, "packed.cwl")
+            parse_cwl_string(self.text).export(outfile)
+            graph = cwlgen.parse_cwl(outfile)
+            self.assertEqual(graph.ids(), ["main", "echo", "cat"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_errors_located(self):
+        text = self.text.replace("baseCommand: cat", "baseCommand: cat\n  unknownField: 1")
+        graph = parse_cwl_string(text)
+        with self.assertRaises(cwlgen.ParseError) as cm:
+            graph["cat"]
+        self.assertEqual(cm.exception.path[:2], ["$graph", 2])
+
+    def test_errors_collected(self):
+        text = self.text.replace("baseCommand: cat", "baseCommand: cat\n  unknownField: 1")
+        errors = cwlgen.ErrorCollector()
+        graph = parse_cwl_string(text, errors=errors)
+        self.assertFalse(errors)
+        graph["echo"]
+        self.assertFalse(errors)
+        graph["cat"]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors.errors[0].path[:2], ["$graph", 2])
+        self.assertIsNotNone(errors.errors[0].line)
@@ -6,6 +6,7 @@ Unit tests for import feature of cwlgen library
 
 #  Import  ------------------------------
 
+import copy
 import unittest
 # General libraries
 from os import path
@@ -53,6 +54,13 @@ class TestImportCWL(TestImport):
     def test_load_doc(self):
         self.assertEqual(self.wf.doc, 'This is a documentation string')
 
+    def test_source_not_modified(self):
+        with open(self.path) as mf:
+            wf_dict = ryaml.load(mf, Loader=ryaml.Loader)
+        original = copy.deepcopy(wf_dict)
+        parse_cwl_dict(wf_dict)
+        self.assertEqual(original, wf_dict)
+
 
 class TestInputsParser(TestImport):
 
@@ -168,3 +176,40 @@ requirements:
             'SubworkflowFeatureRequirement': {}
         }
         self.assertDictEqual(expected, wfd["requirements"])
+
+    def test_hints_and_step_requirements(self):
+        wfstr = """\
+class: Workflow
+cwlVersion: v1.0
+
+inputs: {}
+outputs: {}
+
+hints:
+  - class: DockerRequirement
+    dockerPull: ubuntu:latest
+
+steps:
+  step1:
+    run: tool.cwl
+    in: {}
+    out: []
+    requirements:
+      ResourceRequirement:
+        coresMin: 2
+    hints:
+      - class: vendor:QueueHint
+        queue: short"""
+        wf = parse_cwl_string(wfstr)
+        self.assertEqual(1, len(wf.hints))
+        self.assertIsInstance(wf.hints[0], Requirements.DockerRequirement)
+
+        step = wf.steps[0]
+        self.assertEqual(1, len(step.requirements))
+        self.assertIsInstance(step.requirements[0], Requirements.ResourceRequirement)
+        self.assertEqual(2, step.requirements[0].coresMin)
+        self.assertIsInstance(step.hints[0], Requirements.UnknownRequirement)
+
+        sd = wf.get_dict()["steps"]["step1"]
+        self.assertDictEqual({"ResourceRequirement": {"coresMin": 2}}, sd["requirements"])
+        self.assertDictEqual({"vendor:QueueHint": {"queue": "short"}}, sd["hints"])
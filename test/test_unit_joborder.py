@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the generation of job orders of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+# External libraries
+import ruamel.yaml
+
+import cwlgen
+from cwlgen.joborder import generate_jobs, write_jobs
+from workflow_fixtures import align_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestGenerateJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tool = align_tool([("reads", "string"), ("threads", "int"), ("reference", "string")])
+
+    def test_dotproduct(self):
+        jobs = generate_jobs(self.tool, {"reads": ["a", "b"], "threads": iter([1, 2])}, base={"reference": "r"})
+        self.assertEqual(list(jobs), [{"reads": "a", "threads": 1, "reference": "r"},
+                                      {"reads": "b", "threads": 2, "reference": "r"}])
+
+    def test_dotproduct_lengths(self):
+        jobs = generate_jobs(self.tool, {"reads": ["a", "b"], "threads": [1]})
+        self.assertEqual(next(jobs), {"reads": "a", "threads": 1})
+        self.assertRaises(ValueError, next, jobs)
+
+    def test_crossproduct(self):
+        for method in ("flat_crossproduct", "nested_crossproduct"):
+            jobs = generate_jobs(self.tool, {"reads": ["a", "b"], "threads": (t for t in [1, 2, 4])},
+                                 scatter_method=method)
+            self.assertEqual([(j["reads"], j["threads"]) for j in jobs],
+                             [("a", 1), ("a", 2), ("a", 4), ("b", 1), ("b", 2), ("b", 4)])
+
+    def test_lazy(self):
+        jobs = generate_jobs(self.tool, {"threads": itertools.count()}, base={"reads": "a"})
+        self.assertEqual(next(jobs), {"reads": "a", "threads": 0})
+
+    def test_invalid(self):
+        # the parameters are checked when generate_jobs is called, not when the first job is generated
+        self.assertRaises(ValueError, generate_jobs, self.tool, {"unknown": [1]})
+        self.assertRaises(ValueError, generate_jobs, self.tool, {"reads": ["a"]}, scatter_method="zip")
+
+
+class TestWriteJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.jobs = [{"reads": "a", "threads": t} for t in range(5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_jsonl(self):
+        path = os.path.join(self.dir, "jobs.jsonl")
+        self.assertEqual(write_jobs(iter(self.jobs), path), ([path], 5))
+        with open(path) as jsonl:
+            self.assertEqual([json.loads(line) for line in jsonl], self.jobs)
+
+    def test_jsonl_shards(self):
+        path = os.path.join(self.dir, "jobs.jsonl")
+        paths, count = write_jobs(iter(self.jobs), path, shards=2)
+        self.assertEqual(paths, [os.path.join(self.dir, "jobs-0.jsonl"), os.path.join(self.dir, "jobs-1.jsonl")])
+        self.assertEqual(count, 5)
+        with open(paths[1]) as jsonl:
+            self.assertEqual([json.loads(line)["threads"] for line in jsonl], [1, 3])
+
+    def test_files(self):
+        paths, count = write_jobs(iter(self.jobs), self.dir, format="yaml", shards=2)
+        self.assertEqual(count, 5)
+        self.assertEqual(sorted(os.listdir(paths[0])), ["job-0.yaml", "job-2.yaml", "job-4.yaml"])
+        with open(os.path.join(paths[1], "job-3.yaml")) as f:
+            self.assertEqual(dict(ruamel.yaml.safe_load(f)), self.jobs[3])
+
+        paths, _ = write_jobs(iter(self.jobs), os.path.join(self.dir, "json"), format="json")
+        with open(os.path.join(paths[0], "job-1.json")) as f:
+            self.assertEqual(json.load(f), self.jobs[1])
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, write_jobs, self.jobs, self.dir, format="xml")
+        self.assertRaises(ValueError, write_jobs, self.jobs, self.dir, shards=0)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the packing of workflows of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+from cwlgen.import_cwl import parse_cwl_string
+from workflow_fixtures import add_step, message_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestPack(unittest.TestCase):
+
+    def workflow(self, *runs):
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("message", param_type="string"))
+        for i, run in enumerate(runs):
+            add_step(w, "step%d" % i, run, {"message": "message"})
+        return w
+
+    def graph_by_id(self, packed):
+        return {p["id"]: p for p in packed["$graph"]}
+
+    def test_single_tool(self):
+        packed = self.workflow(message_tool()).pack()
+        self.assertEqual(packed["cwlVersion"], "v1.0")
+        graph = self.graph_by_id(packed)
+        self.assertEqual(set(graph), {"#main", "#echo"})
+        self.assertEqual(packed["$graph"][0]["id"], "#main")
+        self.assertEqual(graph["#main"]["steps"]["step0"]["run"], "#echo")
+        self.assertEqual(graph["#echo"]["class"], "CommandLineTool")
+        self.assertNotIn("cwlVersion", graph["#echo"])
+        self.assertNotIn("cwlVersion", graph["#main"])
+
+    def test_shared_tool_included_once(self):
+        tool = message_tool()
+        packed = self.workflow(tool, tool, tool).pack()
+        self.assertEqual(len(packed["$graph"]), 2)
+        runs = {s["run"] for s in packed["$graph"][0]["steps"].values()}
+        self.assertEqual(runs, {"#echo"})
+
+    def test_identical_copies_included_once(self):
+        packed = self.workflow(message_tool(), message_tool()).pack()
+        self.assertEqual(len(packed["$graph"]), 2)
+
+    def test_conflicting_ids(self):
+        packed = self.workflow(message_tool(command="echo"), message_tool(command="cat")).pack()
+        graph = self.graph_by_id(packed)
+        self.assertEqual(set(graph), {"#main", "#echo", "#echo_2"})
+        steps = packed["$graph"][0]["steps"]
+        self.assertEqual(graph[steps["step0"]["run"]]["baseCommand"], "echo")
+        self.assertEqual(graph[steps["step1"]["run"]]["baseCommand"], "cat")
+
+    def test_tool_without_id(self):
+        packed = self.workflow(message_tool(tool_id=None)).pack()
+        self.assertEqual(packed["$graph"][0]["steps"]["step0"]["run"], "#step0")
+
+    def test_nested_workflow(self):
+        tool = message_tool()
+        inner = self.workflow(tool)
+        inner.id = "inner"
+        packed = self.workflow(inner, tool).pack()
+        graph = self.graph_by_id(packed)
+        self.assertEqual(set(graph), {"#main", "#inner", "#echo"})
+        self.assertEqual(graph["#main"]["steps"]["step0"]["run"], "#inner")
+        self.assertEqual(graph["#main"]["steps"]["step1"]["run"], "#echo")
+        self.assertEqual(graph["#inner"]["steps"]["step0"]["run"], "#echo")
+
+    def test_references_kept(self):
+        packed = self.workflow("echo.cwl").pack()
+        self.assertEqual(len(packed["$graph"]), 1)
+        self.assertEqual(packed["$graph"][0]["steps"]["step0"]["run"], "echo.cwl")
+
+    def test_resolve(self):
+        calls = []
+
+        def resolve(path):
+            calls.append(path)
+            return message_tool() if path == "echo.cwl" else None
+
+        packed = self.workflow("echo.cwl", "echo.cwl", "other.cwl").pack(resolve=resolve)
+        steps = packed["$graph"][0]["steps"]
+        self.assertEqual(calls, ["echo.cwl", "other.cwl"])
+        self.assertEqual(steps["step0"]["run"], "#echo")
+        self.assertEqual(steps["step1"]["run"], "#echo")
+        self.assertEqual(steps["step2"]["run"], "other.cwl")
+
+    def test_workflow_not_modified(self):
+        w = self.workflow(message_tool())
+        before = w.get_dict()
+        w.pack()
+        self.assertEqual(w.get_dict(), before)
+        self.assertIsInstance(w.steps[0].run, cwlgen.CommandLineTool)
+
+    def test_parsed_workflow(self):
+        w = parse_cwl_string(self.workflow(message_tool()).export_string())
+        packed = cwlgen.pack(w)
+        self.assertEqual(self.graph_by_id(packed)["#main"]["steps"]["step0"]["run"], "#echo")
+
+    def test_export_packed(self):
+        text = self.workflow(message_tool()).export_string(packed=True)
+        d = ryaml.safe_load(text)
+        self.assertEqual([p["id"] for p in d["$graph"]], ["#main", "#echo"])
@@ -1,6 +1,7 @@
 import unittest
 
 import cwlgen
+from cwlgen.import_cwl import parse_cwl_string
 
 
 class TestAddRequirements(unittest.TestCase):
@@ -371,3 +372,103 @@ class TestParseRequirements(unittest.TestCase):
     #
     #     req = cwlgen.Requirement.parse_dict(d)
     #     print(req)
+
+
+class TestRequirementRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = dict(cwlgen.Requirement._registry)
+
+    def tearDown(self):
+        cwlgen.Requirement._registry.clear()
+        cwlgen.Requirement._registry.update(self.registry)
+
+    def test_builtin_requirements_registered(self):
+        for name in ["InlineJavascriptRequirement", "DockerRequirement", "ResourceRequirement",
+                     "SubworkflowFeatureRequirement", "ShellCommandRequirement", "SoftwareRequirement",
+                     "InitialWorkDirRequirement", "SchemaDefRequirement"]:
+            self.assertIs(cwlgen.Requirement.get_registered_type(name), getattr(cwlgen, name))
+        self.assertIsNone(cwlgen.Requirement.get_registered_type("UnknownRequirement"))
+
+    def test_subclass_replaces_builtin(self):
+        class DockerRequirement(cwlgen.Requirement):
+            # the same name as a builtin, but it doesn't declare a CWL class
+            pass
+
+        self.assertIs(cwlgen.Requirement.get_registered_type("DockerRequirement"), cwlgen.DockerRequirement)
+
+        class PinnedDockerRequirement(cwlgen.DockerRequirement):
+            cwl_class = "DockerRequirement"
+
+        req = cwlgen.Requirement.parse_dict({"class": "DockerRequirement", "dockerPull": "ubuntu"})
+        self.assertIsInstance(req, PinnedDockerRequirement)
+        self.assertEqual(req.dockerPull, "ubuntu")
+
+    def test_subclass_is_registered(self):
+        class CustomTestRequirement(cwlgen.Requirement):
+            cwl_class = "CustomTestRequirement"
+
+            def __init__(self, value=None):
+                cwlgen.Requirement.__init__(self, "CustomTestRequirement")
+                self.value = value
+
+        req = cwlgen.Requirement.parse_dict({"class": "CustomTestRequirement", "value": 4})
+        self.assertIsInstance(req, CustomTestRequirement)
+        self.assertEqual(req.value, 4)
+
+    def test_register_namespaced_hint(self):
+        class LoadListingRequirement(cwlgen.Requirement):
+            def __init__(self, loadListing=None):
+                cwlgen.Requirement.__init__(self, "cwltool:LoadListingRequirement")
+                self.loadListing = loadListing
+
+        cwlgen.Requirement.register("cwltool:LoadListingRequirement", LoadListingRequirement)
+        req = cwlgen.Requirement.parse_dict({"class": "cwltool:LoadListingRequirement", "loadListing": "no_listing"})
+        self.assertIsInstance(req, LoadListingRequirement)
+        self.assertEqual(req.get_class(), "cwltool:LoadListingRequirement")
+        self.assertEqual(req.loadListing, "no_listing")
+
+    def test_unknown_requirement_is_kept(self):
+        d = {"class": "vendor:MagicHint", "level": 11}
+        req = cwlgen.Requirement.parse_dict(d)
+        self.assertIsInstance(req, cwlgen.UnknownRequirement)
+        self.assertEqual(req.get_class(), "vendor:MagicHint")
+        self.assertDictEqual(req.get_dict(), {"level": 11})
+
+    def test_unknown_hint_round_trip(self):
+        tool = cwlgen.CommandLineTool.parse_dict({
+            "class": "CommandLineTool",
+            "inputs": {},
+            "outputs": {},
+            "hints": {"vendor:MagicHint": {"level": 11}}
+        })
+        self.assertEqual(tool.get_dict()["hints"], {"vendor:MagicHint": {"level": 11}})
+
+    def test_failed_requirement_is_dropped(self):
+        errors = cwlgen.ErrorCollector()
+        tool = cwlgen.parse_cwl_dict({
+            "class": "CommandLineTool",
+            "inputs": {},
+            "outputs": {},
+            "requirements": [{"class": "InitialWorkDirRequirement"},
+                             {"class": "DockerRequirement", "dockerPull": "ubuntu"}],
+            "hints": {"InitialWorkDirRequirement": {}}
+        }, errors=errors)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual([r.get_class() for r in tool.requirements], ["DockerRequirement"])
+        self.assertEqual(tool.hints, [])
+        self.assertEqual(tool.get_dict()["requirements"], {"DockerRequirement": {"dockerPull": "ubuntu"}})
+
+    def test_parse_env_var_requirement(self):
+        d = {"class": "EnvVarRequirement", "envDef": [{"envName": "LANG", "envValue": "C"}]}
+        req = cwlgen.Requirement.parse_dict(d)
+        self.assertIsInstance(req, cwlgen.EnvVarRequirement)
+        self.assertEqual(req.envDef[0].envName, "LANG")
+        self.assertEqual(req.envDef[0].envValue, "C")
+        self.assertEqual(req.get_dict(), {"envDef": [{"envName": "LANG", "envValue": "C"}]})
+
+        tool = parse_cwl_string(cwlgen.CommandLineTool("env", requirements=[req]).export_string())
+        self.assertEqual(tool.requirements[0].get_dict(), {"envDef": [{"envName": "LANG", "envValue": "C"}]})
+
+        req = cwlgen.Requirement.parse_dict({"class": "EnvVarRequirement", "envDef": {"LANG": "C"}})
+        self.assertEqual([(e.envName, e.envValue) for e in req.envDef], [("LANG", "C")])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the resolution of the requirements of workflow steps of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.resolver import RequirementResolver
+
+#  Class(es)  ------------------------------
+
+
+class TestRequirementResolver(unittest.TestCase):
+
+    def setUp(self):
+        align = cwlgen.CommandLineTool("bwa", base_command="bwa")
+        align.hints.append(cwlgen.DockerRequirement(docker_pull="biocontainers/bwa"))
+        align.requirements.append(cwlgen.ResourceRequirement(cores_min=4))
+
+        fastqc = cwlgen.CommandLineTool("fastqc", base_command="fastqc")
+        qc = cwlgen.Workflow("qc")
+        qc.requirements.append(cwlgen.ResourceRequirement(ram_min=2000))
+        qc.steps.append(cwlgen.WorkflowStep("fastqc", run=fastqc))
+
+        self.workflow = cwlgen.Workflow("main")
+        self.workflow.requirements.append(cwlgen.DockerRequirement(docker_pull="ubuntu:20.04"))
+        self.workflow.hints.append(cwlgen.ResourceRequirement(ram_min=1000))
+        self.workflow.steps.append(cwlgen.WorkflowStep("align", run=align))
+        self.workflow.steps.append(cwlgen.WorkflowStep("qc", run=qc))
+        self.workflow.steps.append(cwlgen.WorkflowStep("external", run="external.cwl"))
+        self.resolver = RequirementResolver(self.workflow)
+
+    def test_steps(self):
+        self.assertEqual(sorted(self.resolver.steps()), ["align", "external", "qc", "qc/fastqc"])
+
+    def test_precedence(self):
+        # the requirement of the workflow takes precedence over the hint of the tool
+        self.assertEqual(self.resolver.get("align", "DockerRequirement"), {"dockerPull": "ubuntu:20.04"})
+        self.assertEqual(self.resolver.get("align", "ResourceRequirement"), {"coresMin": 4})
+        self.assertEqual(self.resolver.hints("align"), {})
+        self.assertEqual(self.resolver.hints("external"), {"ResourceRequirement": {"ramMin": 1000}})
+        self.assertEqual(self.resolver.get(self.workflow.steps[2], "ResourceRequirement"), {"ramMin": 1000})
+
+    def test_nested(self):
+        self.assertEqual(self.resolver.requirements("qc/fastqc"),
+                         {"DockerRequirement": {"dockerPull": "ubuntu:20.04"},
+                          "ResourceRequirement": {"ramMin": 2000}})
+        self.assertIsNone(self.resolver.get("qc/fastqc", "EnvVarRequirement"))
+        self.assertRaises(KeyError, self.resolver.get, "fastqc", "DockerRequirement")
+
+    def test_cache(self):
+        self.assertIs(self.resolver.requirements("align"), self.resolver.requirements("align"))
+
+    def test_invalidate(self):
+        align = self.resolver.requirements("align")
+        fastqc = self.resolver.requirements("qc/fastqc")
+
+        qc = self.workflow.steps[1].run
+        qc.requirements[0].ramMin = 4000
+        self.assertEqual(self.resolver.get("qc/fastqc", "ResourceRequirement"), {"ramMin": 2000})
+        self.resolver.invalidate(qc.requirements[0])
+        self.assertEqual(self.resolver.get("qc/fastqc", "ResourceRequirement"), {"ramMin": 4000})
+        self.assertIsNot(self.resolver.requirements("qc/fastqc"), fastqc)
+        self.assertIs(self.resolver.requirements("align"), align)
+
+        self.workflow.steps[0].requirements.append(cwlgen.EnvVarRequirement([]))
+        self.resolver.invalidate(self.workflow.steps[0])
+        self.assertIn("EnvVarRequirement", self.resolver.requirements("align"))
+
+        self.workflow.steps.append(cwlgen.WorkflowStep("new", run="new.cwl"))
+        self.resolver.invalidate(self.workflow)
+        self.assertIn("new", self.resolver.steps())
+
+    def test_invalidate_run(self):
+        self.assertEqual(self.resolver.get("align", "ResourceRequirement"), {"coresMin": 4})
+        other = cwlgen.Workflow("other")
+        other.requirements.append(cwlgen.ResourceRequirement(cores_min=8))
+        other.steps.append(cwlgen.WorkflowStep("inner", run=cwlgen.CommandLineTool("inner")))
+        self.workflow.steps[0].run = other
+        self.resolver.invalidate(self.workflow.steps[0])
+        self.assertEqual(self.resolver.get("align", "ResourceRequirement"), {"coresMin": 8})
+        self.assertEqual(self.resolver.get("align/inner", "ResourceRequirement"), {"coresMin": 8})
+        self.assertIn("qc/fastqc", self.resolver.steps())
+
+        self.workflow.steps[0].run = cwlgen.CommandLineTool("tool")
+        self.resolver.invalidate(self.workflow.steps[0])
+        self.assertRaises(KeyError, self.resolver.get, "align/inner", "ResourceRequirement")
+
+    def test_invalidate_removed(self):
+        self.assertEqual(self.resolver.get("qc/fastqc", "ResourceRequirement"), {"ramMin": 2000})
+        qc = self.workflow.steps[1].run
+        removed = qc.requirements.pop()
+        self.resolver.invalidate(removed)
+        self.assertEqual(self.resolver.get("qc/fastqc", "ResourceRequirement"), {"ramMin": 1000})
+
+    def test_dict_requirements(self):
+        self.workflow.hints = [{"class": "SoftwareRequirement", "packages": [{"package": "bwa"}]}]
+        self.resolver.invalidate()
+        self.assertEqual(self.resolver.hints("external"), {"SoftwareRequirement": {"packages": [{"package": "bwa"}]}})
+
+    def test_root(self):
+        self.assertEqual(self.resolver.get(None, "DockerRequirement"), {"dockerPull": "ubuntu:20.04"})
+        self.assertEqual(self.resolver.hints(None), {"ResourceRequirement": {"ramMin": 1000}})
+        self.workflow.hints[0].ramMin = 500
+        self.resolver.invalidate(self.workflow.hints[0])
+        self.assertEqual(self.resolver.get(None, "ResourceRequirement"), {"ramMin": 500})
+
+        tool = cwlgen.CommandLineTool("tool")
+        tool.requirements.append(cwlgen.ResourceRequirement(cores_min=2))
+        self.assertEqual(RequirementResolver(tool).requirements(None), {"ResourceRequirement": {"coresMin": 2}})
+
+    def test_resolve(self):
+        tool = cwlgen.CommandLineTool("external")
+        tool.requirements.append(cwlgen.DockerRequirement(docker_pull="alpine"))
+        resolver = RequirementResolver(self.workflow, resolve={"external.cwl": tool}.get)
+        self.assertEqual(resolver.get("external", "DockerRequirement"), {"dockerPull": "alpine"})
+
+    def test_dict(self):
+        d = {
+            "class": "Workflow",
+            "requirements": [{"class": "DockerRequirement", "dockerPull": "ubuntu"}],
+            "steps": [{"id": "a", "run": {"class": "CommandLineTool",
+                                          "hints": {"ResourceRequirement": {"coresMin": 2}}}}],
+        }
+        resolver = RequirementResolver(d)
+        self.assertEqual(resolver.requirements("a"), {"DockerRequirement": {"dockerPull": "ubuntu"}})
+        self.assertEqual(resolver.hints("a"), {"ResourceRequirement": {"coresMin": 2}})
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the round trip import / export of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import unittest
+from os import path
+
+# External libraries
+import cwlgen
+from cwlgen.import_cwl import parse_cwl, parse_cwl_string
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+TOOL = """#!/usr/bin/env cwl-runner
+cwlVersion: v1.0
+class: CommandLineTool
+
+# the docker image of the tool
+requirements:
+    DockerRequirement:
+        dockerPull: ubuntu:18.04   # pinned
+baseCommand: [echo]
+inputs:
+    x: string
+    y:
+        type: int
+        inputBinding: {position: 2}
+outputs: []
+"""
+
+
+class TestRoundTrip(unittest.TestCase):
+
+    def test_unchanged_workflow(self):
+        with open(test_dir + '/import_workflow.cwl') as f:
+            source = f.read()
+        wf = parse_cwl(test_dir + '/import_workflow.cwl', round_trip=True)
+        self.assertEqual(source.strip(), wf.export_string().strip())
+
+    def test_unchanged_tool(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        self.assertEqual(TOOL, tool.export_string())
+
+    def test_same_as_parse(self):
+        tool = parse_cwl(test_dir + '/import_commandlinetool.cwl', round_trip=True)
+        self.assertEqual(parse_cwl(test_dir + '/import_commandlinetool.cwl').get_dict(), tool.get_dict())
+
+    def test_modified_field(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        tool.requirements[0].dockerPull = "ubuntu:20.04"
+        expected = TOOL.replace("ubuntu:18.04", "ubuntu:20.04")
+        self.assertEqual(expected, tool.export_string())
+
+    def test_source_unchanged(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        tool.requirements[0].dockerPull = "ubuntu:20.04"
+        tool.export_string()
+        node = tool._round_trip_source.node
+        self.assertEqual(node["requirements"]["DockerRequirement"]["dockerPull"], "ubuntu:18.04")
+        tool.requirements[0].dockerPull = "ubuntu:18.04"
+        self.assertEqual(TOOL, tool.export_string())
+
+    def test_added_input_keeps_map_form(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        tool.inputs.append(cwlgen.CommandInputParameter("z", param_type="File"))
+        out = tool.export_string()
+        self.assertTrue(out.startswith(TOOL.split("outputs:")[0]))
+        self.assertIn("    z:\n        type: File\n", out)
+
+    def test_removed_input(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        tool.inputs = [i for i in tool.inputs if i.id != "y"]
+        out = tool.export_string()
+        self.assertNotIn("y:", out)
+        self.assertIn("    x: string\n", out)
+
+    def test_default_export(self):
+        tool = parse_cwl_string(TOOL, round_trip=True)
+        self.assertNotIn("# pinned", tool.export_string(round_trip=False))
+        self.assertNotIn("# pinned", parse_cwl_string(TOOL).export_string())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the local workflow scheduler of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import shutil
+import tempfile
+import threading
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.executor import LocalExecutor
+from cwlgen.scheduler import WorkflowScheduler, merge_sources
+from workflow_fixtures import add_step, echo_tool, read
+
+#  Class(es)  ------------------------------
+
+
+def script_tool(script, cores=None):
+    # runs a shell script with the arguments $1 (a directory) and $2 (a name)
+    tool = cwlgen.CommandLineTool("script", base_command=["sh", "-c", script, "sh"])
+    tool.inputs.append(cwlgen.CommandInputParameter(
+        "dir", param_type="string", input_binding=cwlgen.CommandLineBinding(position=1)))
+    tool.inputs.append(cwlgen.CommandInputParameter(
+        "name", param_type="string", input_binding=cwlgen.CommandLineBinding(position=2)))
+    if cores:
+        tool.requirements.append(cwlgen.ResourceRequirement(cores_min=cores))
+    return tool
+
+
+def cat_tool():
+    tool = cwlgen.CommandLineTool("cat", base_command="cat", stdout="out.txt")
+    tool.inputs.append(cwlgen.CommandInputParameter(
+        "files", param_type="File[]", input_binding=cwlgen.CommandLineBinding(position=1)))
+    tool.outputs.append(cwlgen.CommandOutputParameter("out", param_type="stdout"))
+    return tool
+
+
+class TestWorkflowScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def scheduler(self, cores=4, ram=None):
+        return WorkflowScheduler(executor=LocalExecutor(base_dir=self.base_dir), cores=cores, ram=ram)
+
+    def workflow(self):
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("a", param_type="string"))
+        w.inputs.append(cwlgen.InputParameter("b", param_type="string", default="world"))
+        add_step(w, "echo_a", echo_tool(), {"message": "a"})
+        add_step(w, "echo_b", echo_tool(), {"message": "#wf/b"})
+        add_step(w, "cat", cat_tool(), {"files": ["echo_a/out", "#echo_b/out"]})
+        w.outputs.append(cwlgen.WorkflowOutputParameter("out", output_source="cat/out", param_type="File"))
+        return w
+
+    def test_run(self):
+        result = self.scheduler().run(self.workflow(), {"a": "hello"})
+        self.assertTrue(result.success)
+        self.assertEqual(read(result.outputs["out"]), "hello\nworld\n")
+        self.assertEqual(set(result.steps), {"echo_a", "echo_b", "cat"})
+        self.assertEqual(len(result.jobs), 3)
+        self.assertEqual(result.steps["cat"].jobs[0].argv[0], "cat")
+
+    def test_parallel(self):
+        # each job waits until the 4 jobs have started, so they only succeed if they run at the same time
+        barrier = 'touch "$1/$2"; i=0; while [ $(ls "$1" | wc -l) -lt 4 ]; do ' \
+                  'i=$((i+1)); [ $i -gt 400 ] && exit 1; sleep 0.05; done'
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("dir", param_type="string"))
+        for i in range(4):
+            w.inputs.append(cwlgen.InputParameter("name%d" % i, param_type="string", default="job%d" % i))
+            add_step(w, "wait%d" % i, script_tool(barrier), {"dir": "dir", "name": "name%d" % i}, out=())
+        result = self.scheduler(cores=4).run(w, {"dir": tempfile.mkdtemp(dir=self.base_dir)})
+        self.assertTrue(result.success)
+
+    def test_resources(self):
+        # each job takes a lock, so they fail if two of them run at the same time
+        lock = 'mkdir "$1/lock" || exit 1; sleep 0.1; rmdir "$1/lock"'
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("dir", param_type="string"))
+        w.inputs.append(cwlgen.InputParameter("name", param_type="string", default="job"))
+        for i in range(3):
+            add_step(w, "lock%d" % i, script_tool(lock, cores=2), {"dir": "dir", "name": "name"}, out=())
+        result = self.scheduler(cores=2).run(w, {"dir": self.base_dir})
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.jobs), 3)
+
+    def test_resource_precedence(self):
+        # the requirement of the workflow takes precedence over the hint of the tool, so the jobs take 2 cores
+        lock = 'mkdir "$1/lock" || exit 1; sleep 0.1; rmdir "$1/lock"'
+        w = cwlgen.Workflow("wf")
+        w.requirements.append(cwlgen.ResourceRequirement(cores_min=2))
+        w.inputs.append(cwlgen.InputParameter("dir", param_type="string"))
+        w.inputs.append(cwlgen.InputParameter("name", param_type="string", default="job"))
+        for i in range(3):
+            tool = script_tool(lock)
+            tool.hints.append(cwlgen.ResourceRequirement(cores_min=1))
+            add_step(w, "lock%d" % i, tool, {"dir": "dir", "name": "name"}, out=())
+        result = self.scheduler(cores=2).run(w, {"dir": self.base_dir})
+        self.assertTrue(result.success)
+
+    def test_workers(self):
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("messages", param_type="string[]"))
+        add_step(w, "echo", echo_tool(), {"message": "messages"}, scatter="message")
+        executor = LocalExecutor(base_dir=self.base_dir)
+        counts = []     # the number of threads while each job runs
+        run = executor.run
+        executor.run = lambda tool, job, *args: counts.append(threading.active_count()) or run(tool, job, *args)
+        scheduler = WorkflowScheduler(executor=executor, cores=2, workers=2)
+        threads = threading.active_count()
+        result = scheduler.run(w, {"messages": [str(i) for i in range(50)]})
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.steps["echo"].jobs), 50)
+        self.assertLessEqual(max(counts), threads + 2)
+
+    def test_javascript_expression_tool(self):
+        w = cwlgen.Workflow("wf")
+        tool = cwlgen.ExpressionTool("js", expression="${ return {}; }")
+        add_step(w, "js", tool, {}, out=())
+        self.assertRaises(ValueError, self.scheduler().run, w, {})
+
+    def test_scatter(self):
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("messages", param_type="string[]"))
+        add_step(w, "echo", echo_tool(), {"message": "messages"}, scatter="message")
+        add_step(w, "cat", cat_tool(), {"files": "echo/out"})
+        w.outputs.append(cwlgen.WorkflowOutputParameter("out", output_source="cat/out", param_type="File"))
+        w.outputs.append(cwlgen.WorkflowOutputParameter("each", output_source="echo/out", param_type="File[]"))
+        result = self.scheduler().run(w, {"messages": ["a", "b", "c"]})
+        self.assertEqual(read(result.outputs["out"]), "a\nb\nc\n")
+        self.assertEqual(len(result.outputs["each"]), 3)
+        self.assertEqual(len(result.steps["echo"].jobs), 3)
+
+    def test_link_merge(self):
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("messages", param_type="string[]"))
+        w.inputs.append(cwlgen.InputParameter("last", param_type="string"))
+        add_step(w, "echo", echo_tool(), {"message": "messages"}, scatter="message")
+        add_step(w, "echo_last", echo_tool(), {"message": "last"})
+        add_step(w, "cat", cat_tool(), {"files": ["echo/out", "echo_last/out"]}, link_merge="merge_flattened")
+        w.outputs.append(cwlgen.WorkflowOutputParameter("out", output_source="cat/out", param_type="File"))
+        result = self.scheduler().run(w, {"messages": ["a", "b"], "last": "c"})
+        self.assertEqual(read(result.outputs["out"]), "a\nb\nc\n")
+
+    def test_failure(self):
+        w = cwlgen.Workflow("wf")
+        add_step(w, "fail", cwlgen.CommandLineTool("fail", base_command="false"), {}, out=("out",))
+        add_step(w, "echo", echo_tool(), {"message": "fail/out"})
+        result = self.scheduler().run(w, {})
+        self.assertEqual(result.status, "permanentFail")
+        self.assertIsNone(result.outputs)
+        self.assertNotIn("echo", result.steps)
+        self.assertEqual(result.steps["fail"].status, "permanentFail")
+
+    def test_nested_workflow(self):
+        inner = cwlgen.Workflow("inner")
+        inner.inputs.append(cwlgen.InputParameter("message", param_type="string"))
+        add_step(inner, "echo", echo_tool(), {"message": "message"})
+        inner.outputs.append(cwlgen.WorkflowOutputParameter("out", output_source="echo/out", param_type="File"))
+        w = cwlgen.Workflow("wf")
+        w.inputs.append(cwlgen.InputParameter("messages", param_type="string[]"))
+        add_step(w, "inner", inner, {"message": "messages"}, scatter="message")
+        w.outputs.append(cwlgen.WorkflowOutputParameter("out", output_source="inner/out", param_type="File[]"))
+        result = self.scheduler(cores=1).run(w, {"messages": ["a", "b"]})
+        self.assertTrue(result.success)
+        self.assertEqual([read(f) for f in result.outputs["out"]], ["a\n", "b\n"])
+        self.assertEqual(len(result.jobs), 2)
+
+    def test_cycle(self):
+        w = cwlgen.Workflow("wf")
+        add_step(w, "a", echo_tool(), {"message": "b/out"})
+        add_step(w, "b", echo_tool(), {"message": "a/out"})
+        with self.assertRaises(ValueError):
+            self.scheduler().run(w, {})
+
+    def test_merge_sources(self):
+        self.assertEqual(merge_sources([[1, 2], 3]), [[1, 2], 3])
+        self.assertEqual(merge_sources([[1, 2], 3], "merge_nested"), [[1, 2], 3])
+        self.assertEqual(merge_sources([[1, 2], 3], "merge_flattened"), [1, 2, 3])
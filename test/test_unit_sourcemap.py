@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the source maps of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import gc
+import unittest
+from os import path
+
+# External libraries
+import cwlgen
+from cwlgen.import_cwl import parse_cwl, parse_cwl_string
+from cwlgen.sourcemap import load_with_positions
+
+#  Class(es)  ------------------------------
+
+test_dir = path.dirname(path.abspath(__file__))
+
+
+class TestSourceMap(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = test_dir + '/import_workflow.cwl'
+        cls.source_map = cwlgen.SourceMap()
+        cls.wf = parse_cwl(cls.path, source_map=cls.source_map)
+
+    def test_root(self):
+        self.assertEqual(cwlgen.SourceLocation(self.path, 1, 1), self.source_map.get(self.wf))
+
+    def test_inputs(self):
+        self.assertEqual((7, 5), self.source_map.get(self.wf.inputs[0])[1:])
+        self.assertEqual((16, 5), self.source_map.get(self.wf.inputs[1])[1:])
+
+    def test_nested(self):
+        step = self.wf.steps[0]
+        self.assertEqual((25, 5), self.source_map.get(step)[1:])
+        self.assertEqual((27, 9), self.source_map.get(step.inputs[0])[1:])
+
+    def test_unknown_object(self):
+        self.assertNotIn(cwlgen.InputParameter("new"), self.source_map)
+        self.assertIsNone(self.source_map.get(cwlgen.InputParameter("new")))
+
+    def test_every_object_recorded(self):
+        # workflow, 2 inputs, 1 output, 2 steps and 3 step inputs
+        self.assertEqual(9, len(self.source_map))
+
+    def test_weak_references(self):
+        source_map = cwlgen.SourceMap()
+        wf = parse_cwl(self.path, source_map=source_map)
+        self.assertEqual(9, len(source_map))
+        # a single callback is shared by the references of every object
+        self.assertEqual(1, len(set(id(ref.__callback__) for ref in source_map._refs)))
+        del wf
+        gc.collect()
+        self.assertEqual(0, len(source_map))
+
+        # the rows of the collected objects are reused
+        param = cwlgen.InputParameter("new")
+        source_map.add(param, "new.cwl", 3, 4)
+        self.assertEqual(cwlgen.SourceLocation("new.cwl", 3, 4), source_map.get(param))
+        self.assertEqual(9, len(source_map._line))
+
+    def test_export_unchanged(self):
+        self.assertDictEqual(parse_cwl(self.path).get_dict(), self.wf.get_dict())
+
+
+class TestPositionLoader(unittest.TestCase):
+
+    def test_plain_types(self):
+        d = load_with_positions("a:\n  - 1\n  - {b: 2.5}\n")
+        self.assertIsInstance(d, dict)
+        self.assertEqual({"a": [1, {"b": 2.5}]}, d)
+        self.assertIs(type(d["a"][1]["b"]), float)
+        self.assertEqual((2, 4), d["a"].lc.item(1))
+
+    def test_errors_are_located(self):
+        errors = cwlgen.ErrorCollector()
+        parse_cwl_string("class: CommandLineTool\ninputs: {}\noutputs:\n  out:\n    nope: 1\n", errors=errors)
+        self.assertEqual((5, 5), (errors.errors[0].line, errors.errors[0].column))
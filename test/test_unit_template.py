@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the templates of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import json
+import unittest
+
+# External libraries
+import ruamel.yaml as ryaml
+import cwlgen
+
+#  Class(es)  ------------------------------
+
+
+def build_tool(image="biocontainers/bwa", cores=1):
+    tool = cwlgen.CommandLineTool("align", base_command=["bwa", "mem"])
+    tool.inputs.append(cwlgen.CommandInputParameter("reads", param_type="File",
+                                                    input_binding=cwlgen.CommandLineBinding(position=1)))
+    tool.requirements.append(cwlgen.DockerRequirement(docker_pull=image))
+    tool.requirements.append(cwlgen.ResourceRequirement(cores_min=cores, ram_min=1000))
+    return tool
+
+
+SLOTS = {
+    "image": ["requirements", "DockerRequirement", "dockerPull"],
+    "cores": ["requirements", "ResourceRequirement", "coresMin"],
+}
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_yaml_same_as_built(self):
+        template = cwlgen.Template(build_tool(), SLOTS)
+        rendered = template.render(image="biocontainers/bwa:0.7.17", cores=4)
+        expected = build_tool(image="biocontainers/bwa:0.7.17", cores=4).get_dict()
+        self.assertEqual(expected, ryaml.safe_load(rendered))
+
+    def test_json_same_as_built(self):
+        template = cwlgen.Template(build_tool(), SLOTS, format="json")
+        rendered = template.render(image="biocontainers/bwa:0.7.17", cores=4)
+        expected = build_tool(image="biocontainers/bwa:0.7.17", cores=4).get_dict()
+        self.assertEqual(expected, json.loads(rendered))
+
+    def test_defaults(self):
+        template = cwlgen.Template(build_tool(), SLOTS)
+        self.assertEqual(build_tool(cores=2).get_dict(), ryaml.safe_load(template.render(cores=2)))
+
+    def test_new_list_item(self):
+        template = cwlgen.Template(build_tool(), {"extra": ["inputs", "threads"], "command": ["baseCommand"]})
+        extra = cwlgen.CommandInputParameter("threads", param_type="int")
+        d = ryaml.safe_load(template.render(extra=extra, command=["bwa", "aln"]))
+        self.assertEqual(["bwa", "aln"], d["baseCommand"])
+        self.assertEqual([{"id": "reads", "type": "File", "inputBinding": {"position": 1}},
+                          {"id": "threads", "type": "int"}], d["inputs"])
+        with self.assertRaises(KeyError):
+            template.render(command=["bwa"])
+
+    def test_special_strings(self):
+        template = cwlgen.Template(build_tool(), SLOTS)
+        for value in ["a: b", "'quoted'", "- item", "multi\nline", u"é", "#comment", "true", "1"]:
+            d = ryaml.safe_load(template.render(image=value))
+            self.assertEqual(value, d["requirements"]["DockerRequirement"]["dockerPull"])
+
+    def test_render_many(self):
+        template = cwlgen.Template(build_tool(), SLOTS, format="json")
+        rendered = list(template.render_many({"cores": i} for i in range(3)))
+        self.assertEqual([0, 1, 2], [json.loads(r)["requirements"]["ResourceRequirement"]["coresMin"] for r in rendered])
+
+    def test_invalid(self):
+        with self.assertRaises(KeyError):
+            cwlgen.Template(build_tool(), {"x": ["hints", "DockerRequirement", "dockerPull"]})
+        with self.assertRaises(ValueError):
+            cwlgen.Template(build_tool(), SLOTS, format="xml")
+        with self.assertRaises(KeyError):
+            cwlgen.Template(build_tool(), SLOTS).render(unknown=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the change tracking of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import copy
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen import tracking
+from workflow_fixtures import shared_tool_workflow
+
+#  Class(es)  ------------------------------
+
+
+class TestTracking(unittest.TestCase):
+
+    def setUp(self):
+        tracking.enable()
+
+    def tearDown(self):
+        tracking.disable()
+
+    def assertFresh(self, obj):
+        tracking.disable()
+        expected = obj.get_dict()
+        tracking.enable()
+        self.assertEqual(expected, obj.get_dict())
+
+    def test_unchanged_is_cached(self):
+        w = shared_tool_workflow()
+        d = w.get_dict()
+        self.assertEqual(d, w.get_dict())
+        self.assertIs(d["steps"]["step0"], w.get_dict()["steps"]["step0"])
+
+    def test_changed_attribute(self):
+        w = shared_tool_workflow()
+        tool = w.steps[0].run
+        before = w.get_dict()
+        tool.requirements[0].dockerPull = "ubuntu:20.04"
+        after = w.get_dict()
+        self.assertEqual("ubuntu:20.04", after["steps"]["step1"]["run"]["requirements"]["DockerRequirement"]["dockerPull"])
+        # only the path to the change is serialized again
+        self.assertIs(before["inputs"]["inp"], after["inputs"]["inp"])
+        self.assertIsNot(before["steps"]["step0"], after["steps"]["step0"])
+        self.assertFresh(w)
+
+    def test_changed_list(self):
+        w = shared_tool_workflow()
+        w.get_dict()
+        w.steps[0].inputs.append(cwlgen.WorkflowStepInput("y", source="inp"))
+        self.assertIn("y", w.get_dict()["steps"]["step0"]["in"])
+        del w.steps[1]
+        self.assertEqual(["step0"], list(w.get_dict()["steps"]))
+        self.assertFresh(w)
+
+    def test_changed_dict(self):
+        req = cwlgen.requirements.UnknownRequirement("cwltool:Vendor", {"a": 1})
+        tool = cwlgen.CommandLineTool("tool")
+        tool.hints.append(req)
+        tool.get_dict()
+        req.fields["a"] = 2
+        self.assertEqual({"a": 2}, tool.get_dict()["hints"]["cwltool:Vendor"])
+
+    def test_top_level_is_copy(self):
+        w = shared_tool_workflow()
+        d = w.get_dict()
+        d["cwlVersion"] = "v1.1"
+        self.assertNotEqual("v1.1", w.get_dict().get("cwlVersion"))
+
+    def test_disable_discards_cache(self):
+        w = shared_tool_workflow()
+        tool = w.steps[0].run
+        w.get_dict()
+        tracking.disable()
+        tool.requirements[0].dockerPull = "ubuntu:20.04"
+        tracking.enable()
+        run = w.get_dict()["steps"]["step0"]["run"]
+        self.assertEqual("ubuntu:20.04", run["requirements"]["DockerRequirement"]["dockerPull"])
+
+    def test_deepcopy(self):
+        w = shared_tool_workflow()
+        w.get_dict()
+        w2 = copy.deepcopy(w)
+        w2.steps[0].run.requirements[0].dockerPull = "ubuntu:20.04"
+        self.assertEqual("ubuntu:18.04", w.steps[0].run.requirements[0].dockerPull)
+        run = w2.get_dict()["steps"]["step0"]["run"]
+        self.assertEqual("ubuntu:20.04", run["requirements"]["DockerRequirement"]["dockerPull"])
+        self.assertFresh(w2)
+
+    def test_disabled_by_default(self):
+        tracking.disable()
+        w = shared_tool_workflow()
+        self.assertFalse(tracking.is_enabled())
+        self.assertIsNot(w.get_dict()["inputs"]["inp"], w.get_dict()["inputs"]["inp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
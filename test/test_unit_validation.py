@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+'''
+Unit tests for the validation of jobs of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# General libraries
+import json
+import os
+import tempfile
+import unittest
+
+# External libraries
+import cwlgen
+from cwlgen.common import CommandInputArraySchema, CommandInputEnumSchema, CommandInputRecordSchema
+from cwlgen.import_cwl import parse_cwl_string
+from cwlgen.validation import JobValidator
+from workflow_fixtures import align_tool
+
+#  Class(es)  ------------------------------
+
+
+class TestJobValidator(unittest.TestCase):
+
+    def setUp(self):
+        sample = CommandInputRecordSchema(name="Sample")
+        sample.fields.append(CommandInputRecordSchema.CommandInputRecordField("name", "string"))
+        sample.fields.append(CommandInputRecordSchema.CommandInputRecordField("lane", "int?"))
+        self.tool = align_tool([
+            "reads",
+            ("threads", "int?"),
+            ("scores", CommandInputArraySchema(items="float")),
+            cwlgen.CommandInputParameter(
+                "mode", param_type=CommandInputEnumSchema(symbols=["fast", "exact"]), default="fast"),
+            ("sample", ["null", sample]),
+            ("tag", ["int", "string"]),
+        ])
+        self.validator = JobValidator(self.tool)
+        self.job = {
+            "reads": {"class": "File", "path": "/data/a.fq"},
+            "scores": [1, 2.5],
+            "sample": {"name": "a", "lane": 1},
+            "tag": "x",
+        }
+
+    def errors(self, **values):
+        job = dict(self.job, **values)
+        return [(e.path, e.message) for e in self.validator.validate(job)]
+
+    def test_valid(self):
+        self.assertEqual(self.validator.validate(self.job), [])
+        self.assertTrue(self.validator.is_valid(dict(self.job, threads=4, mode="exact", sample=None, tag=1)))
+
+    def test_primitives(self):
+        self.assertEqual(self.errors(threads="4"), [(["threads"], "expected int, got '4'")])
+        self.assertEqual(self.errors(threads=True), [(["threads"], "expected int, got True")])
+        self.assertEqual(self.errors(reads="/data/a.fq"), [(["reads"], "expected File, got '/data/a.fq'")])
+        self.assertEqual(self.errors(reads=None), [(["reads"], "expected File, got None")])
+
+    def test_array(self):
+        self.assertEqual(self.errors(scores=[1, "x"]), [(["scores", 1], "expected float, got 'x'")])
+        self.assertEqual(self.errors(scores=1), [(["scores"], "expected an array, got 1")])
+
+    def test_enum(self):
+        self.assertEqual(self.errors(mode="slow"),
+                         [(["mode"], "expected one of the symbols [exact, fast], got 'slow'")])
+        self.assertEqual(self.errors(mode="#align/mode/exact"), [])
+
+    def test_record(self):
+        self.assertEqual(self.errors(sample={"lane": "1"}),
+                         [(["sample", "name"], "expected string, got None"),
+                          (["sample", "lane"], "expected int, got '1'")])
+
+    def test_union(self):
+        self.assertEqual(self.errors(tag=1.5), [(["tag"], "expected one of [int, string], got 1.5")])
+
+    def test_strict(self):
+        self.assertTrue(self.validator.is_valid(dict(self.job, extra=1)))
+        validator = JobValidator(self.tool, strict=True)
+        self.assertEqual([e.path for e in validator.validate(dict(self.job, extra=1))], [["extra"]])
+
+    def test_schema_def(self):
+        tool = parse_cwl_string("""
+cwlVersion: v1.0
+class: CommandLineTool
+baseCommand: echo
+requirements:
+  SchemaDefRequirement:
+    types:
+      - name: "#Tree"
+        type: record
+        fields:
+          - name: label
+            type: string
+          - name: children
+            type: ["null", {type: array, items: "#Tree"}]
+inputs:
+  tree: "#Tree"
+outputs: []
+""")
+        validator = JobValidator(tool)
+        self.assertTrue(validator.is_valid({"tree": {"label": "a", "children": [{"label": "b"}]}}))
+        self.assertEqual([e.path for e in validator.validate({"tree": {"label": "a", "children": [{}]}})],
+                         [["tree", "children", 0, "label"]])
+
+    def test_unknown_type(self):
+        tool = {"class": "CommandLineTool", "inputs": {"x": "Sample"}, "outputs": {}}
+        self.assertRaises(ValueError, JobValidator, tool)
+
+    def test_validate_many(self):
+        jobs = [self.job, dict(self.job, threads="x"), self.job]
+        self.assertEqual([i for i, _ in self.validator.validate_many(jobs)], [1])
+
+    def test_validate_jsonl(self):
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w") as jsonl:
+                jsonl.write(json.dumps(self.job) + "\n")
+                jsonl.write(json.dumps(dict(self.job, threads="x")) + "\n")
+                jsonl.write("\n{not json\n")
+            invalid = list(self.validator.validate_jsonl(path))
+            self.assertEqual([line for line, _ in invalid], [2, 4])
+            error = invalid[0][1][0]
+            self.assertEqual(str(error), "%s:2 (threads): expected int, got 'x'" % path)
+        finally:
+            os.remove(path)
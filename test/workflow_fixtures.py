@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+'''
+Workflows and tools shared by the unit tests of cwlgen library
+'''
+
+#  Import  ------------------------------
+
+# External libraries
+import six
+
+import cwlgen
+
+#  Function(s)  ------------------------------
+
+
+def make_tool(tool_id, image=None, hint=True, inputs=("in",), outputs=("out",), base_command=None):
+    '''
+    :param inputs: The inputs of the tool: the ids of File inputs, (id, type) pairs, or parameters
+    :param outputs: The outputs of the tool: the ids of File outputs, (id, type) pairs, or parameters
+    :param base_command: The command of the tool (default: ``tool_id``)
+    :return: A tool with the Docker image ``image`` as a hint (or a requirement)
+    '''
+    tool = cwlgen.CommandLineTool(tool_id, base_command=base_command or tool_id)
+    for param in inputs:
+        tool.inputs.append(_parameter(cwlgen.CommandInputParameter, param))
+    for param in outputs:
+        tool.outputs.append(_parameter(cwlgen.CommandOutputParameter, param))
+    if image is not None:
+        (tool.hints if hint else tool.requirements).append(cwlgen.DockerRequirement(docker_pull=image))
+    return tool
+
+
+def _parameter(T, param):
+    if isinstance(param, tuple):
+        return T(param[0], param_type=param[1])
+    if isinstance(param, six.string_types):
+        return T(param, param_type="File")
+    return param
+
+
+def message_tool(tool_id="echo", command="echo", stdout=True):
+    '''
+    :return: A tool with a string input 'message', and a stdout output 'out' if ``stdout``
+    '''
+    return make_tool(tool_id, inputs=[("message", "string")], outputs=[("out", "stdout")] if stdout else (),
+                     base_command=command)
+
+
+def echo_tool(cores=None):
+    '''
+    :param cores: The minimal number of cores of a ResourceRequirement of the tool (default: no requirement)
+    :return: A tool echoing its input 'message' (bound at position 1) to its stdout output 'out' (out.txt)
+    '''
+    tool = make_tool("echo", inputs=[cwlgen.CommandInputParameter(
+        "message", param_type="string", input_binding=cwlgen.CommandLineBinding(position=1))],
+        outputs=[("out", "stdout")])
+    tool.stdout = "out.txt"
+    if cores:
+        tool.requirements.append(cwlgen.ResourceRequirement(cores_min=cores))
+    return tool
+
+
+def read(f):
+    '''
+    :param f: A File output of a run
+    :return: The contents of the file
+    '''
+    with open(f["path"]) as contents:
+        return contents.read()
+
+
+def align_tool(inputs, base_command="bwa"):
+    '''
+    :param inputs: The inputs of the tool, as for :func:`make_tool`
+    :return: A tool 'align' without outputs, running ``base_command``
+    '''
+    return make_tool("align", inputs=inputs, outputs=(), base_command=base_command)
+
+
+def add_step(workflow, step_id, run, sources, scatter=None, link_merge=None, out=("out",)):
+    '''
+    Add a step to the workflow, with an input for each of ``sources`` ({input id: source}).
+    '''
+    step = cwlgen.WorkflowStep(step_id, run=run, scatter=scatter)
+    for input_id, source in sources.items():
+        step.inputs.append(cwlgen.WorkflowStepInput(input_id, source=source, link_merge=link_merge))
+    for output_id in out:
+        step.out.append(cwlgen.WorkflowStepOutput(output_id))
+    workflow.steps.append(step)
+    return step
+
+
+def shared_tool_workflow():
+    '''
+    :return: A workflow with two steps that run the same tool (with a DockerRequirement), from the
+             workflow input 'inp'
+    '''
+    tool = cwlgen.CommandLineTool("tool", base_command=["echo"])
+    tool.inputs.append(cwlgen.CommandInputParameter("x", param_type="string"))
+    tool.requirements.append(cwlgen.DockerRequirement(docker_pull="ubuntu:18.04"))
+    workflow = cwlgen.Workflow("wf")
+    for i in range(2):
+        step = cwlgen.WorkflowStep("step%d" % i, run=tool)
+        step.inputs.append(cwlgen.WorkflowStepInput("x", source="inp"))
+        workflow.steps.append(step)
+    workflow.inputs.append(cwlgen.InputParameter("inp", param_type="string"))
+    return workflow